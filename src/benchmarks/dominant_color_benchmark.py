@@ -0,0 +1,101 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from src.utils.dominant_color import DOMINANT_COLOR_STRATEGIES, KMEANS_CRITERIA, _sample_pixels
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_IMAGES = os.path.join(REPO_ROOT, "assets", "sample-image", "*.png")
+# CIE76 distance under which two colors count as the same dominant color
+AGREEMENT_DELTA_E = 10.0
+
+
+def legacy_dominant_color(image):
+    """The previous engine: unseeded k-means with 10 random starts."""
+    pixels = _sample_pixels(image)
+    _, labels, centers = cv2.kmeans(pixels, 3, None, KMEANS_CRITERIA, 10, cv2.KMEANS_RANDOM_CENTERS)
+    return tuple(np.uint8(centers[np.argmax(np.bincount(labels.flatten()))]))
+
+
+def delta_e(color_a, color_b):
+    """CIE76 color difference between two RGB colors."""
+    lab = cv2.cvtColor(np.uint8([[color_a, color_b]]), cv2.COLOR_RGB2LAB)[0].astype(np.float64)
+    # OpenCV's 8-bit Lab is scaled: L by 255/100, a and b offset by 128
+    lab[:, 0] *= 100 / 255
+    return float(np.linalg.norm(lab[0] - lab[1]))
+
+
+def _time_ms(fn, image, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(image)
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(samples)
+
+
+def run(image_paths, repeat=20):
+    """
+    For each image, times every strategy and the legacy k-means, checks that
+    repeated runs return the same color, and measures the distance (delta E)
+    between each strategy's color and the legacy one.
+
+    Returns:
+    - dict: Per-image results and a per-strategy summary.
+    """
+    engines = {"legacy_kmeans": legacy_dominant_color, **DOMINANT_COLOR_STRATEGIES}
+    images = []
+    for path in image_paths:
+        image = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)
+        legacy_runs = [legacy_dominant_color(image) for _ in range(repeat)]
+        entry = {"image": os.path.relpath(path, REPO_ROOT), "strategies": {}}
+        for name, fn in engines.items():
+            color, ms = _time_ms(fn, image, repeat)
+            runs = legacy_runs if name == "legacy_kmeans" else [fn(image) for _ in range(3)]
+            entry["strategies"][name] = {
+                "color": [int(c) for c in color],
+                "ms": round(ms, 3),
+                "deterministic": len(set(runs)) == 1,
+                # median over the legacy runs, since the legacy color itself varies between runs
+                "delta_e_vs_legacy": round(statistics.median(delta_e(color, run) for run in legacy_runs), 2),
+            }
+        images.append(entry)
+
+    summary = {}
+    for name in engines:
+        results = [entry["strategies"][name] for entry in images]
+        summary[name] = {
+            "median_ms": round(statistics.median(r["ms"] for r in results), 3),
+            "deterministic": all(r["deterministic"] for r in results),
+            "agreement": round(sum(r["delta_e_vs_legacy"] <= AGREEMENT_DELTA_E for r in results) / len(results), 2),
+        }
+    return {"repeat": repeat, "images": images, "summary": summary}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare dominant color strategies with the legacy k-means.")
+    parser.add_argument("images", nargs="*", help=f"images to test (default: {DEFAULT_IMAGES})")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per strategy and image")
+    parser.add_argument("--output", type=str, default=None, help="write the full results as JSON")
+    args = parser.parse_args(argv)
+
+    image_paths = args.images or sorted(glob.glob(DEFAULT_IMAGES))
+    results = run(image_paths, args.repeat)
+    for name, summary in results["summary"].items():
+        print(f"> {name:>14}: {summary['median_ms']:.3f} ms, deterministic={summary['deterministic']}, "
+              f"agrees with legacy on {summary['agreement']:.0%} of images (delta E <= {AGREEMENT_DELTA_E})")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from src.service.cutout_service import SEGMENTATION_SIZE
+from src.service.segmentation_backends import TIERS, get_backend
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_IMAGES = os.path.join(REPO_ROOT, "assets", "sample-image", "*.png")
+# mask values above this count as foreground when comparing masks
+FOREGROUND_THRESHOLD = 127
+
+
+def mask_iou(mask, reference):
+    """Intersection over union of the foregrounds of two masks (1.0 when both are empty)."""
+    mask, reference = mask > FOREGROUND_THRESHOLD, reference > FOREGROUND_THRESHOLD
+    union = np.logical_or(mask, reference).sum()
+    return 1.0 if union == 0 else float(np.logical_and(mask, reference).sum() / union)
+
+
+def _time_ms(backend, image, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        mask = backend.predict_mask(image, SEGMENTATION_SIZE)
+        samples.append((time.perf_counter() - started) * 1000)
+    return mask, statistics.median(samples)
+
+
+def run(image_paths, tiers=TIERS, repeat=5):
+    """
+    Times each tier's segmentation on every image (after one warm-up call, so
+    model loading is not counted) and measures the IoU of its masks with the
+    default tier's.
+
+    Returns:
+    - dict: Per-image results and a per-tier summary.
+    """
+    tiers = list(tiers)
+    if "default" not in tiers:
+        tiers.insert(0, "default")
+    images = [(path, cv2.imread(path, cv2.IMREAD_UNCHANGED)) for path in image_paths]
+
+    entries = [{"image": os.path.relpath(path, REPO_ROOT), "tiers": {}} for path, _ in images]
+    for tier in tiers:
+        backend = get_backend(tier).start(warm_up=False)
+        for entry, (_, image) in zip(entries, images):
+            backend.predict_mask(image, SEGMENTATION_SIZE)
+            mask, ms = _time_ms(backend, image, repeat)
+            entry["tiers"][tier] = {"ms": round(ms, 3), "mask": mask}
+
+    summary = {}
+    for entry in entries:
+        reference = entry["tiers"]["default"]["mask"]
+        for result in entry["tiers"].values():
+            result["iou_vs_default"] = round(mask_iou(result.pop("mask"), reference), 4)
+    for tier in tiers:
+        results = [entry["tiers"][tier] for entry in entries]
+        summary[tier] = {
+            "model": get_backend(tier).model_name,
+            "median_ms": round(statistics.median(r["ms"] for r in results), 3),
+            "mean_iou_vs_default": round(statistics.mean(r["iou_vs_default"] for r in results), 4),
+        }
+    return {"repeat": repeat, "size": SEGMENTATION_SIZE, "images": entries, "summary": summary}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the latency and mask quality of the segmentation tiers.")
+    parser.add_argument("images", nargs="*", help=f"images to test (default: {DEFAULT_IMAGES})")
+    parser.add_argument("--tiers", type=str, default=",".join(TIERS),
+                        help="comma-separated tiers to compare with the default one")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per tier and image")
+    parser.add_argument("--output", type=str, default=None, help="write the full results as JSON")
+    args = parser.parse_args(argv)
+
+    image_paths = args.images or sorted(glob.glob(DEFAULT_IMAGES))
+    results = run(image_paths, args.tiers.split(","), args.repeat)
+    for tier, summary in results["summary"].items():
+        print(f"> {tier:>9} ({summary['model']}): {summary['median_ms']:.1f} ms, "
+              f"mean IoU with default {summary['mean_iou_vs_default']:.3f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.service.cutout_service import SEGMENTATION_SIZE
+from src.utils.bg_remover import predict_mask, subject_from_mask
+from src.utils.color_wheel import get_dominant_color
+from src.utils.file_utils import save_poster
+from src.utils.image_filters import apply_tint_filter, decrease_contrast
+from src.utils.masking import apply_mask
+from src.utils.overlay_utils import create_fade_to_transparent, generate_gradient_mask_from_image, overlay_image
+from src.utils.text_utils import add_text
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SAMPLE_IMAGE = os.path.join(REPO_ROOT, "assets", "sample-image", "yaro-1.png")
+FONT = os.path.join(REPO_ROOT, "assets", "Anton-Regular.ttf")
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+
+DEFAULT_SIZES = (256, 512, 1024)
+# parity is checked at this (small) size, so the golden images stay small enough to commit
+GOLDEN_SIZE = 64
+# largest allowed per-channel difference from a golden image
+DEFAULT_TOLERANCE = 2
+TINT = (64, 128, 255)
+
+
+class StandInSession:
+    """Deterministic stand-in for a rembg session: the foreground is every pixel brighter than 60."""
+
+    model_name = "stand-in"
+
+    def predict(self, img, *args, **kwargs):
+        luma = np.asarray(img.convert("L"))
+        return [Image.fromarray(np.uint8(luma > 60) * 255)]
+
+
+def synthetic_image(size):
+    """BGRA test card: color ramps, a few shapes and a soft alpha disc, identical on every run."""
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    image = np.zeros((size, size, 4), dtype=np.uint8)
+    image[:, :, 0] = ramp[None, :]
+    image[:, :, 1] = ramp[:, None]
+    image[:, :, 2] = 255 - ramp[None, :]
+    cv2.circle(image, (size // 3, size // 3), size // 6, (20, 200, 240, 255), -1)
+    cv2.rectangle(image, (size // 2, size // 2), (size * 7 // 8, size * 7 // 8), (240, 240, 240, 255), -1)
+    yy, xx = np.mgrid[:size, :size]
+    distance = np.hypot(xx - size / 2, yy - size / 2) / (size / 2)
+    image[:, :, 3] = np.uint8(np.clip(1.2 - distance, 0, 1) * 255)
+    return image
+
+
+def load_inputs(size):
+    """The benchmark inputs at size x size, as BGRA images keyed by name."""
+    sample = cv2.imread(SAMPLE_IMAGE, cv2.IMREAD_UNCHANGED)
+    if sample.shape[2] == 3:
+        sample = cv2.cvtColor(sample, cv2.COLOR_BGR2BGRA)
+    return {
+        "synthetic": synthetic_image(size),
+        "sample": cv2.resize(sample, (size, size), interpolation=cv2.INTER_AREA),
+    }
+
+
+def _save_and_reload(image):
+    output_path, _ = save_poster(image, "benchmark.png")
+    saved = cv2.imread(output_path, cv2.IMREAD_UNCHANGED)
+    os.remove(output_path)
+    return saved
+
+
+def _overlay(image):
+    height = image.shape[0]
+    background = np.full((height, height * 16 // 9, 3), 90, dtype=np.uint8)
+    return overlay_image(background, image)
+
+
+def _segment_subject(image):
+    # what cutout_service.get_subject computes on a cache miss, at SEGMENTATION_SIZE
+    # (or the input's size when smaller, so the golden images stay small)
+    size = (min(image.shape[1], SEGMENTATION_SIZE[0]), min(image.shape[0], SEGMENTATION_SIZE[1]))
+    return subject_from_mask(image, predict_mask(image, size, session=StandInSession()), size)
+
+
+def _dominant_color(image):
+    # a 1x1 image, so the color is compared like every other output
+    return np.uint8([[get_dominant_color(image[:, :, :3], "median_cut")]])
+
+
+# Each stage takes a BGRA input image and returns an image; inputs are never modified.
+STAGES = {
+    "segment_subject": _segment_subject,
+    "decrease_contrast": lambda image: decrease_contrast(image, 0.1),
+    "apply_tint_filter": lambda image: apply_tint_filter(image, TINT, 0.2),
+    "apply_mask": lambda image: apply_mask(image.copy(), generate_gradient_mask_from_image(image)),
+    "overlay_image": _overlay,
+    "create_fade_to_transparent": lambda image: create_fade_to_transparent(
+        TINT, width=image.shape[1], height=image.shape[0], fade_strength=1.5),
+    "add_text": lambda image: add_text(image.copy(), "#OPEN TO WORK", (255, 247, 216),
+                                       max_font_size=image.shape[0] // 2, min_font_size=8,
+                                       letter_spacing=max(1, image.shape[0] // 36)),
+    "get_dominant_color": _dominant_color,
+    "save_poster": _save_and_reload,
+}
+
+
+@contextlib.contextmanager
+def scratch_dir():
+    """
+    Runs in a throwaway <tmp>/a/b, so save_poster's ../../assets/output-banners
+    and the text utils' ../../assets font path both resolve inside <tmp>.
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "assets", "output-banners"))
+        os.makedirs(os.path.join(root, "a", "b"))
+        os.symlink(FONT, os.path.join(root, "assets", "Anton-Regular.ttf"))
+        os.chdir(os.path.join(root, "a", "b"))
+        try:
+            yield
+        finally:
+            os.chdir(previous)
+
+
+def _time_ms(fn, image, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = fn(image)
+        samples.append((time.perf_counter() - started) * 1000)
+    return output, samples
+
+
+def golden_path(stage, input_name):
+    return os.path.join(GOLDEN_DIR, f"{stage}-{input_name}.png")
+
+
+def compare_to_golden(stage, input_name, output, tolerance=DEFAULT_TOLERANCE):
+    """Returns the parity entry of one output against its golden image."""
+    golden = cv2.imread(golden_path(stage, input_name), cv2.IMREAD_UNCHANGED)
+    if golden is None:
+        return {"stage": stage, "input": input_name, "ok": False, "error": "missing golden image"}
+    if golden.shape != output.shape:
+        return {"stage": stage, "input": input_name, "ok": False,
+                "error": f"shape {output.shape} differs from the golden {golden.shape}"}
+    difference = np.abs(golden.astype(np.int16) - output.astype(np.int16))
+    max_diff = int(difference.max())
+    return {"stage": stage, "input": input_name, "ok": max_diff <= tolerance, "max_diff": max_diff,
+            "mean_diff": round(float(difference.mean()), 4)}
+
+
+def run(sizes=DEFAULT_SIZES, repeat=5, stages=None, tolerance=DEFAULT_TOLERANCE, update_golden=False):
+    """
+    Times every stage on every input at every size, and checks the stage outputs at
+    GOLDEN_SIZE against the golden images (or rewrites them with update_golden).
+
+    Returns:
+    - dict: {"timings": [...], "parity": [...]}, ready to be written as JSON.
+    """
+    stages = {name: STAGES[name] for name in (stages or STAGES)}
+    timings, parity = [], []
+    # the stages print progress on every call, which would dominate small sizes
+    with scratch_dir(), contextlib.redirect_stdout(io.StringIO()):
+        for size in sizes:
+            for input_name, image in load_inputs(size).items():
+                for stage, fn in stages.items():
+                    fn(image)  # warm-up: font loading, kernel caches
+                    _, samples = _time_ms(fn, image, repeat)
+                    timings.append({"stage": stage, "input": input_name, "size": size,
+                                    "median_ms": round(statistics.median(samples), 3),
+                                    "min_ms": round(min(samples), 3)})
+
+        for input_name, image in load_inputs(GOLDEN_SIZE).items():
+            for stage, fn in stages.items():
+                output = fn(image)
+                if update_golden:
+                    os.makedirs(GOLDEN_DIR, exist_ok=True)
+                    cv2.imwrite(golden_path(stage, input_name), output)
+                parity.append(compare_to_golden(stage, input_name, output, tolerance))
+
+    return {"repeat": repeat, "tolerance": tolerance, "timings": timings, "parity": parity}
+
+
+def compare_runs(results, baseline):
+    """Per (stage, input, size), the baseline median divided by the current one (above 1 is faster)."""
+    before = {(t["stage"], t["input"], t["size"]): t["median_ms"] for t in baseline["timings"]}
+    speedups = {}
+    for timing in results["timings"]:
+        key = (timing["stage"], timing["input"], timing["size"])
+        if key in before and timing["median_ms"] > 0:
+            speedups["/".join(map(str, key))] = round(before[key] / timing["median_ms"], 2)
+    return speedups
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the image stages and check them against golden images.")
+    parser.add_argument("--sizes", type=str, default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated input sizes (square, in pixels)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage, input and size")
+    parser.add_argument("--stages", type=str, default=None, help=f"comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE,
+                        help="largest allowed per-channel difference from the golden images")
+    parser.add_argument("--update-golden", action="store_true", help="rewrite the golden images from this run")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON of an earlier run to compare against")
+    parser.add_argument("--output", type=str, default=None, help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    stages = args.stages.split(",") if args.stages else None
+    results = run(sizes, args.repeat, stages, args.tolerance, args.update_golden)
+
+    for timing in results["timings"]:
+        print(f"> {timing['stage']:>26} {timing['input']:>9} {timing['size']:>5}px: {timing['median_ms']:9.3f} ms")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            results["speedup_vs_baseline"] = compare_runs(results, json.load(file))
+        for name, speedup in results["speedup_vs_baseline"].items():
+            print(f">> {name}: {speedup}x")
+    failures = [entry for entry in results["parity"] if not entry["ok"]]
+    for entry in failures:
+        reason = entry.get("error") or f"max difference {entry['max_diff']}"
+        print(f">> Parity failure: {entry['stage']} on {entry['input']}: {reason}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SAMPLE_IMAGE = os.path.join(REPO_ROOT, "assets", "sample-image", "yaro-1.png")
+SAMPLE_PATTERN = os.path.join(REPO_ROOT, "assets", "background-patterns", "default.png")
+# banner rendering resolves the font relative to src/tests, like the CLI examples
+RENDER_CWD = os.path.join(REPO_ROOT, "src", "tests")
+
+# Seconds. Generous on purpose: they catch a heavy module (rembg, numba,
+# matplotlib) creeping back into an import path, not small drifts.
+DEFAULT_BUDGETS = {
+    "import_server": 1.0,
+    "import_cli": 0.3,
+    "cli_help": 1.0,
+}
+
+# baseline comparisons ignore differences smaller than this (timer and scheduler noise)
+NOISE_SECONDS = 0.05
+
+_TIMED_IMPORT = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+_FIRST_BANNER = f"""
+import time
+t = time.perf_counter()
+from src.models.ColorPaletteGenerator import ColorPaletteGenerator
+from src.models.Profile import Profile
+from src.models.ProfileImage import ProfileImage
+from src.service.banner_service import render_banner
+image = ProfileImage.from_path({SAMPLE_IMAGE!r})
+profile = Profile(name="Jane Doe", header="Software Engineer", picture={SAMPLE_IMAGE!r}, pattern_bg={SAMPLE_PATTERN!r})
+render_banner(profile, ColorPaletteGenerator(image), image=image)
+print(time.perf_counter() - t)
+"""
+
+
+def _run(args, cwd=REPO_ROOT):
+    """Runs a fresh interpreter and returns (last stdout line, wall seconds)."""
+    import time
+
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, BANNER_RENDER_CACHE_DIR="", BANNER_CUTOUT_CACHE_DIR="",
+               BANNER_PERSIST_UPLOADS="0")
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr[-2000:]}")
+    lines = result.stdout.strip().splitlines()
+    return (lines[-1] if lines else ""), elapsed
+
+
+def measure(render=True, repeat=3):
+    """
+    Measures cold-start costs, each in a fresh interpreter, and returns the median seconds per metric.
+
+    - import_server / import_cli: time spent importing the module.
+    - cli_help: wall time of `make_banner_cli --help`, interpreter start included.
+    - first_banner: imports + model load + one 1920x1080 render (needs the segmentation model).
+    """
+    samples = {"import_server": [], "import_cli": [], "cli_help": []}
+    if render:
+        samples["first_banner"] = []
+
+    for _ in range(repeat):
+        samples["import_server"].append(float(_run(["-c", _TIMED_IMPORT.format(module="src.server")])[0]))
+        samples["import_cli"].append(float(_run(["-c", _TIMED_IMPORT.format(module="src.cli.make_banner_cli")])[0]))
+        samples["cli_help"].append(_run(["-m", "src.cli.make_banner_cli", "--help"])[1])
+        if render:
+            samples["first_banner"].append(float(_run(["-c", _FIRST_BANNER], cwd=RENDER_CWD)[0]))
+
+    return {name: round(statistics.median(values), 4) for name, values in samples.items()}
+
+
+def find_regressions(results, budgets=None, baseline=None, threshold=1.25):
+    """
+    Compares results against absolute budgets and, when given, a saved baseline.
+
+    A metric regresses when it exceeds its budget, or when it is more than
+    `threshold` times its baseline value (and NOISE_SECONDS slower).
+
+    Returns:
+    - list[str]: One message per regression, empty when everything is within limits.
+    """
+    budgets = DEFAULT_BUDGETS if budgets is None else budgets
+    regressions = []
+    for name, seconds in results.items():
+        if name in budgets and seconds > budgets[name]:
+            regressions.append(f"{name}: {seconds:.3f}s exceeds the {budgets[name]:.3f}s budget")
+        if baseline and name in baseline and seconds > max(baseline[name] * threshold, baseline[name] + NOISE_SECONDS):
+            regressions.append(f"{name}: {seconds:.3f}s is more than {threshold}x the {baseline[name]:.3f}s baseline")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and time to first banner.")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per metric (median is reported)")
+    parser.add_argument("--no-render", action="store_true", help="skip the first-banner measurement")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON of earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown factor vs. the baseline")
+    parser.add_argument("--save", type=str, default=None, help="write the results as JSON (e.g. a new baseline)")
+    args = parser.parse_args(argv)
+
+    results = measure(render=not args.no_render, repeat=args.repeat)
+    for name, seconds in results.items():
+        print(f"> {name}: {seconds:.3f}s")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    regressions = find_regressions(results, baseline=baseline, threshold=args.threshold)
+    for regression in regressions:
+        print(f">> Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,27 @@
 import argparse
 import os
+import sys
 
-import cv2
-import matplotlib.pyplot as plt
-from src.models.ColorPaletteGenerator import ColorPaletteGenerator
-from src.models.Profile import Profile
-from src.service.banner_service import generate_banner
+# The rendering stack (OpenCV, PIL, rembg, numba) is imported after the
+# arguments are parsed, so --help and argument errors return immediately.
 
 
 def generate_from_profile():
     parser = argparse.ArgumentParser(
-        description="Generate a LinkedIn banner using profile data (name, header, profile pic)")
+        description="Generate a LinkedIn banner using profile data (name, header, profile pic)",
+        epilog="To render every row of a CSV/JSONL manifest instead, run: make_banner_cli batch MANIFEST "
+               "(see make_banner_cli batch --help).")
     parser.add_argument("name", type=str, help="display name on banner")
     parser.add_argument("header", type=str, help="display linkedin header (occupation)")
     parser.add_argument("picture", type=str, help="profile picture path")
     parser.add_argument("--pattern", type=str, default=None, help="Path to an optional background pattern.")
     parser.add_argument("--popup", action="store_true", help="Show the generated banner")
     parser.add_argument("--palette", action="store_true", help="Show the extracted color palette.")
+    parser.add_argument("--sizes", type=str, default=None,
+                        help="Comma-separated sizes to render in one pass, as names (banner, linkedin, social, "
+                             "thumbnail) or WIDTHxHEIGHT, e.g. linkedin,1200x627.")
+    parser.add_argument("--segmentation", type=str, default=None,
+                        help="Background removal tier: default, quantized, fast or classic (no model).")
 
     args = parser.parse_args()
 
@@ -27,6 +32,22 @@ def generate_from_profile():
         print("background pattern address invalid")
         return
 
+    import cv2
+    from src.models.ColorPaletteGenerator import ColorPaletteGenerator
+    from src.models.Profile import Profile
+    from src.models.ProfileImage import ProfileImage
+    from src.service.banner_service import generate_banner, generate_banner_renditions, parse_size
+    from src.service.segmentation_backends import choose_tier, get_backend
+
+    sizes = None
+    try:
+        tier = choose_tier(args.segmentation)
+        if args.sizes:
+            sizes = [parse_size(size.strip()) for size in args.sizes.split(",") if size.strip()]
+    except ValueError as error:
+        print(error)
+        return
+
     picture_path = os.path.abspath(args.picture)
     pattern_bg_path = os.path.abspath(args.pattern) if args.pattern else None
     user_profile = Profile(
@@ -36,19 +57,72 @@ def generate_from_profile():
         pattern_bg=pattern_bg_path
     )
 
-    out_profile = generate_banner(user_profile)
-    print(f">>>> Banner created successfully")
+    # a single render is its own warm-up, so skip the extra inference here
+    get_backend(tier).start(warm_up=False)
+    image = ProfileImage.from_path(picture_path)
+    palette = ColorPaletteGenerator(image)
+    if sizes:
+        output_paths = generate_banner_renditions(user_profile, sizes, palette, image=image, tier=tier)
+        print(f">>>> {len(output_paths)} banners created successfully")
+        poster_path = output_paths[0]
+    else:
+        poster_path = generate_banner(user_profile, palette, image=image, tier=tier).generated_poster
+        print(f">>>> Banner created successfully")
     if args.palette:
-        palette = ColorPaletteGenerator(args.picture)
         palette.plot_palette()
 
     if args.popup:
-        image = cv2.imread(out_profile.generated_poster)
+        # matplotlib is only needed for the preview windows, so don't pay for it otherwise
+        import matplotlib.pyplot as plt
+
+        image = cv2.imread(poster_path)
         image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
         plt.imshow(image_rgb)
         plt.axis("off")
         plt.show()
 
+
+def generate_batch(argv):
+    parser = argparse.ArgumentParser(
+        prog="make_banner_cli batch",
+        description="Generate banners for every row of a CSV/JSONL manifest (name, header, picture, pattern)")
+    parser.add_argument("manifest", type=str, help="manifest path (.csv with a header row, or .jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--output-dir", type=str, default="./assets/output-banners/batch",
+                        help="where banners, the journal and the summary are written")
+    parser.add_argument("--summary", type=str, default=None,
+                        help="summary JSON path (default: <output-dir>/summary.json)")
+    parser.add_argument("--segmentation", type=str, default=None,
+                        help="Background removal tier: default, quantized, fast or classic (no model).")
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.manifest):
+        parser.error(f"manifest address invalid: {args.manifest}")
+    from src.service.batch_service import run_batch
+    from src.service.segmentation_backends import choose_tier
+
+    try:
+        tier = choose_tier(args.segmentation)
+    except ValueError as error:
+        parser.error(str(error))
+
+    summary = run_batch(args.manifest, args.output_dir, workers=args.workers, summary_path=args.summary, tier=tier)
+    if summary["failed"]:
+        sys.exit(1)
+
+
+def main():
+    from src.utils.log_utils import configure_logging
+
+    # the progress messages are the CLI's output, so they are on unless BANNER_LOG_LEVEL says otherwise
+    configure_logging("INFO")
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        generate_batch(sys.argv[2:])
+    else:
+        generate_from_profile()
+
+
 if __name__ == "__main__":
-    generate_from_profile()
+    main()
@@ -0,0 +1,96 @@
+import os
+
+# Segmentation (rembg) session pool
+SEGMENTATION_MODEL = os.environ.get("BANNER_SEGMENTATION_MODEL", "u2net")
+SEGMENTATION_POOL_SIZE = int(os.environ.get("BANNER_SEGMENTATION_POOL_SIZE", "1"))
+SEGMENTATION_WARMUP = os.environ.get("BANNER_SEGMENTATION_WARMUP", "1") == "1"
+
+# Micro-batching of segmentation: concurrent renders wait up to SEGMENTATION_BATCH_WAIT_MS
+# for each other and are segmented in one inference of up to SEGMENTATION_BATCH_SIZE
+# images (1 turns batching off); a render with no others in progress does not wait
+SEGMENTATION_BATCH_SIZE = int(os.environ.get("BANNER_SEGMENTATION_BATCH_SIZE", "4"))
+SEGMENTATION_BATCH_WAIT_MS = float(os.environ.get("BANNER_SEGMENTATION_BATCH_WAIT_MS", "10"))
+
+# Segmentation tier used when a request doesn't pick one: "default" (SEGMENTATION_MODEL),
+# "quantized", "fast", "classic" (no model) or "auto" (by render queue depth)
+SEGMENTATION_TIER = os.environ.get("BANNER_SEGMENTATION_TIER", "default")
+SEGMENTATION_FAST_MODEL = os.environ.get("BANNER_SEGMENTATION_FAST_MODEL", "u2netp")
+# rembg model name, or a path to a quantized U2-Net .onnx export
+SEGMENTATION_QUANTIZED_MODEL = os.environ.get("BANNER_SEGMENTATION_QUANTIZED_MODEL", "silueta")
+# With "auto": renders waiting in the queue at which the fast and classic tiers take over
+SEGMENTATION_AUTO_FAST_AT = int(os.environ.get("BANNER_SEGMENTATION_AUTO_FAST_AT", "2"))
+SEGMENTATION_AUTO_CLASSIC_AT = int(os.environ.get("BANNER_SEGMENTATION_AUTO_CLASSIC_AT", "6"))
+
+# Render cache for /banner and /color-palette
+RENDER_CACHE_MEMORY_BYTES = int(os.environ.get("BANNER_RENDER_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+RENDER_CACHE_DIR = os.environ.get("BANNER_RENDER_CACHE_DIR", "../DB/render-cache/")
+RENDER_CACHE_DISK_BYTES = int(os.environ.get("BANNER_RENDER_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+
+# Background-removal mask cache (keyed by image content)
+CUTOUT_CACHE_MEMORY_BYTES = int(os.environ.get("BANNER_CUTOUT_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+CUTOUT_CACHE_DIR = os.environ.get("BANNER_CUTOUT_CACHE_DIR", "../DB/cutout-cache/")
+CUTOUT_CACHE_DISK_BYTES = int(os.environ.get("BANNER_CUTOUT_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+
+# Ingest: pictures are decoded no larger than needed for this subject height (JPEGs are
+# decoded at 1/2, 1/4 or 1/8 scale while they stay at least this tall), and pictures
+# whose header announces more pixels or decode memory than allowed are decoded
+# reduced (JPEG) or rejected
+INGEST_HEIGHT = int(os.environ.get("BANNER_INGEST_HEIGHT", "1080"))
+MAX_IMAGE_PIXELS = int(os.environ.get("BANNER_MAX_IMAGE_PIXELS", str(50_000_000)))
+MAX_DECODE_BYTES = int(os.environ.get("BANNER_MAX_DECODE_BYTES", str(256 * 1024 * 1024)))
+
+# Keep a copy of every uploaded profile picture on disk
+PERSIST_UPLOADS = os.environ.get("BANNER_PERSIST_UPLOADS", "1") == "1"
+
+# Processed background-pattern layers kept in memory (about 8 MB each at 1920x1080)
+PATTERN_CACHE_MAX_LAYERS = int(os.environ.get("BANNER_PATTERN_CACHE_MAX_LAYERS", "16"))
+
+# Memoized render stages (gradient, pattern, text, composite...) kept in memory, so an
+# edit re-runs only the stages after it; one 1920x1080 render keeps about 40 MB
+STAGE_CACHE_MEMORY_BYTES = int(os.environ.get("BANNER_STAGE_CACHE_MEMORY_BYTES", str(128 * 1024 * 1024)))
+
+# Dominant color engine for palettes: "median_cut", "histogram" or "kmeans" (seeded)
+DOMINANT_COLOR_STRATEGY = os.environ.get("BANNER_DOMINANT_COLOR_STRATEGY", "median_cut")
+
+# Use the compiled (numba) cutout compositing kernel when numba is importable
+USE_NUMBA = os.environ.get("BANNER_USE_NUMBA", "1") == "1"
+
+# Uploaded profile pictures (when PERSIST_UPLOADS is on), stored once per content hash;
+# a picture not uploaded again for UPLOAD_TTL seconds is removed (0 keeps them forever)
+UPLOAD_FOLDER = os.environ.get("BANNER_UPLOAD_FOLDER", "../DB/profile-pictures/")
+UPLOAD_TTL = float(os.environ.get("BANNER_UPLOAD_TTL", str(7 * 24 * 3600)))
+UPLOAD_CLEANUP_INTERVAL = float(os.environ.get("BANNER_UPLOAD_CLEANUP_INTERVAL", "3600"))
+# Largest accepted upload; bigger ones are answered with 413 before being read completely
+MAX_UPLOAD_BYTES = int(os.environ.get("BANNER_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+
+# Load the segmentation model, pattern layers and compiled kernels before serving the first request
+WARM_UP_ON_START = os.environ.get("BANNER_WARM_UP_ON_START", "1") == "1"
+
+# Worker pool that runs renders off the server's event loop
+RENDER_POOL_KIND = os.environ.get("BANNER_RENDER_POOL_KIND", "thread")
+RENDER_WORKERS = int(os.environ.get("BANNER_RENDER_WORKERS", "2"))
+RENDER_QUEUE_SIZE = int(os.environ.get("BANNER_RENDER_QUEUE_SIZE", "8"))
+RENDER_JOB_TIMEOUT = float(os.environ.get("BANNER_RENDER_JOB_TIMEOUT", "60"))
+DISCONNECT_POLL_INTERVAL = float(os.environ.get("BANNER_DISCONNECT_POLL_INTERVAL", "0.25"))
+
+# Encoding of /banner responses
+OUTPUT_FORMAT = os.environ.get("BANNER_OUTPUT_FORMAT", "png")
+PNG_COMPRESSION = int(os.environ.get("BANNER_PNG_COMPRESSION", "3"))
+JPEG_QUALITY = int(os.environ.get("BANNER_JPEG_QUALITY", "90"))
+WEBP_QUALITY = int(os.environ.get("BANNER_WEBP_QUALITY", "90"))
+# Also write every rendered banner to assets/output-banners (after the response is sent)
+SAVE_BANNERS = os.environ.get("BANNER_SAVE_BANNERS", "0") == "1"
+
+# Draft renders for the editor (/banner with preview=true)
+PREVIEW_WIDTH = int(os.environ.get("BANNER_PREVIEW_WIDTH", "480"))
+PREVIEW_HEIGHT = int(os.environ.get("BANNER_PREVIEW_HEIGHT", "270"))
+PREVIEW_TIMEOUT = float(os.environ.get("BANNER_PREVIEW_TIMEOUT", "5"))
+
+# Logging: level of the pipeline's progress messages (the server defaults to WARNING,
+# the CLI to INFO) and "text" or "json" lines
+LOG_LEVEL = os.environ.get("BANNER_LOG_LEVEL", "")
+LOG_FORMAT = os.environ.get("BANNER_LOG_FORMAT", "text")
+# Stage latency / input size histograms for /metrics
+METRICS_ENABLED = os.environ.get("BANNER_METRICS", "1") == "1"
+# Also record peak allocated bytes per stage (tracemalloc, slows rendering down noticeably)
+TRACE_MEMORY = os.environ.get("BANNER_TRACE_MEMORY", "0") == "1"
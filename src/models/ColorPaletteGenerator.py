@@ -1,15 +1,21 @@
+import logging
 import numpy as np
-import os
-import matplotlib.pyplot as plt
+import io
+from src.config import settings
 from src.utils.color_wheel import (
     get_dominant_color, get_complementary_color, get_colors
 )
-from src.utils.file_utils import get_unique_filename, load_image_rgb
+from src.utils.file_utils import save_output
+from src.utils.palette_preview import render_palette_swatches
+from src.models.ProfileImage import ProfileImage
+from src.service.metrics import instrument
 
 from pydantic import BaseModel
 
 from typing import Tuple
 
+logger = logging.getLogger(__name__)
+
 class ColorPalette(BaseModel):
     primary_color: Tuple[int, int, int]
     secondary_color: Tuple[int, int, int]
@@ -18,15 +24,23 @@ class ColorPalette(BaseModel):
     text_color: Tuple[int, int, int]
 
 class ColorPaletteGenerator:
-    def __init__(self, image_path):
-        self.image_path = image_path
-        self._base_image = load_image_rgb(image_path)
+    def __init__(self, image, strategy=None):
+        # accepts an already decoded ProfileImage or a path to decode
+        if not isinstance(image, ProfileImage):
+            image = ProfileImage.from_path(image)
+        self.image = image
+        self.image_path = image.source_path
+        # dominant color engine, see color_wheel.get_dominant_color
+        self.strategy = strategy or settings.DOMINANT_COLOR_STRATEGY
+        self._base_image = image.rgb
         self._extract_colors()
     def _extract_colors(self):
-        self._primary_color = get_dominant_color(self._base_image)
-        self._secondary_color = get_complementary_color(self._primary_color)
-        self._accent_color_left, self._accent_color_right, self._text_color = get_colors(self.image_path,
-                                                                                         self._primary_color)
+        with instrument("dominant_color", self._base_image.shape):
+            self._primary_color = get_dominant_color(self._base_image, self.strategy)
+        with instrument("color_harmony", self._base_image.shape):
+            self._secondary_color = get_complementary_color(self._primary_color)
+            self._accent_color_left, self._accent_color_right, self._text_color = get_colors(self._base_image,
+                                                                                             self._primary_color)
         self._title_text_color = self._text_color
         self._subtitle_text_color = self._text_color
 
@@ -67,7 +81,7 @@ class ColorPaletteGenerator:
             accent_color_right=self._accent_color_right,
             text_color=self._text_color,
         )
-    def plot_palette(self, show=True):
+    def _labelled_colors(self):
         labels = [
             "Primary", "Secondary", "Accent Left", "Accent Right", "Title Text", "Subtitle Text"
         ]
@@ -75,6 +89,18 @@ class ColorPaletteGenerator:
             self.primary_color, self.secondary_color, self.accent_color_left, self.accent_color_right,
             self.title_text_color, self.subtitle_text_color
         ]
+        return labels, colors
+
+    def render_preview(self, with_image=True):
+        """Draws the palette swatches (and the source image) in memory and returns a BGR image."""
+        labels, colors = self._labelled_colors()
+        return render_palette_swatches(colors, labels, self._base_image if with_image else None)
+
+    def plot_palette(self, show=True):
+        """Plots the palette with matplotlib and saves it under ../assets/color-palette. Meant for the CLI."""
+        import matplotlib.pyplot as plt
+
+        labels, colors = self._labelled_colors()
 
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
         fig.suptitle("Extracted Colors from Image", fontsize=16)
@@ -97,11 +123,10 @@ class ColorPaletteGenerator:
 
         # Adjust layout and save the figure
         plt.tight_layout()
-        os.makedirs("../assets/color-palette", exist_ok=True)
-        file_name = os.path.basename(self.image_path).split('.')[0] + "_palette.png"
-        save_path = get_unique_filename("../assets/color-palette", file_name)
-        plt.savefig(save_path)
-        print(f">> Color palette saved as '{save_path}'")
+        buffer = io.BytesIO()
+        plt.savefig(buffer, format="png")
+        save_path = save_output(buffer.getvalue(), "../assets/color-palette", self.image.name + "_palette.png")
+        logger.info(">> Color palette saved as '%s'", save_path)
         if show:
             plt.show()
         return save_path
@@ -0,0 +1,183 @@
+import hashlib
+import io
+import logging
+import os
+import warnings
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidImageError(ValueError):
+    """Raised when a profile picture cannot be read or decoded."""
+
+
+class ImageTooLargeError(InvalidImageError):
+    """Raised when a profile picture would need more pixels or memory than allowed to decode."""
+
+
+# JPEG decoders can scale by 1/2, 1/4 and 1/8 while decoding, without ever holding the full image
+REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def read_image_header(data):
+    """
+    Reads size and pixel layout from the encoded header, without decoding pixels.
+
+    Returns:
+    - dict | None: width, height, channels, bytes_per_channel and format
+      ("JPEG", "PNG", ...), or None when the header is not recognised.
+    """
+    try:
+        with warnings.catch_warnings():
+            # the size limits below replace PIL's decompression bomb check
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            with Image.open(io.BytesIO(data)) as header:
+                mode, (width, height), image_format = header.mode, header.size, header.format
+                has_transparency = "transparency" in header.info
+    except Image.DecompressionBombError:
+        raise ImageTooLargeError(">> Error: Image dimensions are too large.")
+    except Exception:
+        return None
+
+    # what IMREAD_UNCHANGED gives: gray stays one channel, palettes and LA become BGR(A)
+    if "A" in mode or has_transparency:
+        channels = 4
+    elif mode in ("1", "L", "I", "I;16", "F"):
+        channels = 1
+    else:
+        channels = 3
+    bytes_per_channel = 2 if mode in ("I", "I;16", "F") else 1
+    return {"width": width, "height": height, "channels": channels, "bytes_per_channel": bytes_per_channel,
+            "format": image_format}
+
+
+def estimate_decode_bytes(header, reduction=1):
+    """Bytes the decoded image will take, from its header (reduced decodes are 8-bit BGR)."""
+    if reduction > 1:
+        return -(-header["width"] // reduction) * -(-header["height"] // reduction) * 3
+    return header["width"] * header["height"] * header["channels"] * header["bytes_per_channel"]
+
+
+def plan_decode(header, target_height=None, max_pixels=None, max_bytes=None):
+    """
+    Picks the decode scale (1, 2, 4 or 8) for an image from its header.
+
+    Anything over max_pixels or max_bytes must be decoded reduced, which only JPEG
+    supports; otherwise the image is rejected with ImageTooLargeError. JPEGs are
+    also reduced as far as they stay at least target_height tall.
+    """
+    target_height = settings.INGEST_HEIGHT if target_height is None else target_height
+    max_pixels = settings.MAX_IMAGE_PIXELS if max_pixels is None else max_pixels
+    max_bytes = settings.MAX_DECODE_BYTES if max_bytes is None else max_bytes
+    can_reduce = header["format"] == "JPEG"
+
+    reduction = 1
+    while (header["width"] * header["height"] / reduction ** 2 > max_pixels
+           or estimate_decode_bytes(header, reduction) > max_bytes):
+        reduction *= 2
+        if reduction > 8 or not can_reduce:
+            raise ImageTooLargeError(
+                f">> Error: Image is too large ({header['width']}x{header['height']}, "
+                f"{estimate_decode_bytes(header) / 2 ** 20:.0f} MiB decoded).")
+
+    if can_reduce:
+        while reduction < 8 and header["height"] // (reduction * 2) >= target_height:
+            reduction *= 2
+    return reduction
+
+
+class ProfileImage:
+    """
+    A profile picture decoded once and shared by every stage of a render.
+
+    Build it with `from_bytes` (uploads) or `from_path` (CLI); the original
+    encoded bytes are kept so the picture can still be persisted on demand.
+    """
+
+    def __init__(self, data, image, source_path=None, reduction=1):
+        self.data = data
+        self.source_path = source_path
+        self.digest = hashlib.sha256(data).hexdigest()
+        # 2, 4 or 8 when the picture was decoded at reduced scale (see plan_decode)
+        self.reduction = reduction
+        self._unchanged = image
+        self._bgr = None
+        self._rgb = None
+
+    @classmethod
+    def from_bytes(cls, data, source_path=None):
+        """
+        Decodes the picture at the working resolution chosen by plan_decode from
+        its header, so a 48 MP phone JPEG never exists in memory at full size.
+        """
+        header = read_image_header(data)
+        reduction = plan_decode(header) if header is not None else 1
+        flags = cv2.IMREAD_UNCHANGED
+        if reduction > 1:
+            # IMREAD_UNCHANGED ignores EXIF orientation too, keep reduced decodes consistent with it
+            flags = REDUCED_DECODE_FLAGS[reduction] | cv2.IMREAD_IGNORE_ORIENTATION
+            logger.info("> Decoding %dx%d image at 1/%d scale", header["width"], header["height"], reduction)
+
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+        if image is None:
+            raise InvalidImageError(f">> Error: Could not decode image '{source_path or 'upload'}'.")
+        return cls(data, image, source_path, reduction)
+
+    @classmethod
+    def from_path(cls, image_path):
+        logger.info("> Loading image from: %s", image_path)
+        try:
+            with open(image_path, "rb") as file:
+                data = file.read()
+        except OSError:
+            raise InvalidImageError(f">> Error: Could not load image from '{image_path}'. Check if the file exists.")
+        return cls.from_bytes(data, source_path=image_path)
+
+    @property
+    def name(self):
+        """File stem used to name outputs derived from this picture."""
+        if self.source_path:
+            return os.path.basename(self.source_path).split('.')[0]
+        return self.digest[:12]
+
+    @property
+    def unchanged(self):
+        """The image as stored in the file (BGR or BGRA)."""
+        return self._unchanged
+
+    @property
+    def bgr(self):
+        """3-channel, 8-bit BGR view of the image."""
+        if self._bgr is None:
+            image = self._unchanged
+            if image.dtype == np.uint16:
+                image = (image // 257).astype(np.uint8)
+            if image.ndim == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            elif image.shape[2] == 4:
+                image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+            self._bgr = image
+        return self._bgr
+
+    @property
+    def rgb(self):
+        """3-channel, 8-bit RGB view of the image."""
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def save(self, image_path):
+        """Writes the original encoded bytes to disk."""
+        with open(image_path, "wb") as file:
+            file.write(self.data)
+        return image_path
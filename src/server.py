@@ -1,53 +1,216 @@
-from fastapi import FastAPI, UploadFile, File, Form
-import shutil
+import asyncio
 import os
-from src.models.Profile import Profile
-from src.models.ColorPaletteGenerator import ColorPalette, ColorPaletteGenerator
-from src.service.banner_service import generate_banner
-app = FastAPI()
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, BackgroundTasks
+from fastapi.responses import Response
+from src.models.ProfileImage import ImageTooLargeError, InvalidImageError
+from src.models.ColorPaletteGenerator import ColorPalette
+from src.config import settings
+from src.service.banner_service import BANNER_LAYOUT, BANNER_SIZE, DEFAULT_PATTERN, RENDER_VERSION, parse_size, \
+    preview_size_for
+from src.service.metrics import CONTENT_TYPE, registry, render_stats
+from src.service.pattern_service import pattern_version
+from src.service.render_cache import RenderCache, make_cache_key
+from src.service.render_jobs import (
+    init_render_worker, render_banner_job, render_color_palette_job, render_color_palette_preview_job
+)
+from src.service.render_pool import RenderPool, RenderPoolFull, RenderTimeout
+from src.service.segmentation_backends import choose_tier, get_backend, shutdown_backends
+from src.service.segmentation_service import shutdown_session_pool
+from src.service.upload_store import UploadTooLargeError, get_upload_store, read_upload
+from src.utils.file_utils import IMAGE_FORMATS, resolve_image_format, save_encoded_poster
+from src.utils.log_utils import configure_logging
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # thread pools warm up here (before the server accepts requests), process pools in each worker
+    render_pool.start()
+    cleanup = asyncio.ensure_future(clean_up_uploads()) if settings.PERSIST_UPLOADS else None
+    yield
+    if cleanup is not None:
+        cleanup.cancel()
+    render_pool.shutdown()
+    shutdown_backends()
+    shutdown_session_pool()
+
+
+async def clean_up_uploads():
+    """Removes expired uploads every UPLOAD_CLEANUP_INTERVAL seconds, off the event loop."""
+    store = get_upload_store()
+    while True:
+        await asyncio.to_thread(store.cleanup)
+        await asyncio.sleep(settings.UPLOAD_CLEANUP_INTERVAL)
+
+
+def render_queue_depth():
+    """Renders waiting for a worker, the load signal of the "auto" segmentation tier."""
+    stats = render_pool.stats()
+    return max(0, stats["pending"] - stats["workers"])
+
+
+def content_disposition(filename):
+    """
+    An inline Content-Disposition for filename (RFC 6266): filename* carries the name
+    percent-encoded as UTF-8 (RFC 5987), filename an ASCII fallback for older clients.
+    Header values must be latin-1, so the raw name would fail for most non-Latin names.
+    """
+    filename = "".join(char for char in filename if char.isprintable())
+    fallback = "".join(char if " " <= char <= "~" and char not in '"\\' else "_" for char in filename)
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+async def read_picture(picture):
+    """The upload's bytes and content hash, or 413 when it is larger than MAX_UPLOAD_BYTES."""
+    try:
+        return await read_upload(picture)
+    except UploadTooLargeError as error:
+        raise HTTPException(status_code=413, detail=str(error))
+
+
+app = FastAPI(lifespan=lifespan)
+
+# part of the banner cache key, so renders by older layouts or rendering code are not served
+BANNER_RENDER_OPTIONS = {"layout": BANNER_LAYOUT, "render_version": RENDER_VERSION}
+render_cache = RenderCache(disk_dir=settings.RENDER_CACHE_DIR or None)
+# without the warm-up, sessions, pattern layers and kernels are built by the first request that needs them
+render_pool = RenderPool(initializer=init_render_worker if settings.WARM_UP_ON_START else None)
 
-UPLOAD_FOLDER = "../DB/profile-pictures/"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 @app.post("/color-palette")
 async def get_color_palette(
+    request: Request,
     name: str = Form(...),
     header: str = Form(...),
     picture: UploadFile = File(...)
 ):
-
-    profile = await save_profile_picture(name, header, picture)
-
-    generator = ColorPaletteGenerator(profile.picture)
-    generator.plot_palette()
-    color_palette = generator.get_palette()
-
-    return color_palette
+    image_bytes, digest = await read_picture(picture)
+    key = make_cache_key("color-palette", digest, settings.DOMINANT_COLOR_STRATEGY)
+    palette = await render(request, key, render_color_palette_job, name, header, picture.filename, image_bytes)
+    return ColorPalette.model_validate_json(palette)
 
 
+@app.post("/color-palette/preview")
+async def get_color_palette_preview(
+    request: Request,
+    picture: UploadFile = File(...)
+):
+    """Returns a PNG of the palette swatches next to the picture."""
+    image_bytes, digest = await read_picture(picture)
+    key = make_cache_key("color-palette-preview", digest, settings.DOMINANT_COLOR_STRATEGY)
+    preview = await render(request, key, render_color_palette_preview_job, picture.filename, image_bytes)
+    return Response(content=preview, media_type="image/png")
 
 
 @app.post("/banner")
 async def get_banner_from_profile(
+        request: Request,
+        background_tasks: BackgroundTasks,
         name: str = Form(...),
         header: str = Form(...),
-        picture: UploadFile = File(...)
+        picture: UploadFile = File(...),
+        format: Optional[str] = Form(None),
+        quality: Optional[int] = Form(None),
+        preview: bool = Form(False),
+        size: Optional[str] = Form(None),
+        segmentation: Optional[str] = Form(None)
 ):
-    profile = await save_profile_picture(name, header, picture)
-    generator = ColorPaletteGenerator(profile.picture)
-    banner = generate_banner(profile, generator.get_palette())
-    return banner
-
-
-async def save_profile_picture(name, header, picture):
-    profile_image_path = os.path.join(UPLOAD_FOLDER, picture.filename)
-    profile = None
-    with open(profile_image_path, "wb") as buffer:
-        shutil.copyfileobj(picture.file, buffer)
-        profile = Profile(name=name, header=header, picture=profile_image_path)
-    return profile
-
-
-
-
-
+    """
+    Returns the banner image itself; `format` is png, jpeg or webp and `quality` its compression/quality.
+    `size` is a named size (banner, linkedin, social, thumbnail) or WIDTHxHEIGHT, 1920x1080 by default.
+
+    With `preview`, a low-resolution draft of the same composition is rendered
+    (for editors re-rendering on every change) under a shorter time budget.
+
+    `segmentation` is the background removal tier (default, quantized, fast,
+    classic or auto, BANNER_SEGMENTATION_TIER when omitted); "auto" picks a faster
+    tier as renders queue up. The tier used is returned in X-Segmentation-Tier.
+    """
+    try:
+        image_format, quality = resolve_image_format(format, quality)
+        size = parse_size(size or BANNER_SIZE)
+        tier = choose_tier(segmentation, render_queue_depth())
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    image_bytes, digest = await read_picture(picture)
+    if preview:
+        size = preview_size_for(size)
+    key = make_cache_key("banner", digest, name, header, pattern_version(DEFAULT_PATTERN), BANNER_RENDER_OPTIONS,
+                         settings.DOMINANT_COLOR_STRATEGY, image_format, quality, size, get_backend(tier).model_name)
+    banner = await render(request, key, render_banner_job, name, header, picture.filename, image_bytes,
+                          image_format, quality, size, tier, timeout=settings.PREVIEW_TIMEOUT if preview else None)
+
+    # uploads may come without a filename
+    filename = os.path.basename(picture.filename or "banner")
+    if settings.SAVE_BANNERS and not preview:
+        # runs after the response has been sent
+        background_tasks.add_task(save_encoded_poster, banner, filename, image_format)
+
+    extension, media_type = IMAGE_FORMATS[image_format]
+    stem = filename.split('.')[0]
+    return Response(content=banner, media_type=media_type,
+                    headers={"Content-Disposition": content_disposition(f"{stem}-banner{extension}"),
+                             "X-Segmentation-Tier": tier})
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return render_cache.stats()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: stage latency, input size and (with BANNER_TRACE_MEMORY) peak
+    memory histograms, stage memoization counters, and render cache / pool gauges.
+
+    Stage metrics are recorded where the render runs, so with a process render
+    pool they stay in the worker processes and only the gauges are reported here.
+    """
+    body = registry.render() + render_stats("banner_render_cache", render_cache.stats()) \
+        + render_stats("banner_render_pool", render_pool.stats())
+    return Response(content=body, media_type=CONTENT_TYPE)
+
+
+@app.get("/health")
+async def get_health():
+    return {"status": "ok", "render_pool": render_pool.stats()}
+
+
+async def render(request, key, job, *args, timeout=None):
+    """
+    Returns the cached render for the key, or runs the job on the render pool
+    (with the pool's per-job timeout unless one is given).
+
+    The wait is abandoned (and the job cancelled if nobody else wants it) when
+    the client disconnects.
+    """
+    rendering = asyncio.ensure_future(
+        render_cache.get_or_compute_async(key, lambda: render_pool.run(job, *args, timeout=timeout))
+    )
+    try:
+        while True:
+            done, _ = await asyncio.wait({rendering}, timeout=settings.DISCONNECT_POLL_INTERVAL)
+            if done:
+                return rendering.result()
+            if await request.is_disconnected():
+                rendering.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    except RenderPoolFull as error:
+        raise HTTPException(status_code=503, detail=str(error),
+                            headers={"Retry-After": str(error.retry_after)})
+    except RenderTimeout as error:
+        raise HTTPException(status_code=504, detail=str(error))
+    except ImageTooLargeError as error:
+        raise HTTPException(status_code=413, detail=str(error))
+    except InvalidImageError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    finally:
+        if not rendering.done():
+            rendering.cancel()
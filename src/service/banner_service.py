@@ -1,61 +1,280 @@
+import logging
+import os
+
 import cv2
 
+from src.config import settings
 from src.utils.color_utils import create_gradient_rectangle
-from src.utils.bg_remover import remove_background_fast
-from src.utils.image_filters import decrease_contrast, apply_tint_filter, process_background_image, apply_gaussian_blur
-from src.utils.masking import apply_mask
-from src.utils.overlay_utils import overlay_image, add_images, create_fade_to_transparent, generate_gradient_mask_from_image
+from src.utils.fused_compositing import composite_cutout
+from src.utils.overlay_utils import add_images, create_fade_to_transparent
 from src.utils.text_utils import add_text_center, add_text_fit_width, add_text
 from src.utils.file_utils import save_poster
+from src.service.cutout_service import SEGMENTATION_SIZE, get_subject
+from src.service.metrics import instrument
+from src.service.render_cache import make_cache_key
+from src.service.segmentation_backends import get_backend
+from src.service.stage_graph import StageGraph
+from src.service.pattern_service import PATTERN_DIR, get_pattern_layer, pattern_version
+from src.service.render_pool import raise_if_cancelled
 from src.models.Profile import Profile
+from src.models.ProfileImage import ProfileImage
 from src.models.ColorPaletteGenerator import ColorPaletteGenerator, ColorPalette
 
+logger = logging.getLogger(__name__)
 
-def generate_banner(profile: Profile, color_palette: ColorPalette = None):
-    image_path = profile.picture
-    bg_pattern_source = check_pattern(profile)
-    person_name = profile.name
-    person_header = profile.header
+DEFAULT_PATTERN = os.path.join(PATTERN_DIR, "default.png")
+BANNER_SIZE = (1920, 1080)
+PREVIEW_SIZE = (settings.PREVIEW_WIDTH, settings.PREVIEW_HEIGHT)
 
-    if color_palette is None:
-        color_palette = ColorPaletteGenerator(image_path)
+# Named output sizes, accepted wherever a size is (server `size` field, CLI --sizes).
+RENDITION_SIZES = {
+    "banner": BANNER_SIZE,
+    "linkedin": (1584, 396),
+    "social": (1200, 627),
+    "thumbnail": (480, 270),
+}
+# memoized outputs of the render stages, shared by every render in this process
+banner_stages = StageGraph()
+
+MIN_SIDE = 64
+MAX_SIDE = 4096
+
+# Text layout as fractions of the layout unit (see layout_unit). Offsets are
+# from the vertical center of the canvas. At 1920x1080 these give the
+# original pixel values (title 500/60/30/-200, name 70/10/350, header 50/10/450).
+BANNER_LAYOUT = {
+    "title": {"max_font_size": 0.463, "min_font_size": 0.0556, "letter_spacing": 0.0278, "y_offset": -0.1852},
+    "name": {"font_size": 0.0648, "letter_spacing": 0.0093, "y_offset": 0.3241},
+    "header": {"max_font_size": 0.0463, "min_font_size": 0.0093, "letter_spacing": 0, "y_offset": 0.4167},
+}
+
+# Bump when a change to the rendering code changes banner pixels, so renders
+# cached (on disk, across deploys) by older code are not served. BANNER_LAYOUT
+# is part of the cache key as well.
+RENDER_VERSION = 2
 
-    left_bg = color_palette.accent_color_left
-    right_bg = color_palette.accent_color_right
-    text_color = color_palette.text_color
 
-    profile_pic = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
-    cutout = remove_background_fast(profile_pic)
-    background = create_gradient_rectangle(left_bg, right_bg)
+def layout_unit(size):
+    """
+    Height of the largest 16:9 box that fits in size; every BANNER_LAYOUT value is relative to it.
+    On a wide canvas (like LinkedIn's 1584x396) that is the canvas height.
+    """
+    width, height = size
+    return min(height, width * BANNER_SIZE[1] / BANNER_SIZE[0])
 
-    low_contrast = decrease_contrast(cutout, 0.1)
-    tinted_cutout = apply_tint_filter(low_contrast, right_bg, strength=0.2)
-    gradient_mask = generate_gradient_mask_from_image(profile_pic, fade_strength=1, interploation="quadratic")
 
-    masked_cutout = apply_mask(tinted_cutout, gradient_mask)
+def scale_layout(element, size):
+    """Converts one BANNER_LAYOUT entry to pixels. Positive sizes never round down to 0."""
+    unit = layout_unit(size)
+    return {key: max(1, round(value * unit)) if value > 0 else round(value * unit)
+            for key, value in BANNER_LAYOUT[element].items()}
 
-    background = cv2.cvtColor(background, cv2.COLOR_RGB2RGBA)
-    bg_pattern = cv2.imread(bg_pattern_source, cv2.IMREAD_UNCHANGED)
-    bg_pattern = process_background_image(bg_pattern, opacity=0.2)
-    bg_pattern = apply_mask(bg_pattern, generate_gradient_mask_from_image(bg_pattern, interploation="linear"))
-    bg_pattern = apply_gaussian_blur(bg_pattern, 9)
 
-    background = add_images(background, bg_pattern)
-    background = add_text(background, "#Open to Work".upper(), text_color, y_offset=-200)
+def parse_size(size):
+    """
+    Parses a RENDITION_SIZES name or a "WIDTHxHEIGHT" string into a (width, height) tuple.
+    Raises ValueError for anything else.
+    """
+    if isinstance(size, (tuple, list)):
+        width, height = size
+    elif size in RENDITION_SIZES:
+        return RENDITION_SIZES[size]
+    else:
+        try:
+            width, height = (int(part) for part in str(size).lower().split("x"))
+        except ValueError:
+            raise ValueError(f"Unknown size '{size}'. Use WIDTHxHEIGHT or one of: {', '.join(RENDITION_SIZES)}.")
+    if not (MIN_SIDE <= width <= MAX_SIDE and MIN_SIDE <= height <= MAX_SIDE):
+        raise ValueError(f"Size {width}x{height} is out of range ({MIN_SIDE} to {MAX_SIDE} pixels per side).")
+    return int(width), int(height)
 
-    poster = overlay_image(background.copy(), masked_cutout)
-    fade_gradient = create_fade_to_transparent(left_bg, fade_strength=1.5)
-    poster = add_images(poster, fade_gradient)
-    poster = add_text_center(poster, person_name.upper(), font_size=70, color=text_color, letter_spacing=10,
-                             y_offset=350)
-    poster = add_text_fit_width(poster, person_header, color=text_color, letter_spacing=0, y_offset=450,
-                                max_font_size=50)
 
-    output_path, output_name = save_poster(poster, image_path)
+def preview_size_for(size):
+    """Scales size down to fit in PREVIEW_SIZE, keeping its aspect ratio."""
+    width, height = size
+    scale = min(1, PREVIEW_SIZE[0] / width, PREVIEW_SIZE[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def generate_banner(profile: Profile, color_palette: ColorPalette = None, image: ProfileImage = None, tier=None):
+    """Renders the banner for the profile, saves it and records its path on the profile."""
+    image_path = profile.picture
+    if image is None:
+        image = ProfileImage.from_path(image_path)
+
+    poster = render_banner(profile, color_palette, image, tier=tier)
+    raise_if_cancelled()
+
+    with instrument("save_poster", poster.shape):
+        output_path, output_name = save_poster(poster, image_path)
     profile.generated_poster = output_path
-    print(f">>> Banner saved at: {output_path}")
+    logger.info(">>> Banner saved at: %s", output_path)
     return profile
 
 
+def generate_banner_renditions(profile: Profile, sizes, color_palette: ColorPalette = None,
+                               image: ProfileImage = None, tier=None):
+    """
+    Renders and saves the banner at every size (see render_banner_renditions).
+    Files are named <picture>-<width>x<height>-banner-<hash>.png (see save_output).
+
+    Returns:
+    - list[str]: The saved paths, in the order of sizes.
+    """
+    image_path = profile.picture
+    if image is None:
+        image = ProfileImage.from_path(image_path)
+
+    output_paths = []
+    stem = os.path.basename(image_path).split('.')[0]
+    for (width, height), poster in render_banner_renditions(profile, sizes, color_palette, image, tier=tier).items():
+        output_path, _ = save_poster(poster, f"{stem}-{width}x{height}")
+        logger.info(">>> %dx%d banner saved at: %s", width, height, output_path)
+        output_paths.append(output_path)
+    return output_paths
+
+
+def _color_key(color):
+    return tuple(int(c) for c in color)
+
+
+def prepare_banner(profile: Profile, color_palette: ColorPalette = None, image: ProfileImage = None, trace=None,
+                   tier=None):
+    """
+    Runs the size-independent stages once: palette and background removal (cutout)
+    with the segmentation tier's backend (SEGMENTATION_TIER by default).
+
+    Returns:
+    - dict: Inputs for compose_banner, reusable for any number of sizes. "keys"
+      holds the stage keys the size-dependent stages are chained to.
+    """
+    if image is None:
+        image = ProfileImage.from_path(profile.picture)
+
+    if color_palette is None:
+        strategy = settings.DOMINANT_COLOR_STRATEGY
+
+        def palette():
+            generator = ColorPaletteGenerator(image, strategy)
+            return generator.accent_color_left, generator.accent_color_right, generator.text_color
+
+        palette_key, (left_bg, right_bg, text_color) = banner_stages.run(
+            "palette", (image.digest, strategy), palette, trace, shape=image.unchanged.shape)
+    else:
+        left_bg = color_palette.accent_color_left
+        right_bg = color_palette.accent_color_right
+        text_color = color_palette.text_color
+        palette_key = make_cache_key("palette", _color_key(left_bg), _color_key(right_bg), _color_key(text_color))
+
+    raise_if_cancelled()
+    backend = get_backend(tier)
+    cutout_key, cutout = banner_stages.run("cutout", (image.digest, backend.model_name, SEGMENTATION_SIZE),
+                                           lambda: get_subject(image.unchanged, image.digest, backend.tier), trace,
+                                           shape=image.unchanged.shape)
+    raise_if_cancelled()
+    return {
+        "name": profile.name,
+        "header": profile.header,
+        "pattern": check_pattern(profile),
+        "left_bg": left_bg,
+        "right_bg": right_bg,
+        "text_color": text_color,
+        # kept at the segmentation size, and scaled once to the canvas by compose_banner
+        "cutout": cutout,
+        "cutout_aspect": image.unchanged.shape[1] / image.unchanged.shape[0],
+        "keys": {"palette": palette_key, "cutout": cutout_key},
+    }
+
+
+def compose_banner(inputs, size=BANNER_SIZE, trace=None):
+    """
+    Draws a banner of the given (width, height) from prepare_banner's inputs and
+    returns it as a (read-only) BGR image. Text is laid out with BANNER_LAYOUT.
+
+    Each step is a memoized stage of banner_stages:
+
+        palette -> background -> headline -> composite -> text
+                   pattern ----/   cutout --/
+
+    so changing only the name or header redraws just the text stage.
+    """
+    width, height = size
+    size = (width, height)
+    left_bg, right_bg, text_color = inputs["left_bg"], inputs["right_bg"], inputs["text_color"]
+    palette_key, cutout_key = inputs["keys"]["palette"], inputs["keys"]["cutout"]
+
+    canvas = (height, width)
+    background_key, background = banner_stages.run("background", (palette_key, size), lambda: cv2.cvtColor(
+        create_gradient_rectangle(left_bg, right_bg, width=width, height=height), cv2.COLOR_RGB2RGBA), trace, canvas)
+
+    pattern_path = inputs["pattern"]
+    # a missing pattern is reported by get_pattern_layer
+    pattern_key, bg_pattern = banner_stages.run(
+        "pattern", (*pattern_version(pattern_path), size),
+        lambda: get_pattern_layer(pattern_path, size, opacity=0.2, blur_amount=9), trace, canvas)
+
+    title = scale_layout("title", size)
+    # blending and text are drawn in place, so they work on a copy of the memoized background
+    headline_key, headline = banner_stages.run("headline", (background_key, pattern_key, title), lambda: add_text(
+        add_images(background.copy(), bg_pattern), "#Open to Work".upper(), text_color, **title), trace, canvas)
+
+    def composite():
+        poster = composite_cutout(headline.copy(), inputs["cutout"], right_bg, contrast_amount=0.1,
+                                  tint_strength=0.2, use_numba=settings.USE_NUMBA,
+                                  aspect_ratio=inputs["cutout_aspect"])
+        fade_gradient = create_fade_to_transparent(left_bg, width=width, height=height, fade_strength=1.5)
+        return add_images(poster, fade_gradient)
+
+    composite_key, poster = banner_stages.run("composite", (headline_key, cutout_key), composite, trace, canvas)
+
+    name = scale_layout("name", size)
+    header = scale_layout("header", size)
+
+    def draw_text():
+        # the color channels come out the same whether the text is drawn before or after dropping alpha
+        frame = cv2.cvtColor(poster, cv2.COLOR_BGRA2BGR)
+        frame = add_text_center(frame, inputs["name"].upper(), color=text_color, **name)
+        return add_text_fit_width(frame, inputs["header"], color=text_color, **header)
+
+    _, banner = banner_stages.run("text", (composite_key, inputs["name"], inputs["header"], name, header),
+                                  draw_text, trace, canvas)
+    return banner
+
+
+def render_banner(profile: Profile, color_palette: ColorPalette = None, image: ProfileImage = None,
+                  size=BANNER_SIZE, trace=None, tier=None):
+    """
+    Renders the banner for the profile at size (width, height) and returns it as
+    a read-only BGR image, without saving it.
+
+    Stages whose inputs did not change since an earlier render are reused. Pass
+    a list as trace to see which stages ran: one entry per stage, in order, with
+    "recomputed" telling whether it was computed or reused. tier picks the
+    segmentation backend (see segmentation_backends.TIERS).
+    """
+    with instrument("render_banner", (size[1], size[0])):
+        inputs = prepare_banner(profile, color_palette, image, trace, tier)
+        return compose_banner(inputs, size, trace)
+
+
+def render_banner_renditions(profile: Profile, sizes, color_palette: ColorPalette = None, image: ProfileImage = None,
+                             trace=None, tier=None):
+    """
+    Renders the banner at several sizes from one pass over the inputs: the
+    palette, background removal and pattern processing are done once, and only
+    the drawing is repeated per size.
+
+    Returns:
+    - dict: {(width, height): BGR image}, in the order of sizes.
+    """
+    inputs = prepare_banner(profile, color_palette, image, trace, tier)
+    renditions = {}
+    for size in sizes:
+        size = parse_size(size)
+        raise_if_cancelled()
+        renditions[size] = compose_banner(inputs, size, trace)
+    return renditions
+
+
 def check_pattern(profile: Profile):
-    return "./assets/background-patterns/default.png" if profile.pattern_bg is None else profile.pattern_bg
+    return DEFAULT_PATTERN if profile.pattern_bg is None else profile.pattern_bg
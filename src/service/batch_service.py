@@ -0,0 +1,184 @@
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FIELDS = ("name", "header", "picture", "pattern")
+JOURNAL_NAME = "journal.jsonl"
+
+
+def read_manifest(manifest_path):
+    """
+    Reads a CSV (with a header row) or JSONL manifest of banners to render.
+
+    Every row needs name, header and picture; pattern is optional. Relative
+    picture/pattern paths are resolved against the manifest's directory.
+
+    Returns:
+    - list[dict]: Rows with an added stable "id".
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, newline="", encoding="utf-8") as file:
+        if manifest_path.lower().endswith((".jsonl", ".json")):
+            records = [json.loads(line) for line in file if line.strip()]
+        else:
+            records = list(csv.DictReader(file))
+
+    rows = []
+    for line_number, record in enumerate(records, start=1):
+        missing = [field for field in ("name", "header", "picture") if not record.get(field)]
+        if missing:
+            raise ValueError(f">> Error: manifest row {line_number} is missing {', '.join(missing)}.")
+        row = {field: (record.get(field) or None) for field in MANIFEST_FIELDS}
+        for field in ("picture", "pattern"):
+            if row[field]:
+                row[field] = os.path.normpath(os.path.join(base_dir, row[field]))
+        row["id"] = manifest_row_id(row)
+        rows.append(row)
+    return rows
+
+
+def manifest_row_id(row):
+    """Stable id of a row; re-running the same manifest maps rows to the same outputs."""
+    key = "\0".join(str(row.get(field) or "") for field in MANIFEST_FIELDS)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def output_path_for(row, output_dir):
+    stem = os.path.basename(row["picture"]).split('.')[0]
+    return os.path.join(output_dir, f"{stem}-{row['id']}-banner.png")
+
+
+def load_completed(output_dir):
+    """Ids of rows a previous run finished whose banner is still on disk."""
+    journal_path = os.path.join(output_dir, JOURNAL_NAME)
+    completed = {}
+    if not os.path.exists(journal_path):
+        return completed
+    with open(journal_path, encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a run killed mid-write leaves a partial last line
+            if entry.get("status") == "ok" and os.path.exists(entry.get("output", "")):
+                completed[entry["id"]] = entry
+    return completed
+
+
+def init_batch_worker(tier=None):
+    """
+    Per-process warm-up of the segmentation tier (SEGMENTATION_TIER unless given):
+    every worker keeps its own segmentation session for the whole batch.
+    """
+    from src.config import settings
+    from src.service.segmentation_backends import init_backends
+    from src.utils.fused_compositing import warm_up_kernels
+
+    settings.SEGMENTATION_POOL_SIZE = 1
+    if tier is not None:
+        settings.SEGMENTATION_TIER = tier
+    init_backends()
+    warm_up_kernels()
+
+
+def render_manifest_row(row, output_path, tier=None):
+    """Renders one manifest row into output_path. Runs inside a batch worker."""
+    from src.models.ColorPaletteGenerator import ColorPaletteGenerator
+    from src.models.Profile import Profile
+    from src.models.ProfileImage import ProfileImage
+    from src.service.banner_service import render_banner
+
+    started = time.perf_counter()
+    try:
+        image = ProfileImage.from_path(row["picture"])
+        profile = Profile(name=row["name"], header=row["header"], picture=row["picture"],
+                          pattern_bg=row["pattern"])
+        poster = render_banner(profile, ColorPaletteGenerator(image), image=image, tier=tier)
+
+        # write then rename, so an interrupted run never leaves a half-written banner behind
+        tmp_path = f"{output_path}.{os.getpid()}.tmp.png"
+        if not cv2.imwrite(tmp_path, poster):
+            raise ValueError(f">> Error: could not write '{output_path}'.")
+        os.replace(tmp_path, output_path)
+        return {"id": row["id"], "status": "ok", "output": output_path,
+                "seconds": round(time.perf_counter() - started, 3)}
+    except Exception as error:
+        return {"id": row["id"], "status": "failed", "error": f"{type(error).__name__}: {error}",
+                "seconds": round(time.perf_counter() - started, 3)}
+
+
+def run_batch(manifest_path, output_dir, workers=None, summary_path=None, tier=None):
+    """
+    Renders every row of the manifest across worker processes, segmented with
+    tier (SEGMENTATION_TIER by default; "auto" has no queue to go by and renders
+    with the default tier). Raises ValueError for an unknown tier.
+
+    Rows finished by a previous run into the same output_dir are skipped.
+    A journal.jsonl in output_dir records each finished row as it completes,
+    and a summary with per-item timings and failures is written at the end.
+
+    Returns:
+    - dict: The summary.
+    """
+    from src.service.segmentation_backends import choose_tier
+
+    tier = choose_tier(tier)
+    rows = read_manifest(manifest_path)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    completed = load_completed(output_dir)
+    pending = [row for row in rows if row["id"] not in completed]
+    results = {row_id: dict(entry, status="skipped") for row_id, entry in completed.items()}
+    logger.info("> Batch: %d row(s), %d already done, %d to render on %d worker(s) with the %s tier...",
+                len(rows), len(rows) - len(pending), len(pending), workers, tier)
+
+    started = time.perf_counter()
+    if pending:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker, initargs=(tier,),
+                                 mp_context=context) as pool, \
+                open(os.path.join(output_dir, JOURNAL_NAME), "a", encoding="utf-8") as journal:
+            futures = {pool.submit(render_manifest_row, row, output_path_for(row, output_dir), tier): row
+                       for row in pending}
+            for done, future in enumerate(as_completed(futures), start=1):
+                row = futures[future]
+                result = future.result()
+                results[row["id"]] = result
+                journal.write(json.dumps(result) + "\n")
+                journal.flush()
+                status = "ok" if result["status"] == "ok" else f"FAILED ({result['error']})"
+                logger.info(">> [%d/%d] %s: %s in %ss", done, len(pending), row["name"], status, result["seconds"])
+
+    items = []
+    for row in rows:
+        result = results.get(row["id"], {"status": "missing"})
+        items.append({"id": row["id"], "name": row["name"], "picture": row["picture"], **result})
+
+    summary = {
+        "manifest": os.path.abspath(manifest_path),
+        "output_dir": os.path.abspath(output_dir),
+        "workers": workers,
+        "segmentation": tier,
+        "total": len(rows),
+        "rendered": sum(item["status"] == "ok" for item in items),
+        "skipped": sum(item["status"] == "skipped" for item in items),
+        "failed": sum(item["status"] == "failed" for item in items),
+        "seconds": round(time.perf_counter() - started, 3),
+        "items": items,
+    }
+    summary_path = summary_path or os.path.join(output_dir, "summary.json")
+    with open(summary_path, "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
+    logger.info(">>>> Batch finished: %d rendered, %d skipped, %d failed in %ss. Summary: %s",
+                summary["rendered"], summary["skipped"], summary["failed"], summary["seconds"], summary_path)
+    return summary
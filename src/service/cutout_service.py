@@ -0,0 +1,58 @@
+import logging
+
+import cv2
+import numpy as np
+
+from src.config import settings
+from src.service.render_cache import RenderCache, make_cache_key
+from src.service.segmentation_backends import get_backend, predict_tier_mask
+from src.utils.bg_remover import subject_from_mask
+
+logger = logging.getLogger(__name__)
+
+SEGMENTATION_SIZE = (500, 500)
+
+# Only the mask depends on segmentation, so that is all we keep: a 500x500
+# single-channel PNG is a few dozen KB, independent of the upload size.
+cutout_cache = RenderCache(
+    memory_max_bytes=settings.CUTOUT_CACHE_MEMORY_BYTES,
+    disk_dir=settings.CUTOUT_CACHE_DIR or None,
+    disk_max_bytes=settings.CUTOUT_CACHE_DISK_BYTES,
+)
+
+
+def encode_mask(mask):
+    ok, encoded = cv2.imencode(".png", mask)
+    if not ok:
+        raise ValueError("Error: could not encode cutout mask.")
+    return encoded.tobytes()
+
+
+def decode_mask(data):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+
+
+def get_cutout_mask(image, digest, tier=None):
+    """
+    Returns the segmentation mask of the image from the tier's backend (see
+    segmentation_backends), running segmentation only on a cache miss.
+    digest identifies the picture (ProfileImage.digest).
+    """
+    backend = get_backend(tier)
+    key = make_cache_key("cutout-mask", backend.model_name, SEGMENTATION_SIZE, digest)
+
+    def segment():
+        return encode_mask(predict_tier_mask(image, SEGMENTATION_SIZE, backend.tier))
+
+    return decode_mask(cutout_cache.get_or_compute(key, segment))
+
+
+def get_subject(image, digest, tier=None):
+    """
+    The cached BGRA cutout at SEGMENTATION_SIZE, not resized back to the original
+    size. Renders scale it once, straight to its placement size.
+    """
+    logger.info("> Removing background...")
+    if image is None:
+        raise ValueError("Error: Image not found.")
+    return subject_from_mask(image, get_cutout_mask(image, digest, tier), SEGMENTATION_SIZE)
@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PIXEL_BUCKETS = (64 * 64, 256 * 256, 512 * 512, 1024 * 1024, 1920 * 1080, 2048 * 2048, 4096 * 4096)
+BYTES_BUCKETS = tuple(2 ** power for power in range(20, 31, 2))  # 1 MiB to 1 GiB
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape_label_value(value):
+    # the text exposition format escapes only these three in label values
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram with a fixed set of label names."""
+
+    def __init__(self, name, documentation, buckets, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.label_names + ("le",), label_values + (repr(float(bound)),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names + ("le",), label_values + ("+Inf",))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics of this process, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, name, documentation, buckets, label_names=()):
+        metric = Histogram(name, documentation, buckets, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, label_names=()):
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+def render_stats(prefix, stats):
+    """Renders the numeric entries of a stats() dict (render cache, render pool) as gauges."""
+    lines = []
+    for name, value in sorted(stats.items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+registry = MetricsRegistry()
+stage_seconds = registry.histogram("banner_stage_seconds", "Time spent in a pipeline stage.",
+                                   LATENCY_BUCKETS, ("stage",))
+stage_input_pixels = registry.histogram("banner_stage_input_pixels", "Pixels of the image a pipeline stage worked on.",
+                                        PIXEL_BUCKETS, ("stage",))
+stage_peak_bytes = registry.histogram("banner_stage_peak_bytes",
+                                      "Peak bytes allocated during a pipeline stage (BANNER_TRACE_MEMORY only).",
+                                      BYTES_BUCKETS, ("stage",))
+stage_cache = registry.counter("banner_stage_cache_total", "Memoized stage lookups by result (computed or reused).",
+                               ("stage", "result"))
+segmentation_batch_size = registry.histogram("banner_segmentation_batch_size", "Images per segmentation inference.",
+                                             BATCH_BUCKETS, ("model",))
+segmentation_queue_seconds = registry.histogram("banner_segmentation_queue_seconds",
+                                                "Time an image waited for its segmentation batch to start.",
+                                                LATENCY_BUCKETS, ("model",))
+
+_frames = threading.local()
+
+
+def _start_memory_frame():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    stack = getattr(_frames, "stack", None)
+    if stack is None:
+        stack = _frames.stack = []
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        # the parent's peak so far would be lost by reset_peak
+        stack[-1][1] = max(stack[-1][1], peak)
+    tracemalloc.reset_peak()
+    frame = [current, 0]
+    stack.append(frame)
+    return frame
+
+
+def _end_memory_frame(frame):
+    _, peak = tracemalloc.get_traced_memory()
+    stack = _frames.stack
+    stack.pop()
+    peak = max(peak, frame[1])
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    return max(0, peak - frame[0])
+
+
+@contextmanager
+def instrument(stage, shape=None):
+    """
+    Times the block as one pipeline stage and records it in the stage histograms
+    and, at INFO level, as a structured log record.
+
+    Parameters:
+    - stage (str): Stage name, the "stage" label of the metrics.
+    - shape (tuple | None): Shape of the image the stage works on ((height, width, ...)).
+
+    With BANNER_TRACE_MEMORY=1 the stage's peak allocation (tracemalloc, which
+    also sees NumPy buffers) is recorded too. Tracing is process-wide, so peaks
+    of concurrent renders overlap. With BANNER_METRICS=0 this does nothing.
+    """
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+
+    frame = _start_memory_frame() if settings.TRACE_MEMORY else None
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        peak_bytes = _end_memory_frame(frame) if frame is not None else None
+        stage_seconds.observe(seconds, stage)
+        if shape is not None:
+            stage_input_pixels.observe(shape[0] * shape[1], stage)
+        if peak_bytes is not None:
+            stage_peak_bytes.observe(peak_bytes, stage)
+
+        if logger.isEnabledFor(logging.INFO):
+            fields = {"stage": stage, "ms": round(seconds * 1000, 3)}
+            if shape is not None:
+                fields["height"], fields["width"] = int(shape[0]), int(shape[1])
+            if peak_bytes is not None:
+                fields["peak_bytes"] = peak_bytes
+            logger.info("stage %s took %.1f ms", stage, seconds * 1000, extra={"fields": fields})
@@ -0,0 +1,138 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+
+from src.config import settings
+from src.utils.image_filters import process_background_image, apply_gaussian_blur
+from src.utils.masking import apply_mask
+from src.utils.overlay_utils import generate_gradient_mask_from_image
+
+logger = logging.getLogger(__name__)
+
+PATTERN_DIR = "./assets/background-patterns"
+PATTERN_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def pattern_version(pattern_path):
+    """
+    Identifies a pattern file's current content for cache keys: its absolute path
+    and modification time (None while the file is missing).
+    """
+    try:
+        mtime = os.stat(pattern_path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    return os.path.abspath(pattern_path), mtime
+
+
+def build_pattern_base(pattern_path, opacity=0.2, blur_amount=9):
+    """
+    Runs the size-independent part of the pattern pipeline at the pattern's own
+    resolution: white keying + opacity, linear fade mask and blur.
+    """
+    bg_pattern = cv2.imread(pattern_path, cv2.IMREAD_UNCHANGED)
+    if bg_pattern is None:
+        raise ValueError(f">> Error: Could not load background pattern from '{pattern_path}'.")
+    bg_pattern = process_background_image(bg_pattern, opacity=opacity)
+    bg_pattern = apply_mask(bg_pattern, generate_gradient_mask_from_image(bg_pattern, interploation="linear"))
+    return apply_gaussian_blur(bg_pattern, blur_amount)
+
+
+def build_pattern_layer(pattern_path, size=(1920, 1080), opacity=0.2, blur_amount=9, base=None):
+    """
+    Runs the full pattern pipeline (build_pattern_base, then a resize to size).
+
+    Returns:
+    - np.ndarray: Read-only BGRA layer of the given (width, height), ready for add_images.
+    """
+    if base is None:
+        base = build_pattern_base(pattern_path, opacity, blur_amount)
+    layer = cv2.resize(base, size)
+    # shared between renders, nobody may draw on it
+    layer.flags.writeable = False
+    return layer
+
+
+class PatternLayerCache:
+    """
+    Keeps processed pattern layers keyed by (file, size, processing parameters).
+
+    Every lookup stats the file, and a layer whose file changed since it was
+    built is rebuilt, so editing a pattern on disk needs no restart. The
+    size-independent processing is kept too, so a new output size only costs
+    a resize.
+    """
+
+    def __init__(self, max_layers=None):
+        self.max_layers = settings.PATTERN_CACHE_MAX_LAYERS if max_layers is None else max_layers
+        self._layers = OrderedDict()
+        self._bases = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_base(self, pattern_path, mtime, opacity, blur_amount):
+        key = (os.path.abspath(pattern_path), opacity, blur_amount)
+        with self._lock:
+            entry = self._bases.get(key)
+            if entry is not None and entry[0] == mtime:
+                self._bases.move_to_end(key)
+                return entry[1]
+
+        base = build_pattern_base(pattern_path, opacity, blur_amount)
+        with self._lock:
+            self._bases[key] = (mtime, base)
+            self._bases.move_to_end(key)
+            while len(self._bases) > self.max_layers:
+                self._bases.popitem(last=False)
+        return base
+
+    def get(self, pattern_path, size=(1920, 1080), opacity=0.2, blur_amount=9):
+        key = (os.path.abspath(pattern_path), tuple(size), opacity, blur_amount)
+        mtime = os.stat(pattern_path).st_mtime_ns
+
+        with self._lock:
+            entry = self._layers.get(key)
+            if entry is not None and entry[0] == mtime:
+                self._layers.move_to_end(key)
+                return entry[1]
+
+        logger.info("> Building pattern layer for %s...", pattern_path)
+        base = self._get_base(pattern_path, mtime, opacity, blur_amount)
+        layer = build_pattern_layer(pattern_path, tuple(size), opacity, blur_amount, base=base)
+
+        with self._lock:
+            self._layers[key] = (mtime, layer)
+            self._layers.move_to_end(key)
+            while len(self._layers) > self.max_layers:
+                self._layers.popitem(last=False)
+        return layer
+
+    def warm(self, directory=PATTERN_DIR, size=(1920, 1080)):
+        """Builds the layers of every pattern in the directory."""
+        if not os.path.isdir(directory):
+            return 0
+        count = 0
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith(PATTERN_EXTENSIONS):
+                self.get(os.path.join(directory, name), size)
+                count += 1
+        logger.info(">> %d pattern layer(s) ready.", count)
+        return count
+
+    def clear(self):
+        with self._lock:
+            self._layers.clear()
+            self._bases.clear()
+
+
+pattern_cache = PatternLayerCache()
+
+
+def get_pattern_layer(pattern_path, size=(1920, 1080), opacity=0.2, blur_amount=9):
+    return pattern_cache.get(pattern_path, size, opacity, blur_amount)
+
+
+def warm_pattern_cache(directory=PATTERN_DIR, size=(1920, 1080)):
+    return pattern_cache.warm(directory, size)
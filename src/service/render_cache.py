@@ -0,0 +1,294 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from src.config import settings
+
+
+def make_cache_key(*parts):
+    """Hashes the given parts (bytes, str, numbers, None) into a stable hex key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            data = b"\x00"
+        elif isinstance(part, (bytes, bytearray, memoryview)):
+            data = bytes(part)
+        else:
+            data = repr(part).encode("utf-8")
+        # length prefix so ("ab", "c") and ("a", "bc") don't collide
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class _AsyncFlight:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class RenderCache:
+    """
+    Two-tier (memory LRU + disk) cache of rendered bytes with single-flight de-duplication.
+
+    Parameters:
+    - memory_max_bytes (int): Budget of the in-memory LRU tier.
+    - disk_dir (str | None): Directory of the on-disk tier, None disables it.
+    - disk_max_bytes (int): Budget of the on-disk tier, oldest entries are evicted first.
+    """
+
+    def __init__(self, memory_max_bytes=None, disk_dir=None, disk_max_bytes=None):
+        self.memory_max_bytes = settings.RENDER_CACHE_MEMORY_BYTES if memory_max_bytes is None else memory_max_bytes
+        self.disk_max_bytes = settings.RENDER_CACHE_DISK_BYTES if disk_max_bytes is None else disk_max_bytes
+        self.disk_dir = disk_dir
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._inflight = {}
+        self._async_inflight = {}
+        self._stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "coalesced": 0,
+        }
+
+        # the directory itself is created by the first write
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            self._load_disk_index()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _load_disk_index(self):
+        entries = []
+        for shard in os.listdir(self.disk_dir):
+            shard_dir = os.path.join(self.disk_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(shard_dir, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _remember(self, key, value):
+        """Puts the value in the memory tier. Caller holds the lock."""
+        if len(value) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats["memory_evictions"] += 1
+
+    def _evict_disk(self):
+        """Drops the least recently used files until the disk tier fits. Caller holds the lock."""
+        while self._disk_bytes > self.disk_max_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._stats["disk_evictions"] += 1
+            try:
+                os.remove(self._disk_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _write_disk(self, key, value):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # a unique name per write, also between processes sharing the directory
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(value)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            if key in self._disk:
+                self._disk_bytes -= self._disk.pop(key)
+            self._disk[key] = len(value)
+            self._disk_bytes += len(value)
+            self._evict_disk()
+
+    def _read_disk(self, key):
+        try:
+            with open(self._disk_path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            with self._lock:
+                size = self._disk.pop(key, None)
+                if size is not None:
+                    self._disk_bytes -= size
+            return None
+
+    def get(self, key):
+        """Returns the cached bytes for the key or None, promoting disk hits to memory."""
+        value, on_disk = self._get_memory(key)
+        if value is None and on_disk:
+            value = self._get_disk(key)
+        if value is None:
+            self._count_miss()
+        return value
+
+    def _get_memory(self, key):
+        """The bytes cached in memory (or None), and whether the disk tier has the key."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+            return value, key in self._disk
+
+    def _get_disk(self, key):
+        value = self._read_disk(key)
+        if value is not None:
+            with self._lock:
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self._remember(key, value)
+                self._stats["hits"] += 1
+                self._stats["disk_hits"] += 1
+        return value
+
+    def _count_miss(self):
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+        if self.disk_dir and len(value) <= self.disk_max_bytes:
+            self._write_disk(key, value)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value or calls compute() to produce it.
+
+        Concurrent callers with the same key wait for the first caller's render
+        instead of starting their own; they share its result or its exception.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self.put(key, flight.value)
+            return flight.value
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    async def get_or_compute_async(self, key, compute):
+        """
+        Async version of get_or_compute; compute is a coroutine function.
+
+        Identical concurrent requests await one shared render. The render is
+        cancelled only when every request waiting for it has been cancelled.
+        """
+        value, on_disk = self._get_memory(key)
+        if value is None and on_disk:
+            # file reads stay off the event loop
+            value = await asyncio.to_thread(self._get_disk, key)
+        if value is not None:
+            return value
+        self._count_miss()
+
+        flight = self._async_inflight.get(key)
+        if flight is None:
+            flight = _AsyncFlight(asyncio.ensure_future(self._compute_and_store(key, compute)))
+            self._async_inflight[key] = flight
+        else:
+            with self._lock:
+                self._stats["coalesced"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # nobody wants this render anymore; later requests start a fresh one
+                if self._async_inflight.get(key) is flight:
+                    del self._async_inflight[key]
+                flight.task.cancel()
+
+    async def _compute_and_store(self, key, compute):
+        try:
+            value = await compute()
+            await asyncio.to_thread(self.put, key, value)
+            return value
+        finally:
+            if key in self._async_inflight and self._async_inflight[key].task is asyncio.current_task():
+                del self._async_inflight[key]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                memory_entries=len(self._memory),
+                memory_bytes=self._memory_bytes,
+                disk_entries=len(self._disk),
+                disk_bytes=self._disk_bytes,
+                inflight=len(self._inflight) + len(self._async_inflight),
+            )
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            keys = list(self._disk)
+            self._disk.clear()
+            self._disk_bytes = 0
+        for key in keys:
+            try:
+                os.remove(self._disk_path(key))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,71 @@
+import logging
+import time
+
+from src.config import settings
+from src.models.ColorPaletteGenerator import ColorPaletteGenerator
+from src.models.Profile import Profile
+from src.models.ProfileImage import ProfileImage
+from src.service.banner_service import BANNER_SIZE, PREVIEW_SIZE, render_banner
+from src.service.pattern_service import warm_pattern_cache
+from src.service.segmentation_backends import init_backends
+from src.service.upload_store import get_upload_store
+from src.utils.file_utils import encode_image
+from src.utils.fused_compositing import warm_up_kernels
+
+logger = logging.getLogger(__name__)
+
+# Jobs submitted to the RenderPool. They take and return plain bytes/str so
+# they can run on a process pool as well as a thread pool.
+
+
+def init_render_worker():
+    """
+    Warm-up step: builds the per-process state renders rely on (segmentation
+    sessions, pattern layers, compiled kernels) so the first request doesn't
+    pay for the deferred imports and model load.
+    """
+    started = time.perf_counter()
+    logger.info("> Warming up render worker...")
+    init_backends()
+    warm_pattern_cache()
+    warm_pattern_cache(size=PREVIEW_SIZE)
+    warm_up_kernels()
+    logger.info(">> Render worker ready in %.2fs", time.perf_counter() - started)
+
+
+def save_profile_picture(name, header, image):
+    """
+    Builds the profile for an upload, keeping the picture in the upload store
+    (by content, not by the client's filename) only if PERSIST_UPLOADS is on.
+    """
+    if not settings.PERSIST_UPLOADS:
+        return Profile(name=name, header=header, picture=image.source_path)
+    profile_image_path = get_upload_store().put(image.data, image.digest)
+    return Profile(name=name, header=header, picture=profile_image_path)
+
+
+def render_color_palette_job(name, header, filename, image_bytes):
+    image = ProfileImage.from_bytes(image_bytes, source_path=filename)
+    save_profile_picture(name, header, image)
+    generator = ColorPaletteGenerator(image)
+    return generator.get_palette().model_dump_json().encode("utf-8")
+
+
+def render_color_palette_preview_job(filename, image_bytes):
+    """Draws the palette swatches next to the picture and returns them as PNG bytes."""
+    image = ProfileImage.from_bytes(image_bytes, source_path=filename)
+    generator = ColorPaletteGenerator(image)
+    return encode_image(generator.render_preview(), "png")
+
+
+def render_banner_job(name, header, filename, image_bytes, image_format="png", quality=None, size=BANNER_SIZE,
+                      tier=None):
+    """
+    Renders the banner at size (width, height), with the segmentation tier's
+    backend, and returns it encoded in the requested format.
+    """
+    image = ProfileImage.from_bytes(image_bytes, source_path=filename)
+    profile = save_profile_picture(name, header, image)
+    # the palette is a memoized stage of the render, so an edited name or header skips it
+    poster = render_banner(profile, image=image, size=size, tier=tier)
+    return encode_image(poster, image_format, quality)
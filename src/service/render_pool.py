@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.config import settings
+
+_cancel_event = contextvars.ContextVar("render_cancel_event", default=None)
+
+
+class RenderPoolFull(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Render queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RenderTimeout(Exception):
+    """Raised when a job did not finish within the pool's per-job timeout."""
+
+
+class RenderCancelled(Exception):
+    """Raised inside a running job whose caller went away."""
+
+
+def raise_if_cancelled():
+    """Checkpoint for long renders: stops the job early once its caller has gone away."""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise RenderCancelled()
+
+
+def _run_in_thread(cancel_event, fn, args):
+    token = _cancel_event.set(cancel_event)
+    try:
+        return fn(*args)
+    finally:
+        _cancel_event.reset(token)
+
+
+class RenderPool:
+    """
+    Runs CPU-bound renders on a thread or process pool so the event loop stays free.
+
+    Parameters:
+    - kind (str): "thread" or "process".
+    - workers (int): Number of renders running at once.
+    - max_queue (int): Number of renders allowed to wait for a worker; beyond that `run` raises RenderPoolFull.
+    - timeout (float): Seconds a job may take from submission before `run` raises RenderTimeout.
+    - initializer (callable): Warm-up run once per worker process, or once in this process for threads.
+    """
+
+    def __init__(self, kind=None, workers=None, max_queue=None, timeout=None, initializer=None):
+        self.kind = kind or settings.RENDER_POOL_KIND
+        if self.kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported render pool kind '{self.kind}'. Use 'thread' or 'process'.")
+        self.workers = max(1, workers or settings.RENDER_WORKERS)
+        self.max_queue = settings.RENDER_QUEUE_SIZE if max_queue is None else max_queue
+        self.timeout = settings.RENDER_JOB_TIMEOUT if timeout is None else timeout
+        self.initializer = initializer
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._average_seconds = 1.0
+        self._stats = {"submitted": 0, "completed": 0, "rejected": 0, "timed_out": 0, "cancelled": 0}
+
+    @property
+    def capacity(self):
+        return self.workers + self.max_queue
+
+    def start(self):
+        if self._executor is not None:
+            return self
+        if self.kind == "process":
+            # spawn, not fork: onnxruntime and numba thread pools don't survive a fork
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        else:
+            if self.initializer is not None:
+                self.initializer()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+        return self
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def retry_after(self):
+        """Seconds until a slot is likely free, from the running average job duration."""
+        with self._lock:
+            backlog = max(1, self._pending - self.workers + 1)
+            return max(1, math.ceil(self._average_seconds * backlog / self.workers))
+
+    def _release(self, started):
+        with self._lock:
+            self._pending -= 1
+            if started is not None:
+                self._stats["completed"] += 1
+                elapsed = time.perf_counter() - started
+                self._average_seconds = 0.8 * self._average_seconds + 0.2 * elapsed
+
+    async def run(self, fn, *args, timeout=None):
+        """Runs fn(*args) on the pool and returns its result; timeout overrides the pool's per-job timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        self.start()
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._stats["rejected"] += 1
+                full = True
+            else:
+                self._pending += 1
+                self._stats["submitted"] += 1
+                full = False
+        if full:
+            raise RenderPoolFull(self.retry_after())
+
+        cancel_event = threading.Event()
+        started = time.perf_counter()
+        if self.kind == "process":
+            future = self._executor.submit(fn, *args)
+        else:
+            future = self._executor.submit(_run_in_thread, cancel_event, fn, args)
+        # the slot is held until the worker is really done, not until we stop waiting
+        future.add_done_callback(lambda f: self._release(None if f.cancelled() else started))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            future.cancel()
+            with self._lock:
+                self._stats["timed_out"] += 1
+            raise RenderTimeout(f"Render did not finish within {timeout}s")
+        except asyncio.CancelledError:
+            cancel_event.set()
+            future.cancel()
+            with self._lock:
+                self._stats["cancelled"] += 1
+            raise
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                kind=self.kind,
+                workers=self.workers,
+                max_queue=self.max_queue,
+                pending=self._pending,
+                average_seconds=round(self._average_seconds, 3),
+            )
+        return stats
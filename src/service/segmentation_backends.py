@@ -0,0 +1,187 @@
+import logging
+import threading
+
+from src.config import settings
+from src.service.metrics import instrument
+from src.service.segmentation_batcher import MicroBatcher
+from src.service.segmentation_service import SegmentationSessionPool, get_session_pool, init_session_pool
+from src.utils.bg_remover import predict_mask, predict_mask_classic, predict_masks
+
+logger = logging.getLogger(__name__)
+
+# Segmentation tiers, from the best masks to the fastest:
+# - default: the configured rembg model (SEGMENTATION_MODEL, u2net unless changed)
+# - quantized: a size-reduced U2-Net (SEGMENTATION_QUANTIZED_MODEL, rembg's "silueta" or a path to a quantized .onnx)
+# - fast: the lightweight U2-Net-P (SEGMENTATION_FAST_MODEL)
+# - classic: no model, color keying and GrabCut (see predict_mask_classic)
+TIERS = ("default", "quantized", "fast", "classic")
+# picks a tier from the render queue depth (see choose_tier)
+AUTO = "auto"
+
+
+class SegmentationBackend:
+    """
+    A way of computing foreground masks. model_name identifies the masks it
+    produces (it is part of the mask cache keys), predict_mask(image, target_size)
+    returns a single-channel uint8 mask at target_size.
+    """
+
+    tier = None
+    model_name = None
+
+    def predict_mask(self, image, target_size):
+        raise NotImplementedError
+
+    def start(self, warm_up=True):
+        return self
+
+    def close(self):
+        pass
+
+
+class RembgBackend(SegmentationBackend):
+    """
+    A rembg model behind a session pool. Without a model_name this is the
+    process-wide pool of segmentation_service (the default tier).
+
+    With SEGMENTATION_BATCH_SIZE above 1, concurrent predictions are collected
+    by a MicroBatcher and run as one batched inference per session.
+    """
+
+    def __init__(self, tier, model_name=None):
+        self.tier = tier
+        self._model_name = model_name
+        self._pool = None
+        self._batcher = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._model_name is None:
+            return get_session_pool()
+        with self._lock:
+            if self._pool is None:
+                self._pool = SegmentationSessionPool(self._model_name)
+            return self._pool
+
+    @property
+    def model_name(self):
+        return self.pool.model_name
+
+    def predict_mask(self, image, target_size):
+        if settings.SEGMENTATION_BATCH_SIZE <= 1:
+            with self.pool.session() as session:
+                return predict_mask(image, target_size, session=session)
+        return self.batcher.submit((image, target_size))
+
+    @property
+    def batcher(self):
+        pool = self.pool
+        with self._lock:
+            if self._batcher is None:
+                self._batcher = MicroBatcher(self._predict_batch, workers=pool.size, label=pool.model_name)
+            return self._batcher
+
+    def _predict_batch(self, items):
+        """Masks of (image, target_size) items, one inference per distinct target_size."""
+        masks = [None] * len(items)
+        with self.pool.session() as session:
+            for target_size in dict.fromkeys(size for _, size in items):
+                indices = [index for index, (_, size) in enumerate(items) if size == target_size]
+                for index, mask in zip(indices, predict_masks([items[i][0] for i in indices], target_size, session)):
+                    masks[index] = mask
+        return masks
+
+    def start(self, warm_up=True):
+        if self._model_name is None:
+            init_session_pool(warm_up=warm_up)
+        else:
+            self.pool.start(warm_up=warm_up)
+        return self
+
+    def close(self):
+        with self._lock:
+            batcher, self._batcher = self._batcher, None
+        if batcher is not None:
+            batcher.close()
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+            self._pool = None
+
+
+class ClassicBackend(SegmentationBackend):
+    tier = "classic"
+    model_name = "classic-grabcut"
+
+    def predict_mask(self, image, target_size):
+        return predict_mask_classic(image, target_size)
+
+
+def _create_backend(tier):
+    if tier == "default":
+        return RembgBackend(tier)
+    if tier == "quantized":
+        return RembgBackend(tier, settings.SEGMENTATION_QUANTIZED_MODEL)
+    if tier == "fast":
+        return RembgBackend(tier, settings.SEGMENTATION_FAST_MODEL)
+    return ClassicBackend()
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(tier=None):
+    """Returns the (process-wide) backend of a tier, the configured one by default."""
+    tier = choose_tier(tier)
+    with _backends_lock:
+        if tier not in _backends:
+            _backends[tier] = _create_backend(tier)
+        return _backends[tier]
+
+
+def predict_tier_mask(image, target_size, tier=None):
+    """Runs the tier's segmentation, recorded as the "segment_<tier>" stage in /metrics."""
+    backend = get_backend(tier)
+    with instrument(f"segment_{backend.tier}", image.shape):
+        return backend.predict_mask(image, target_size)
+
+
+def choose_tier(requested=None, queue_depth=0):
+    """
+    Resolves a requested tier (SEGMENTATION_TIER when None) to one of TIERS.
+
+    "auto" trades mask quality for latency as renders queue up: the default tier
+    while fewer than SEGMENTATION_AUTO_FAST_AT renders wait, the fast one up to
+    SEGMENTATION_AUTO_CLASSIC_AT, and the model-free classic tier beyond that.
+    Raises ValueError for an unknown tier.
+    """
+    tier = (requested or settings.SEGMENTATION_TIER).lower()
+    if tier == AUTO:
+        if queue_depth >= settings.SEGMENTATION_AUTO_CLASSIC_AT:
+            return "classic"
+        if queue_depth >= settings.SEGMENTATION_AUTO_FAST_AT:
+            return "fast"
+        return "default"
+    if tier not in TIERS:
+        raise ValueError(f"Unknown segmentation tier '{tier}'. Use one of: {', '.join(TIERS + (AUTO,))}.")
+    return tier
+
+
+def init_backends(warm_up=None):
+    """
+    Starts the backends renders will use: the configured tier, or with "auto"
+    every tier auto may pick. Call at process start, like init_session_pool.
+    """
+    warm_up = settings.SEGMENTATION_WARMUP if warm_up is None else warm_up
+    tiers = ("default", "fast", "classic") if settings.SEGMENTATION_TIER.lower() == AUTO else (choose_tier(),)
+    for tier in tiers:
+        get_backend(tier).start(warm_up=warm_up)
+
+
+def shutdown_backends():
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.close()
+        _backends.clear()
@@ -0,0 +1,122 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from src.config import settings
+from src.service.metrics import segmentation_batch_size, segmentation_queue_seconds
+
+logger = logging.getLogger(__name__)
+
+# put on the queue by close(), one per worker
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Groups concurrent calls into batches.
+
+    submit(item) blocks until item's result is ready. A batch starts as soon as
+    max_batch items wait, or max_wait seconds after its first item arrived,
+    whichever comes first. When no other call is in progress (the CLI, batch
+    workers, a quiet server) nothing can join the batch, so it starts at once.
+    run_batch(items) must return one result per item, in order; an exception
+    it raises is raised by every submit of the batch.
+
+    Each of the workers threads runs one batch at a time, so up to workers
+    batches (one per segmentation session) run at once.
+
+    Parameters:
+    - run_batch (callable): Computes the results of a list of items.
+    - max_batch (int): Largest batch (SEGMENTATION_BATCH_SIZE by default).
+    - max_wait (float): Seconds the first item of a batch waits for others (SEGMENTATION_BATCH_WAIT_MS by default).
+    - workers (int): Batches run at once.
+    - label (str): "model" label of the batch size and queue wait metrics.
+    """
+
+    def __init__(self, run_batch, max_batch=None, max_wait=None, workers=1, label=""):
+        self.run_batch = run_batch
+        self.max_batch = max(1, settings.SEGMENTATION_BATCH_SIZE if max_batch is None else max_batch)
+        self.max_wait = settings.SEGMENTATION_BATCH_WAIT_MS / 1000 if max_wait is None else max_wait
+        self.workers = max(1, workers)
+        self.label = label
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        # submit calls in progress, including those whose items are being run
+        self._active = 0
+
+    def submit(self, item):
+        self._ensure_started()
+        future = Future()
+        with self._lock:
+            self._active += 1
+        try:
+            self._queue.put((item, future, time.perf_counter()))
+            return future.result()
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"segmentation-batcher-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _collect(self):
+        """Blocks for the next batch; returns None when the batcher is closed."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            # nobody else is submitting, waiting would only delay this batch
+            if remaining <= 0 or self._active <= len(batch):
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                # the stop is for this worker, but after this batch
+                self._queue.put(_STOP)
+                break
+            batch.append(entry)
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            if settings.METRICS_ENABLED:
+                segmentation_batch_size.observe(len(batch), self.label)
+                for _, _, queued in batch:
+                    segmentation_queue_seconds.observe(started - queued, self.label)
+            logger.debug(">> Segmenting a batch of %d", len(batch))
+
+            try:
+                results = self.run_batch([item for item, _, _ in batch])
+            except BaseException as error:
+                for _, future, _ in batch:
+                    future.set_exception(error)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def close(self):
+        """Stops the workers once the batches already queued are done."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            for _ in threads:
+                self._queue.put(_STOP)
+        for thread in threads:
+            thread.join()
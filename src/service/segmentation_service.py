@@ -0,0 +1,115 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+
+from PIL import Image
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def new_session(model_name):
+    """
+    Creates a rembg session. rembg (and onnxruntime) is imported here, the first time a session is built.
+    A path to an .onnx file loads it as a custom U2-Net export (for example an int8-quantized one).
+    """
+    from src.utils.fused_compositing import prefer_omp_threading
+    prefer_omp_threading()  # rembg imports numba
+    from rembg import new_session as rembg_new_session
+    if model_name.endswith(".onnx"):
+        return rembg_new_session("u2net_custom", model_path=model_name)
+    return rembg_new_session(model_name)
+
+
+class SegmentationSessionPool:
+    """A fixed-size pool of rembg sessions that are built once and shared between renders."""
+
+    def __init__(self, model_name=None, size=None):
+        self.model_name = model_name or settings.SEGMENTATION_MODEL
+        self.size = max(1, size or settings.SEGMENTATION_POOL_SIZE)
+        self._sessions = queue.Queue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def started(self):
+        return self._started
+
+    def start(self, warm_up=True):
+        """Creates every session in the pool (only once) and optionally runs a warm-up inference."""
+        with self._lock:
+            if self._started:
+                return self
+            logger.info("> Creating %d '%s' segmentation session(s)...", self.size, self.model_name)
+            for _ in range(self.size):
+                self._sessions.put(new_session(self.model_name))
+            self._started = True
+
+        if warm_up:
+            self.warm_up()
+        return self
+
+    def warm_up(self):
+        """Runs one small inference on each session so the first real request doesn't pay for it."""
+        logger.info("> Warming up segmentation sessions...")
+        blank = Image.new("RGB", (320, 320))
+        sessions = [self._sessions.get() for _ in range(self.size)]
+        try:
+            for session in sessions:
+                session.predict(blank)
+        finally:
+            for session in sessions:
+                self._sessions.put(session)
+        logger.info(">> Segmentation sessions ready.")
+
+    @contextmanager
+    def session(self, timeout=None):
+        """Borrows a session for the duration of the block; blocks while all sessions are busy."""
+        if not self._started:
+            self.start(warm_up=False)
+        session = self._sessions.get(timeout=timeout)
+        try:
+            yield session
+        finally:
+            self._sessions.put(session)
+
+    def close(self):
+        with self._lock:
+            while not self._sessions.empty():
+                self._sessions.get_nowait()
+            self._started = False
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def init_session_pool(model_name=None, size=None, warm_up=None):
+    """Builds the process-wide session pool. Call once at process start (server lifespan, CLI)."""
+    global _pool
+    if warm_up is None:
+        warm_up = settings.SEGMENTATION_WARMUP
+    with _pool_lock:
+        if _pool is None:
+            _pool = SegmentationSessionPool(model_name, size)
+        pool = _pool
+    return pool.start(warm_up=warm_up)
+
+
+def get_session_pool():
+    """Returns the process-wide session pool, creating it lazily if nobody initialised it."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SegmentationSessionPool()
+        return _pool
+
+
+def shutdown_session_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
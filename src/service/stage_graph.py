@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.config import settings
+from src.service.metrics import instrument, stage_cache
+from src.service.render_cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+def _value_bytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_value_bytes(item) for item in value)
+    return 64
+
+
+def _freeze(value):
+    """Stage outputs are shared between renders, so arrays are made read-only."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+class StageGraph:
+    """
+    Memoizes the stages of a render by a hash of their inputs.
+
+    A stage's key is the hash of its name and its inputs, and the inputs of a
+    downstream stage include the keys of the stages it reads from. A change to
+    any input therefore changes the key of that stage and of everything after
+    it, while the stages upstream of the change are served from memory.
+
+    Outputs are kept in a byte-bounded LRU and returned read-only; a stage that
+    draws on an upstream output must copy it first.
+
+    Parameters:
+    - max_bytes (int): Memory budget for stage outputs, 0 disables memoization.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = settings.STAGE_CACHE_MEMORY_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._outputs = OrderedDict()
+        self._bytes = 0
+        self._stats = {}
+
+    def run(self, stage, inputs, compute, trace=None, shape=None):
+        """
+        Returns (key, output) of the stage, calling compute() only when no output
+        is memoized for these inputs.
+
+        Parameters:
+        - stage (str): Stage name, part of the key.
+        - inputs (tuple): Everything the output depends on (upstream keys, colors, sizes, text...).
+        - compute (callable): Builds the output.
+        - trace (list | None): When given, gets one {"stage", "key", "recomputed", "ms"} entry appended.
+        - shape (tuple | None): Shape of the image the stage works on, for the stage metrics.
+        """
+        key = make_cache_key(stage, *inputs)
+        started = time.perf_counter()
+        with self._lock:
+            entry = self._outputs.get(key)
+            if entry is not None:
+                self._outputs.move_to_end(key)
+            counts = self._stats.setdefault(stage, {"computed": 0, "reused": 0})
+            if entry is not None:
+                counts["reused"] += 1
+
+        if entry is not None:
+            output = entry[0]
+            stage_cache.inc(stage, "reused")
+            logger.debug(">> Stage '%s' reused", stage)
+        else:
+            stage_cache.inc(stage, "computed")
+            with instrument(stage, shape):
+                output = _freeze(compute())
+            size = _value_bytes(output)
+            with self._lock:
+                counts["computed"] += 1
+                if size <= self.max_bytes:
+                    if key in self._outputs:
+                        self._bytes -= self._outputs.pop(key)[1]
+                    self._outputs[key] = (output, size)
+                    self._bytes += size
+                    while self._bytes > self.max_bytes:
+                        _, (_, evicted) = self._outputs.popitem(last=False)
+                        self._bytes -= evicted
+
+        if trace is not None:
+            trace.append({"stage": stage, "key": key, "recomputed": entry is None,
+                          "ms": round((time.perf_counter() - started) * 1000, 3)})
+        return key, output
+
+    def stats(self):
+        """Per-stage counts of computed and reused outputs, plus memory use."""
+        with self._lock:
+            return {
+                "stages": {stage: dict(counts) for stage, counts in self._stats.items()},
+                "entries": len(self._outputs),
+                "bytes": self._bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._outputs.clear()
+            self._bytes = 0
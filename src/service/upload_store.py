@@ -0,0 +1,188 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# uploads are read in chunks of this size, so the event loop is never blocked on one large read
+CHUNK_SIZE = 1024 * 1024
+
+# file signature -> extension of the stored picture (the client's filename is not trusted)
+SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF8", ".gif"),
+    (b"BM", ".bmp"),
+)
+
+
+# what put() writes: <sha256><ext> in <aa>/<bb> shards, through .upload-*.tmp files
+SHARD_NAME = re.compile(r"[0-9a-f]{2}")
+STORED_NAME = re.compile(r"[0-9a-f]{64}\.[a-z]+")
+TEMP_NAME = re.compile(r"\.upload-.*\.tmp")
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload is larger than MAX_UPLOAD_BYTES."""
+
+
+def sniff_extension(data):
+    """The file extension matching the picture's content, ".img" when it is not recognised."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    for signature, extension in SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    return ".img"
+
+
+async def read_upload(upload, max_bytes=None, chunk_size=CHUNK_SIZE):
+    """
+    Reads an UploadFile chunk by chunk, hashing it on the way.
+
+    Raises UploadTooLargeError as soon as more than max_bytes (MAX_UPLOAD_BYTES
+    by default) have been read, without reading the rest.
+
+    Returns:
+    - tuple: (data, sha256 hex digest)
+    """
+    max_bytes = settings.MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    too_large = UploadTooLargeError(f">> Error: Upload is larger than {max_bytes / 1024 ** 2:.3g} MiB.")
+    if upload.size is not None and upload.size > max_bytes:
+        raise too_large
+
+    digest = hashlib.sha256()
+    chunks, total = [], 0
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise too_large
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
+
+
+def _shard_dirs(path):
+    with os.scandir(path) as entries:
+        return [entry for entry in entries if entry.is_dir(follow_symlinks=False) and SHARD_NAME.fullmatch(entry.name)]
+
+
+class UploadStore:
+    """
+    Content-addressed store of uploaded pictures.
+
+    A picture is stored once, at <root>/<aa>/<bb>/<sha256><ext>, whatever the
+    client called it, so identical uploads share one file and different uploads
+    with the same filename never overwrite each other. Files are written to a
+    temporary name and renamed into place, so a half-written picture is never
+    visible, and concurrent writers of the same picture (threads or processes)
+    simply produce the same file.
+
+    Storing a picture again refreshes its modification time; cleanup() removes
+    pictures nobody has uploaded for ttl seconds.
+
+    Parameters:
+    - root (str): Directory of the store (UPLOAD_FOLDER by default).
+    - ttl (float): Seconds a picture is kept after its last upload, 0 keeps them forever.
+    """
+
+    def __init__(self, root=None, ttl=None):
+        self.root = settings.UPLOAD_FOLDER if root is None else root
+        self.ttl = settings.UPLOAD_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._stats = {"stored": 0, "deduplicated": 0, "expired": 0}
+
+    def path_for(self, digest, extension):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + extension)
+
+    def put(self, data, digest=None):
+        """Stores the picture (once per content) and returns its path."""
+        digest = digest or hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, sniff_extension(data))
+        try:
+            # keeps it from expiring
+            os.utime(path)
+            self._count("deduplicated")
+            return path
+        except FileNotFoundError:
+            pass
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._count("stored")
+        logger.debug(">> Upload stored at: %s", path)
+        return path
+
+    def cleanup(self, now=None):
+        """
+        Removes pictures (and leftover temporary files) older than ttl. Returns how many were removed.
+
+        Only files in the store's own layout are considered (see _store_files), so
+        anything else kept under root, like uploads saved by filename before the
+        store existed, is left alone.
+        """
+        if self.ttl <= 0 or not os.path.isdir(self.root):
+            return 0
+        cutoff = (time.time() if now is None else now) - self.ttl
+        removed = 0
+        for path in self._store_files():
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass  # removed by another process
+        self._count("expired", removed)
+        if removed:
+            logger.info(">> Removed %d expired upload(s)", removed)
+        return removed
+
+    def _store_files(self):
+        """Paths of <aa>/<bb>/<sha256><ext> pictures, and of .upload-*.tmp files in those shards."""
+        for first in _shard_dirs(self.root):
+            for second in _shard_dirs(first.path):
+                with os.scandir(second.path) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        stored = STORED_NAME.fullmatch(name) and name.startswith(first.name + second.name)
+                        if entry.is_file(follow_symlinks=False) and (stored or TEMP_NAME.fullmatch(name)):
+                            yield entry.path
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_upload_store():
+    """The process-wide upload store, created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = UploadStore()
+        return _store
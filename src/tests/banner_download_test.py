@@ -0,0 +1,32 @@
+from urllib.parse import unquote
+
+from fastapi.testclient import TestClient
+
+from src import server
+from src.config import settings
+from src.server import content_disposition
+from src.service import banner_service
+from src.tests.conftest import PATTERN, PICTURE
+
+
+def test_non_ascii_upload_names_are_encoded(fake_segmentation, banner_cwd, monkeypatch):
+    monkeypatch.setattr(settings, "PERSIST_UPLOADS", False)
+    monkeypatch.setattr(settings, "SAVE_BANNERS", False)
+    monkeypatch.setattr(banner_service, "DEFAULT_PATTERN", PATTERN)
+
+    with TestClient(server.app) as client, open(PICTURE, "rb") as picture:
+        response = client.post("/banner", data={"name": "Jane Doe", "header": "Engineer", "preview": "true"},
+                               files={"picture": ("фото 😀.jpg", picture, "image/png")})
+
+    assert response.status_code == 200
+    disposition = response.headers["content-disposition"]
+    assert disposition.startswith('inline; filename="')
+    assert unquote(disposition.split("filename*=UTF-8''")[1]) == "фото 😀-banner.png"
+
+
+def test_header_breaking_characters_are_removed():
+    disposition = content_disposition('a"b\\c\r\nX-Injected: 1.png')
+
+    assert "\r" not in disposition and "\n" not in disposition
+    assert disposition.startswith('inline; filename="a_b_cX-Injected: 1.png"; ')
+    disposition.encode("latin-1")
@@ -0,0 +1,27 @@
+import numpy as np
+
+from src.models.ColorPaletteGenerator import ColorPaletteGenerator
+from src.models.Profile import Profile
+from src.models.ProfileImage import ProfileImage
+from src.service import banner_service
+from src.service.banner_service import BANNER_SIZE, PREVIEW_SIZE, render_banner
+from src.service.stage_graph import StageGraph
+from src.tests.conftest import PATTERN, PICTURE
+
+
+def test_preview_renders_the_same_composition_smaller(fake_segmentation, banner_cwd, monkeypatch):
+    monkeypatch.setattr(banner_service, "banner_stages", StageGraph())
+    profile = Profile(name="Jane Doe", header="Software Engineer", picture=PICTURE, pattern_bg=PATTERN)
+    image = ProfileImage.from_path(PICTURE)
+    palette = ColorPaletteGenerator(image)
+
+    preview = render_banner(profile, palette, image, size=PREVIEW_SIZE)
+    full = render_banner(profile, palette, image, size=BANNER_SIZE)
+
+    assert preview.shape == (PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3)
+    assert full.shape == (BANNER_SIZE[1], BANNER_SIZE[0], 3)
+    # the full render reuses the cutout the preview segmented
+    assert fake_segmentation.calls == 1
+
+    downscaled = full.reshape(PREVIEW_SIZE[1], 4, PREVIEW_SIZE[0], 4, 3).mean(axis=(1, 3))
+    assert np.abs(downscaled - preview).mean() < 8
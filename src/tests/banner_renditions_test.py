@@ -0,0 +1,59 @@
+import pytest
+
+from src.models.ColorPaletteGenerator import ColorPaletteGenerator
+from src.models.Profile import Profile
+from src.models.ProfileImage import ProfileImage
+from src.config import settings
+from src.service import banner_service, pattern_service
+from src.service.banner_service import BANNER_SIZE, RENDITION_SIZES, parse_size, preview_size_for, \
+    render_banner_renditions, scale_layout
+from src.service.stage_graph import StageGraph
+from src.tests.conftest import PATTERN, PICTURE
+
+
+def test_renditions_share_segmentation_and_pattern_work(fake_segmentation, banner_cwd, monkeypatch):
+    monkeypatch.setattr(pattern_service, "pattern_cache", pattern_service.PatternLayerCache())
+    monkeypatch.setattr(banner_service, "banner_stages", StageGraph())
+    base_builds = []
+    build_pattern_base = pattern_service.build_pattern_base
+    monkeypatch.setattr(pattern_service, "build_pattern_base",
+                        lambda *args: base_builds.append(args) or build_pattern_base(*args))
+    profile = Profile(name="Jane Doe", header="Software Engineer", picture=PICTURE, pattern_bg=PATTERN)
+    image = ProfileImage.from_path(PICTURE)
+
+    renditions = render_banner_renditions(profile, ["linkedin", "social", "640x640"], ColorPaletteGenerator(image),
+                                          image)
+
+    assert list(renditions) == [(1584, 396), (1200, 627), (640, 640)]
+    for (width, height), poster in renditions.items():
+        assert poster.shape == (height, width, 3)
+    assert fake_segmentation.calls == 1
+    assert len(base_builds) == 1
+
+
+def test_portrait_sizes_crop_the_subject_without_numba(fake_segmentation, banner_cwd, monkeypatch):
+    monkeypatch.setattr(settings, "USE_NUMBA", False)
+    monkeypatch.setattr(banner_service, "banner_stages", StageGraph())
+    profile = Profile(name="Jane Doe", header="Software Engineer", picture=PICTURE, pattern_bg=PATTERN)
+    image = ProfileImage.from_path(PICTURE)
+
+    renditions = render_banner_renditions(profile, ["540x960"], ColorPaletteGenerator(image), image)
+
+    assert renditions[(540, 960)].shape == (960, 540, 3)
+
+
+def test_layout_matches_the_original_pixels_at_full_size():
+    assert scale_layout("title", BANNER_SIZE) == {"max_font_size": 500, "min_font_size": 60, "letter_spacing": 30,
+                                                  "y_offset": -200}
+    assert scale_layout("name", BANNER_SIZE) == {"font_size": 70, "letter_spacing": 10, "y_offset": 350}
+    assert scale_layout("header", BANNER_SIZE) == {"max_font_size": 50, "min_font_size": 10, "letter_spacing": 0,
+                                                   "y_offset": 450}
+
+
+def test_parse_size():
+    assert parse_size("linkedin") == RENDITION_SIZES["linkedin"]
+    assert parse_size("800X450") == (800, 450)
+    assert preview_size_for((1584, 396)) == (480, 120)
+    for bad in ("huge", "10x10", "100x", "9000x100"):
+        with pytest.raises(ValueError):
+            parse_size(bad)
@@ -0,0 +1,95 @@
+import json
+import os
+
+import pytest
+
+from src.cli.make_banner_cli import generate_batch
+from src.config import settings
+from src.service import batch_service, segmentation_backends
+from src.tests.conftest import PATTERN, PICTURE
+
+
+def write_manifest(tmp_path):
+    manifest = tmp_path / "people.csv"
+    manifest.write_text(
+        "name,header,picture,pattern\n"
+        "Yaro,Engineer,pictures/yaro-1.png,\n"
+        "Ana,Designer,pictures/ana.png,patterns/dots.png\n"
+    )
+    return str(manifest)
+
+
+def test_manifest_paths_resolve_against_the_manifest(tmp_path):
+    rows = batch_service.read_manifest(write_manifest(tmp_path))
+
+    assert [row["name"] for row in rows] == ["Yaro", "Ana"]
+    assert rows[0]["picture"] == os.path.join(str(tmp_path), "pictures", "yaro-1.png")
+    assert rows[0]["pattern"] is None
+    assert rows[1]["pattern"] == os.path.join(str(tmp_path), "patterns", "dots.png")
+    assert rows[0]["id"] == batch_service.read_manifest(write_manifest(tmp_path))[0]["id"]
+
+
+def test_jsonl_manifest_matches_csv(tmp_path):
+    jsonl = tmp_path / "people.jsonl"
+    jsonl.write_text(
+        json.dumps({"name": "Yaro", "header": "Engineer", "picture": "pictures/yaro-1.png"}) + "\n"
+    )
+
+    assert batch_service.read_manifest(str(jsonl))[0]["id"] == \
+        batch_service.read_manifest(write_manifest(tmp_path))[0]["id"]
+
+
+def test_rerun_skips_completed_rows(tmp_path):
+    rows = batch_service.read_manifest(write_manifest(tmp_path))
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    with open(output_dir / batch_service.JOURNAL_NAME, "w") as journal:
+        for row in rows:
+            output = batch_service.output_path_for(row, str(output_dir))
+            open(output, "wb").close()
+            journal.write(json.dumps({"id": row["id"], "status": "ok", "output": output, "seconds": 1.0}) + "\n")
+        journal.write('{"id": "trunc')
+
+    summary = batch_service.run_batch(str(tmp_path / "people.csv"), str(output_dir))
+
+    assert summary["skipped"] == 2 and summary["rendered"] == 0 and summary["failed"] == 0
+    assert json.loads((output_dir / "summary.json").read_text())["total"] == 2
+
+
+def test_failed_row_is_reported_not_raised(tmp_path):
+    row = batch_service.read_manifest(write_manifest(tmp_path))[0]
+
+    result = batch_service.render_manifest_row(row, str(tmp_path / "out.png"))
+
+    assert result["status"] == "failed"
+    assert result["error"]
+    assert not os.path.exists(tmp_path / "out.png")
+
+
+def test_rows_render_with_the_requested_tier(tmp_path, banner_cwd, monkeypatch):
+    monkeypatch.setattr(segmentation_backends, "_backends", {})
+    row = {"id": "row", "name": "Yaro", "header": "Engineer", "picture": PICTURE, "pattern": PATTERN}
+
+    result = batch_service.render_manifest_row(row, str(tmp_path / "out.png"), tier="classic")
+
+    assert result["status"] == "ok", result
+    assert list(segmentation_backends._backends) == ["classic"]
+
+
+def test_workers_warm_the_configured_tier(monkeypatch):
+    monkeypatch.setattr(settings, "SEGMENTATION_TIER", "default")
+    monkeypatch.setattr(settings, "SEGMENTATION_POOL_SIZE", 4)
+    monkeypatch.setattr(segmentation_backends, "_backends", {})
+
+    batch_service.init_batch_worker("classic")
+
+    assert list(segmentation_backends._backends) == ["classic"]
+    assert settings.SEGMENTATION_POOL_SIZE == 1
+
+
+def test_missing_manifest_exits_with_an_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exited:
+        generate_batch([str(tmp_path / "missing.csv")])
+
+    assert exited.value.code == 2
+    assert "manifest address invalid" in capsys.readouterr().err
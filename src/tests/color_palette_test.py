@@ -1,7 +1,9 @@
+import io
+
 import numpy as np
 from src.utils.color_wheel import get_complementary_color, get_colors, get_dominant_color
 from src.utils.file_utils import load_image_rgb
-from src.utils.file_utils import get_unique_filename
+from src.utils.file_utils import save_output
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use("Agg")
@@ -41,8 +43,9 @@ def plot_colors(image_path):
 
     # Adjust layout and save the figure
     plt.tight_layout()
-    path = get_unique_filename("../assets/color-palette", "pallet.png")
-    plt.savefig(path)  # Save the figure as an image
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format="png")  # Save the figure as an image
+    path = save_output(buffer.getvalue(), "../assets/color-palette", "pallet.png")
     print(f"✅ Color visualization saved as '{path}'")
 
 
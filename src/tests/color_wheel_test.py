@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from src.utils import color_wheel
+
+
+def random_colors(n=200):
+    return np.random.default_rng(7).integers(0, 256, (n, 3)).astype(np.uint8)
+
+
+@pytest.mark.parametrize("array_fn, scalar_fn", [
+    (color_wheel.complementary_colors_array, color_wheel.get_complementary_color),
+    (color_wheel.increase_saturation_array, color_wheel.increase_saturation),
+    (color_wheel.increase_luminance_array, color_wheel.increase_luminance),
+])
+def test_array_versions_match_single_colors(array_fn, scalar_fn):
+    colors = random_colors()
+
+    batched = array_fn(colors)
+
+    assert batched.shape == colors.shape
+    for color, expected in zip(colors, batched):
+        assert tuple(scalar_fn(color)) == tuple(expected)
+
+
+def test_harmonies_keep_the_input_color_first():
+    colors = random_colors()
+
+    analogous = color_wheel.analogous_colors_array(colors, n=4, offset=20)
+
+    assert analogous.shape == (len(colors), 4, 3)
+    assert np.array_equal(analogous[:, 0], color_wheel.hsv_to_bgr_array(color_wheel.bgr_to_hsv_array(colors)))
+    assert [tuple(c) for c in color_wheel.get_analogous_colors(colors[5], 4, 20)] == \
+        [tuple(c) for c in analogous[5]]
+
+
+def test_hue_rotation_wraps_around_the_wheel():
+    red_magenta = color_wheel.hsv_to_bgr((170, 255, 255))
+
+    complementary_hue = color_wheel.bgr_to_hsv(color_wheel.get_complementary_color(red_magenta))[0]
+
+    assert abs(int(complementary_hue) - 80) <= 1
+
+
+def test_contrast_ratios():
+    ratios = color_wheel.contrast_ratio_array([(0, 0, 0), (255, 255, 255), (120, 120, 120)], (255, 255, 255))
+
+    assert ratios[0] == pytest.approx(21.0)
+    assert ratios[1] == pytest.approx(1.0)
+    assert color_wheel.get_contrast_ratio((120, 120, 120), (255, 255, 255)) == pytest.approx(ratios[2])
+
+
+def test_text_colors_pick_the_readable_option():
+    left = np.array([(10, 10, 10), (250, 250, 250)])
+
+    text = color_wheel.text_colors_array(left, left)
+
+    assert tuple(text[0]) == (255, 247, 216)
+    assert tuple(text[1]) == (41, 41, 28)
+    assert color_wheel.get_text_color((10, 10, 10), (10, 10, 10)) == (255, 247, 216)
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from src import server
+from src.service import cutout_service, segmentation_backends, segmentation_service
+from src.service.render_cache import RenderCache
+from src.service.segmentation_service import SegmentationSessionPool
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+# absolute, so they stay valid in tests that run from banner_cwd
+PICTURE = os.path.join(REPO_ROOT, "assets", "sample-image", "yaro-1.png")
+PATTERN = os.path.join(REPO_ROOT, "assets", "background-patterns", "default.png")
+
+
+class CountingSession:
+    """Stand-in for a rembg session that counts its predictions: the mask is the grayscale picture."""
+
+    calls = 0
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def predict(self, img, *args, **kwargs):
+        CountingSession.calls += 1
+        return [img.convert("L")]
+
+
+@pytest.fixture
+def fake_segmentation(monkeypatch):
+    """Segments with CountingSession and an empty, memory-only cutout cache; returns CountingSession."""
+    CountingSession.calls = 0
+    monkeypatch.setattr(segmentation_service, "new_session", CountingSession)
+    monkeypatch.setattr(segmentation_service, "_pool", SegmentationSessionPool(size=1))
+    monkeypatch.setattr(segmentation_backends, "_backends", {})
+    monkeypatch.setattr(cutout_service, "cutout_cache", RenderCache(disk_dir=None))
+    return CountingSession
+
+
+@pytest.fixture(autouse=True)
+def cache_dirs(monkeypatch, tmp_path):
+    """Gives the server's render cache and the cutout cache empty disk tiers under tmp_path."""
+    monkeypatch.setattr(server, "render_cache", RenderCache(disk_dir=str(tmp_path / "render-cache")))
+    monkeypatch.setattr(cutout_service, "cutout_cache", RenderCache(disk_dir=str(tmp_path / "cutout-cache")))
+
+
+@pytest.fixture
+def banner_cwd(monkeypatch):
+    """Runs the test from src/tests, where the banner fonts' relative path resolves."""
+    monkeypatch.chdir(os.path.join(REPO_ROOT, "src", "tests"))
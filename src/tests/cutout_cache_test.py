@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.models.ProfileImage import ProfileImage
+from src.service import cutout_service
+from src.service.cutout_service import SEGMENTATION_SIZE
+from src.service.render_cache import RenderCache
+from src.utils.bg_remover import predict_mask, subject_from_mask
+
+
+def test_segmentation_runs_once_per_image(fake_segmentation):
+    image = ProfileImage.from_path("assets/sample-image/yaro-1.png")
+    other = ProfileImage.from_path("assets/sample-image/yaro-2.png")
+
+    first = cutout_service.get_subject(image.unchanged, image.digest)
+    second = cutout_service.get_subject(image.unchanged.copy(), image.digest)
+    cutout_service.get_subject(other.unchanged, other.digest)
+
+    assert fake_segmentation.calls == 2
+    assert np.array_equal(first, second)
+
+
+def test_cached_subject_matches_direct_segmentation(fake_segmentation, monkeypatch, tmp_path):
+    monkeypatch.setattr(cutout_service, "cutout_cache", RenderCache(disk_dir=str(tmp_path)))
+    image = ProfileImage.from_path("assets/sample-image/yaro-2.png")
+
+    mask = predict_mask(image.unchanged, SEGMENTATION_SIZE, session=fake_segmentation("u2net"))
+    expected = subject_from_mask(image.unchanged, mask, SEGMENTATION_SIZE)
+    cutout_service.get_subject(image.unchanged, image.digest)
+    # a fresh process only has the disk tier
+    monkeypatch.setattr(cutout_service, "cutout_cache", RenderCache(disk_dir=str(tmp_path)))
+    cached = cutout_service.get_subject(image.unchanged, image.digest)
+
+    assert np.array_equal(expected, cached)
+    assert fake_segmentation.calls == 2
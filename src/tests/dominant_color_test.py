@@ -0,0 +1,37 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.models.ColorPaletteGenerator import ColorPaletteGenerator
+from src.utils.color_wheel import get_dominant_color
+from src.utils.dominant_color import DOMINANT_COLOR_STRATEGIES
+
+
+def two_tone_image():
+    image = np.zeros((200, 200, 3), dtype=np.uint8)
+    image[:, :140] = (200, 40, 30)
+    image[:, 140:] = (20, 90, 180)
+    return image
+
+
+@pytest.mark.parametrize("strategy", sorted(DOMINANT_COLOR_STRATEGIES))
+def test_strategies_find_the_majority_color(strategy):
+    color = get_dominant_color(two_tone_image(), strategy)
+
+    assert np.abs(np.int16(color) - (200, 40, 30)).max() <= 2
+
+
+@pytest.mark.parametrize("strategy", sorted(DOMINANT_COLOR_STRATEGIES))
+def test_strategies_are_deterministic(strategy):
+    image = cv2.cvtColor(cv2.imread("assets/sample-image/yaro4.png"), cv2.COLOR_BGR2RGB)
+
+    assert len({get_dominant_color(image, strategy) for _ in range(5)}) == 1
+
+
+def test_palette_generator_uses_the_selected_strategy():
+    generator = ColorPaletteGenerator("assets/sample-image/yaro-1.png", strategy="histogram")
+
+    assert generator.strategy == "histogram"
+    assert generator.primary_color == get_dominant_color(generator.image.rgb, "histogram")
+    with pytest.raises(ValueError):
+        ColorPaletteGenerator(generator.image, strategy="nope")
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.utils.file_utils import encode_image, resolve_image_format
+
+
+def sample_poster():
+    return cv2.imread("assets/sample-image/yaro-1.png")
+
+
+def test_png_is_lossless_at_any_compression():
+    poster = sample_poster()
+
+    fast = encode_image(poster, "png", 1)
+    small = encode_image(poster, "png", 9)
+
+    assert len(small) <= len(fast)
+    decoded = cv2.imdecode(np.frombuffer(small, np.uint8), cv2.IMREAD_UNCHANGED)
+    assert np.array_equal(decoded, poster)
+
+
+@pytest.mark.parametrize("image_format, magic", [("jpeg", b"\xff\xd8"), ("webp", b"RIFF")])
+def test_lossy_formats(image_format, magic):
+    poster = sample_poster()
+
+    data = encode_image(poster, image_format, 80)
+
+    assert data.startswith(magic)
+    assert cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR).shape == poster.shape
+
+
+def test_format_defaults_and_validation():
+    assert resolve_image_format("JPG", None)[0] == "jpeg"
+    assert resolve_image_format("png", None)[1] is not None
+    with pytest.raises(ValueError):
+        resolve_image_format("gif")
+    with pytest.raises(ValueError):
+        resolve_image_format("png", 12)
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.utils.bg_remover import cutout_from_mask
+from src.utils.fused_compositing import NUMBA_AVAILABLE, composite_cutout_fused, composite_cutout_reference
+
+pytestmark = pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba is not installed")
+
+
+def sample_cutout():
+    image = cv2.imread("assets/sample-image/yaro-1.png", cv2.IMREAD_UNCHANGED)
+    gray = cv2.cvtColor(image[:, :, :3], cv2.COLOR_BGR2GRAY)
+    mask = (cv2.resize(gray, (500, 500)) > 60).astype(np.uint8) * 255
+    return cutout_from_mask(image, mask)
+
+
+def random_background(height=1080, width=1920):
+    return np.random.RandomState(0).randint(0, 256, (height, width, 4)).astype(np.uint8)
+
+
+@pytest.mark.parametrize("tint, contrast, strength", [
+    ((200, 100, 50), 0.1, 0.2),
+    ((0, 0, 0), 0.0, 0.0),
+    ((255, 255, 255), 1.0, 1.0),
+])
+def test_fused_kernel_matches_reference(tint, contrast, strength):
+    cutout = sample_cutout()
+    background = random_background()
+
+    expected = composite_cutout_reference(background.copy(), cutout.copy(), tint, contrast, strength)
+    actual = composite_cutout_fused(background.copy(), cutout.copy(), tint, contrast, strength)
+
+    diff = np.abs(expected.astype(np.int16) - actual)
+    # the kernel resizes before filtering instead of after, so only rounding differs
+    assert diff.max() <= 4
+    assert diff.mean() < 0.25
+
+
+def test_fused_kernel_crops_cutouts_wider_than_canvas():
+    wide = np.full((100, 400, 4), 255, dtype=np.uint8)
+    background = random_background(100, 200)
+
+    result = composite_cutout_fused(background.copy(), wide, (0, 0, 0), 0.0, 0.0)
+
+    # top row is fully opaque white across the whole canvas, alpha untouched
+    assert (result[0, :, :3] == 255).all()
+    assert np.array_equal(result[:, :, 3], background[:, :, 3])
@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.models.ProfileImage import ImageTooLargeError, ProfileImage, plan_decode, read_image_header
+from src.utils.fused_compositing import composite_cutout
+
+
+def encode(image, extension):
+    ok, data = cv2.imencode(extension, image)
+    assert ok
+    return data.tobytes()
+
+
+def test_header_is_read_without_decoding():
+    data = open("assets/sample-image/yaro-1.png", "rb").read()
+    header = read_image_header(data)
+
+    assert (header["width"], header["height"], header["format"]) == (1024, 1024, "PNG")
+    assert header["channels"] == cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED).shape[2]
+
+
+def test_large_jpeg_is_decoded_reduced():
+    image = np.zeros((4400, 4000, 3), dtype=np.uint8)
+    cv2.circle(image, (2000, 2200), 1500, (40, 180, 220), -1)
+
+    profile_image = ProfileImage.from_bytes(encode(image, ".jpg"))
+
+    # 4400 / 4 = 1100 is the smallest decode still at least 1080 tall
+    assert profile_image.reduction == 4
+    assert profile_image.unchanged.shape == (1100, 1000, 3)
+
+
+def test_small_images_are_decoded_as_is():
+    image = np.full((600, 800, 4), 128, dtype=np.uint8)
+    profile_image = ProfileImage.from_bytes(encode(image, ".png"))
+
+    assert profile_image.reduction == 1
+    assert profile_image.unchanged.shape == (600, 800, 4)
+
+
+def test_images_over_the_limits_are_reduced_or_rejected():
+    jpeg = {"width": 12000, "height": 9000, "channels": 3, "bytes_per_channel": 1, "format": "JPEG"}
+    png = dict(jpeg, format="PNG")
+
+    assert plan_decode(jpeg, target_height=10 ** 6, max_pixels=50_000_000, max_bytes=2 ** 30) == 2
+    with pytest.raises(ImageTooLargeError):
+        plan_decode(png, target_height=10 ** 6, max_pixels=50_000_000, max_bytes=2 ** 30)
+    with pytest.raises(ImageTooLargeError):
+        plan_decode(jpeg, target_height=10 ** 6, max_pixels=1_000_000, max_bytes=2 ** 30)
+
+
+def test_subject_is_scaled_once_to_its_placement():
+    background = np.zeros((1080, 1920, 4), dtype=np.uint8)
+    subject = np.zeros((500, 500, 4), dtype=np.uint8)
+    subject[:, :, 3] = 255
+    subject[:, :, 1] = 200
+
+    # a 1:2 portrait squashed to the square segmentation size comes out 1:2 again
+    poster = composite_cutout(background.copy(), subject, (0, 0, 0), contrast_amount=0, tint_strength=0,
+                              use_numba=False, aspect_ratio=0.5)
+    columns = np.flatnonzero(poster[:, :, 1].max(axis=0))
+
+    assert columns.size == 540
@@ -0,0 +1,90 @@
+import io
+import json
+import logging
+import tracemalloc
+
+import numpy as np
+
+from src.config import settings
+from src.service import metrics
+from src.service.metrics import Counter, Histogram, MetricsRegistry, instrument
+from src.utils.log_utils import JsonFormatter
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test.", (0.1, 1.0), ("stage",))
+    counter = registry.counter("test_total", "Test.", ("stage",))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "cutout")
+    counter.inc("cutout")
+
+    text = registry.render()
+
+    assert 'test_seconds_bucket{stage="cutout",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="cutout",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="cutout",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="cutout"} 3' in text
+    assert 'test_total{stage="cutout"} 1' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test.", ("model",))
+    counter.inc('C:\\models\\"u2net"\nv2')
+
+    text = registry.render()
+
+    assert 'test_total{model="C:\\\\models\\\\\\"u2net\\"\\nv2"} 1' in text
+    assert len(text.splitlines()) == 3
+
+
+def test_instrument_records_latency_size_and_peak_memory(monkeypatch):
+    seconds = Histogram("s", "", metrics.LATENCY_BUCKETS, ("stage",))
+    pixels = Histogram("p", "", metrics.PIXEL_BUCKETS, ("stage",))
+    peak = Histogram("b", "", metrics.BYTES_BUCKETS, ("stage",))
+    monkeypatch.setattr(metrics, "stage_seconds", seconds)
+    monkeypatch.setattr(metrics, "stage_input_pixels", pixels)
+    monkeypatch.setattr(metrics, "stage_peak_bytes", peak)
+    monkeypatch.setattr(settings, "TRACE_MEMORY", True)
+
+    try:
+        with instrument("outer", (100, 200, 3)):
+            with instrument("inner"):
+                np.ones(8 * 1024 * 1024, dtype=np.uint8)
+    finally:
+        tracemalloc.stop()
+
+    assert seconds._series[("outer",)][2] == 1 and seconds._series[("inner",)][2] == 1
+    assert pixels._series[("outer",)][1] == 100 * 200
+    # the 8 MiB buffer only lived inside "inner", and still counts towards "outer"'s peak
+    assert peak._series[("inner",)][1] >= 8 * 1024 * 1024
+    assert peak._series[("outer",)][1] >= 8 * 1024 * 1024
+
+
+def test_instrument_is_a_no_op_when_disabled(monkeypatch):
+    counter = Counter("c", "")
+    monkeypatch.setattr(settings, "METRICS_ENABLED", False)
+    monkeypatch.setattr(metrics, "stage_seconds", counter)  # observe() would fail on a Counter
+
+    with instrument("cutout", (10, 10)):
+        pass
+
+
+def test_stage_logs_are_structured_json():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger("src.service.metrics")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        with instrument("cutout", (10, 20, 4)):
+            pass
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry["stage"] == "cutout" and entry["height"] == 10 and entry["width"] == 20
+    assert entry["ms"] >= 0 and entry["level"] == "info"
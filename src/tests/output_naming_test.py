@@ -0,0 +1,32 @@
+import os
+import threading
+
+from src.utils.file_utils import save_encoded_poster, save_output
+
+
+def test_outputs_are_named_by_content_in_shards(tmp_path):
+    first = save_output(b"poster one", str(tmp_path), "jane-banner.png")
+    again = save_output(b"poster one", str(tmp_path), "jane-banner.png")
+    other = save_output(b"poster two", str(tmp_path), "jane-banner.png")
+
+    assert first == again != other
+    shard, name = os.path.relpath(first, tmp_path).split(os.sep)
+    assert len(shard) == 2 and name.startswith("jane-banner-") and name.endswith(".png")
+    assert open(other, "rb").read() == b"poster two"
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".tmp")]
+
+
+def test_concurrent_saves_never_share_a_name(tmp_path):
+    paths = []
+
+    def save(index):
+        paths.append(save_encoded_poster(f"banner {index}".encode(), "uploads/jane.jpg", "png", str(tmp_path)))
+
+    threads = [threading.Thread(target=save, args=(index,)) for index in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(paths)) == 32
+    assert {open(path, "rb").read() for path in paths} == {f"banner {index}".encode() for index in range(32)}
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from src.models.ColorPaletteGenerator import ColorPaletteGenerator
+from src.utils.palette_preview import MARGIN, SWATCH_SIZE, render_palette_swatches
+
+
+def test_swatches_are_filled_with_their_colors():
+    colors = [(255, 0, 0), (0, 128, 255)]
+
+    preview = render_palette_swatches(colors, ["Red", "Blue"])
+
+    center = MARGIN + SWATCH_SIZE // 2
+    assert tuple(preview[center, center]) == (0, 0, 255)  # BGR
+    assert tuple(preview[center, preview.shape[1] - MARGIN - SWATCH_SIZE // 2]) == (255, 128, 0)
+
+
+def test_palette_preview_includes_the_picture():
+    generator = ColorPaletteGenerator("assets/sample-image/yaro-1.png")
+
+    with_image = generator.render_preview()
+    swatches_only = generator.render_preview(with_image=False)
+
+    assert with_image.shape[0] == swatches_only.shape[0]
+    assert with_image.shape[1] > swatches_only.shape[1]
+    assert with_image.dtype == np.uint8
+
+
+def test_server_does_not_import_matplotlib():
+    code = "import sys, src.server; print('matplotlib' in sys.modules)"
+    env = dict(os.environ, BANNER_RENDER_CACHE_DIR="", BANNER_CUTOUT_CACHE_DIR="")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    assert result.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,57 @@
+import os
+
+import cv2
+import numpy as np
+
+from src.service.pattern_service import PatternLayerCache, build_pattern_layer, pattern_version
+
+
+def write_pattern(path, value, mtime):
+    cv2.imwrite(str(path), np.full((64, 96, 3), value, dtype=np.uint8))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_layer_is_built_once_at_output_size(tmp_path):
+    pattern = tmp_path / "pattern.png"
+    write_pattern(pattern, 40, 1_000_000_000)
+    cache = PatternLayerCache(max_layers=4)
+
+    layer = cache.get(str(pattern), (320, 180))
+
+    assert layer.shape == (180, 320, 4)
+    assert not layer.flags.writeable
+    assert cache.get(str(pattern), (320, 180)) is layer
+    assert np.array_equal(layer, build_pattern_layer(str(pattern), (320, 180)))
+
+
+def test_layer_is_rebuilt_when_pattern_file_changes(tmp_path):
+    pattern = tmp_path / "pattern.png"
+    write_pattern(pattern, 40, 1_000_000_000)
+    cache = PatternLayerCache(max_layers=4)
+    before = cache.get(str(pattern), (320, 180))
+
+    write_pattern(pattern, 120, 2_000_000_000)
+    after = cache.get(str(pattern), (320, 180))
+
+    assert after is not before
+    assert not np.array_equal(after, before)
+
+
+def test_pattern_version_changes_with_the_file(tmp_path):
+    pattern = tmp_path / "pattern.png"
+    assert pattern_version(str(pattern)) == (str(pattern), None)
+
+    write_pattern(pattern, 40, 1_000_000_000)
+    before = pattern_version(str(pattern))
+    write_pattern(pattern, 120, 2_000_000_000)
+
+    assert before == (str(pattern), 1_000_000_000)
+    assert pattern_version(str(pattern)) == (str(pattern), 2_000_000_000)
+
+
+def test_warm_builds_every_pattern_in_directory(tmp_path):
+    write_pattern(tmp_path / "a.png", 40, 1_000_000_000)
+    write_pattern(tmp_path / "b.png", 80, 1_000_000_000)
+    (tmp_path / "notes.txt").write_text("")
+
+    assert PatternLayerCache().warm(str(tmp_path), (320, 180)) == 2
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+from src.service.render_cache import RenderCache, make_cache_key
+
+
+def test_cache_key_depends_on_every_part():
+    assert make_cache_key(b"img", "Jane", "Dev") == make_cache_key(b"img", "Jane", "Dev")
+    assert make_cache_key(b"img", "Jane", "Dev") != make_cache_key(b"img", "Jane", "Designer")
+    assert make_cache_key("ab", "c") != make_cache_key("a", "bc")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = RenderCache(memory_max_bytes=10, disk_dir=None)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.get("a")
+    cache.put("c", b"cccc")
+
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("b") is None
+    assert cache.stats()["memory_evictions"] == 1
+
+
+def test_disk_tier_survives_restart_and_evicts_by_size(tmp_path):
+    cache = RenderCache(memory_max_bytes=100, disk_dir=str(tmp_path), disk_max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.put("c", b"cccc")
+
+    reopened = RenderCache(memory_max_bytes=100, disk_dir=str(tmp_path), disk_max_bytes=10)
+    assert reopened.get("a") is None
+    assert reopened.get("c") == b"cccc"
+    assert reopened.stats()["disk_hits"] == 1
+    assert cache.stats()["disk_evictions"] == 1
+
+
+def test_identical_requests_share_one_render():
+    cache = RenderCache(disk_dir=None)
+    calls = []
+    results = []
+
+    def render():
+        calls.append(1)
+        time.sleep(0.1)
+        return b"banner"
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", render)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [b"banner"] * 5
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_async_lookup_reads_the_disk_tier_off_the_event_loop(tmp_path):
+    RenderCache(disk_dir=str(tmp_path)).put("key", b"banner")
+    cache = RenderCache(disk_dir=str(tmp_path))
+    reader_threads = []
+    read_disk = cache._read_disk
+
+    def recording_read_disk(key):
+        reader_threads.append(threading.current_thread())
+        return read_disk(key)
+
+    async def render():
+        raise AssertionError("the disk tier has this render")
+
+    cache._read_disk = recording_read_disk
+    assert asyncio.run(cache.get_or_compute_async("key", render)) == b"banner"
+    assert reader_threads and threading.main_thread() not in reader_threads
+    assert cache.stats()["disk_hits"] == 1 and cache.stats()["misses"] == 0
+
+
+def test_disk_directory_is_created_by_the_first_write(tmp_path):
+    disk_dir = tmp_path / "render-cache"
+    cache = RenderCache(disk_dir=str(disk_dir))
+    assert not disk_dir.exists()
+
+    cache.put("key", b"banner")
+
+    assert RenderCache(disk_dir=str(disk_dir)).get("key") == b"banner"
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.service.render_cache import RenderCache
+from src.service.render_pool import RenderPool, RenderPoolFull, RenderTimeout, raise_if_cancelled
+
+
+def slow_job(seconds, started=None, finished=None):
+    if started is not None:
+        started.set()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        raise_if_cancelled()
+        time.sleep(0.01)
+    if finished is not None:
+        finished.set()
+    return b"done"
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        pool = RenderPool(kind="thread", workers=1, max_queue=1, timeout=5).start()
+        running = [asyncio.ensure_future(pool.run(slow_job, 0.3)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(RenderPoolFull) as rejected:
+            await pool.run(slow_job, 0.3)
+        assert rejected.value.retry_after >= 1
+        assert await asyncio.gather(*running) == [b"done", b"done"]
+        assert pool.stats()["pending"] == 0
+        pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_job_timeout_stops_the_worker():
+    async def scenario():
+        pool = RenderPool(kind="thread", workers=1, max_queue=0, timeout=0.1).start()
+        finished = threading.Event()
+        with pytest.raises(RenderTimeout):
+            await pool.run(slow_job, 1.0, None, finished)
+        await asyncio.sleep(0.1)
+        assert not finished.is_set()
+        assert pool.stats()["pending"] == 0
+        pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_render_is_cancelled_only_when_every_waiter_left():
+    async def scenario():
+        pool = RenderPool(kind="thread", workers=1, max_queue=0, timeout=5).start()
+        cache = RenderCache(disk_dir=None)
+        started, finished = threading.Event(), threading.Event()
+
+        def compute():
+            return pool.run(slow_job, 0.3, started, finished)
+
+        first = asyncio.ensure_future(cache.get_or_compute_async("key", compute))
+        second = asyncio.ensure_future(cache.get_or_compute_async("key", compute))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        assert await second == b"done"
+        assert finished.is_set()
+
+        started.clear()
+        finished.clear()
+        cache.clear()
+        lonely = asyncio.ensure_future(cache.get_or_compute_async("key", compute))
+        await asyncio.sleep(0.05)
+        lonely.cancel()
+        await asyncio.sleep(0.1)
+        assert started.is_set() and not finished.is_set()
+        pool.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,119 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+from rembg.sessions.u2net import U2netSession
+
+from src.service.metrics import segmentation_batch_size
+from src.service.segmentation_batcher import MicroBatcher
+from src.utils.bg_remover import predict_mask, predict_masks
+
+
+def submit_concurrently(batcher, items):
+    results = {}
+    barrier = threading.Barrier(len(items))
+
+    def call(item):
+        barrier.wait()
+        results[item] = batcher.submit(item)
+
+    threads = [threading.Thread(target=call, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_are_batched_and_answered_in_order():
+    batches = []
+    release = threading.Event()
+
+    def run_batch(items):
+        batches.append(list(items))
+        release.wait()
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(run_batch, max_batch=4, max_wait=0.5, label="test-batching")
+    try:
+        # the worker is busy with a first call while the others queue up
+        first = threading.Thread(target=batcher.submit, args=(-1,))
+        first.start()
+        while not batches:
+            time.sleep(0.001)
+        results = {}
+        caller = threading.Thread(target=lambda: results.update(submit_concurrently(batcher, list(range(8)))))
+        caller.start()
+        while batcher._queue.qsize() < 8:
+            time.sleep(0.001)
+        release.set()
+        caller.join()
+        first.join()
+    finally:
+        batcher.close()
+
+    assert results == {item: item * 10 for item in range(8)}
+    assert [len(batch) for batch in batches] == [1, 4, 4]
+    assert "banner_segmentation_batch_size_count{model=\"test-batching\"} 3" in segmentation_batch_size.render()
+
+
+def test_a_lone_call_does_not_wait_for_a_batch():
+    batcher = MicroBatcher(lambda items: items, max_batch=8, max_wait=5.0)
+    try:
+        started = time.perf_counter()
+        assert batcher.submit("alone") == "alone"
+        assert time.perf_counter() - started < 1.0
+    finally:
+        batcher.close()
+
+
+def test_errors_reach_every_caller():
+    def run_batch(items):
+        if "bad" in items:
+            raise ValueError("inference failed")
+        return items
+
+    batcher = MicroBatcher(run_batch, max_batch=8, max_wait=0.01)
+    try:
+        assert batcher.submit("alone") == "alone"
+        with pytest.raises(ValueError):
+            batcher.submit("bad")
+    finally:
+        batcher.close()
+
+
+class _Input:
+    name = "input.1"
+    shape = ["batch_size", 3, 320, 320]
+
+
+class FakeOnnxSession:
+    """Stands in for onnxruntime: a deterministic per-image function of the input."""
+
+    runs = 0
+
+    def get_inputs(self):
+        return [_Input()]
+
+    def run(self, output_names, feeds):
+        FakeOnnxSession.runs += 1
+        batch = next(iter(feeds.values()))
+        return [np.tanh(batch.mean(axis=1, keepdims=True) * batch[:, :1] * 3)]
+
+
+def test_batched_inference_matches_one_image_at_a_time():
+    session = U2netSession.__new__(U2netSession)
+    session.inner_session = FakeOnnxSession()
+    images = [cv2.imread(f"assets/sample-image/{name}", cv2.IMREAD_UNCHANGED)
+              for name in ("yaro-1.png", "yaro-2.png", "yaro-3.png")]
+
+    FakeOnnxSession.runs = 0
+    batched = predict_masks(images, (500, 500), session)
+    assert FakeOnnxSession.runs == 1
+
+    one_by_one = [predict_mask(image, (500, 500), session=session) for image in images]
+    for mask, expected in zip(batched, one_by_one):
+        assert mask.shape == (500, 500)
+        assert np.array_equal(mask, expected)
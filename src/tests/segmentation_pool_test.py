@@ -0,0 +1,58 @@
+import threading
+
+from src.service import segmentation_service
+from src.service.segmentation_service import SegmentationSessionPool
+
+
+class FakeSession:
+    created = 0
+
+    def __init__(self, model_name):
+        FakeSession.created += 1
+        self.model_name = model_name
+        self.predictions = 0
+
+    def predict(self, img, *args, **kwargs):
+        self.predictions += 1
+        return [img.convert("L")]
+
+
+def test_sessions_are_created_once_and_warmed_up(monkeypatch):
+    FakeSession.created = 0
+    monkeypatch.setattr(segmentation_service, "new_session", FakeSession)
+
+    pool = SegmentationSessionPool(model_name="u2netp", size=2).start(warm_up=True)
+    pool.start(warm_up=True)
+
+    assert FakeSession.created == 2
+    with pool.session() as first, pool.session() as second:
+        assert first is not second
+        assert first.model_name == "u2netp"
+        assert first.predictions == 1 and second.predictions == 1
+
+
+def test_sessions_are_never_shared_between_threads(monkeypatch):
+    monkeypatch.setattr(segmentation_service, "new_session", FakeSession)
+    pool = SegmentationSessionPool(size=2).start(warm_up=False)
+
+    in_use = set()
+    lock = threading.Lock()
+    errors = []
+
+    def render():
+        for _ in range(50):
+            with pool.session() as session:
+                with lock:
+                    if id(session) in in_use:
+                        errors.append(session)
+                    in_use.add(id(session))
+                with lock:
+                    in_use.discard(id(session))
+
+    threads = [threading.Thread(target=render) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
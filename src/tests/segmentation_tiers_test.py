@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.benchmarks import segmentation_benchmark
+from src.config import settings
+from src.service import cutout_service, segmentation_backends, segmentation_service
+from src.service.render_cache import RenderCache
+from src.service.segmentation_backends import choose_tier, get_backend
+from src.service.segmentation_service import SegmentationSessionPool
+from src.utils.bg_remover import predict_mask_classic
+
+
+class ThresholdSession:
+    """Stand-in for a rembg session: the foreground is every pixel brighter than 60."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def predict(self, img, *args, **kwargs):
+        from PIL import Image
+        return [Image.fromarray(np.uint8(np.asarray(img.convert("L")) > 60) * 255)]
+
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    monkeypatch.setattr(segmentation_service, "new_session", ThresholdSession)
+    monkeypatch.setattr(segmentation_service, "_pool", SegmentationSessionPool(size=1))
+    monkeypatch.setattr(segmentation_backends, "_backends", {})
+    monkeypatch.setattr(cutout_service, "cutout_cache", RenderCache(disk_dir=None))
+
+
+def portrait():
+    """A dark head and shoulders on a plain light background, and its true mask at 500x500."""
+    image = np.full((800, 600, 3), (230, 235, 240), dtype=np.uint8)
+    truth = np.zeros((800, 600), dtype=np.uint8)
+    for canvas, color in ((image, (40, 90, 160)), (truth, 255)):
+        cv2.circle(canvas, (300, 350), 180, color, -1)
+        cv2.rectangle(canvas, (200, 500), (400, 800), color, -1)
+    return image, cv2.resize(truth, (500, 500))
+
+
+def test_classic_tier_keys_out_plain_backgrounds():
+    image, truth = portrait()
+
+    mask = predict_mask_classic(image, (500, 500))
+
+    assert mask.shape == (500, 500) and mask.dtype == np.uint8
+    assert segmentation_benchmark.mask_iou(mask, truth) > 0.95
+
+
+def test_tiers_are_resolved_per_request_or_by_load(monkeypatch):
+    assert choose_tier("Fast") == "fast"
+    assert choose_tier(None) == settings.SEGMENTATION_TIER
+    with pytest.raises(ValueError):
+        choose_tier("huge")
+
+    monkeypatch.setattr(settings, "SEGMENTATION_AUTO_FAST_AT", 2)
+    monkeypatch.setattr(settings, "SEGMENTATION_AUTO_CLASSIC_AT", 5)
+    assert [choose_tier("auto", depth) for depth in (0, 1, 2, 4, 5, 40)] == [
+        "default", "default", "fast", "fast", "classic", "classic"]
+
+
+def test_masks_are_cached_per_tier(fake_models):
+    image, _ = portrait()
+
+    default = cutout_service.get_cutout_mask(image, "portrait", tier="default")
+    fast = cutout_service.get_cutout_mask(image, "portrait", tier="fast")
+
+    assert get_backend("fast").model_name == settings.SEGMENTATION_FAST_MODEL
+    assert get_backend("default").model_name != get_backend("fast").model_name
+    assert np.array_equal(default, fast)  # same stand-in model, cached under different keys
+    assert cutout_service.cutout_cache.stats()["memory_entries"] == 2
+
+
+def test_benchmark_reports_latency_and_iou(fake_models):
+    results = segmentation_benchmark.run(["assets/sample-image/yaro-2.png"], tiers=["fast", "classic"], repeat=1)
+
+    summary = results["summary"]
+    assert list(summary) == ["default", "fast", "classic"]
+    assert summary["default"]["mean_iou_vs_default"] == 1.0
+    assert summary["fast"]["mean_iou_vs_default"] == 1.0
+    assert 0 <= summary["classic"]["mean_iou_vs_default"] < 1
+    assert all(entry["median_ms"] >= 0 for entry in summary.values())
@@ -0,0 +1,23 @@
+import numpy as np
+
+from src.benchmarks.stage_benchmark import GOLDEN_SIZE, STAGES, compare_runs, compare_to_golden, load_inputs, run
+
+
+def test_every_stage_matches_its_golden_image():
+    results = run(sizes=[32], repeat=1)
+
+    assert {(t["stage"], t["input"]) for t in results["timings"]} == {
+        (stage, input_name) for stage in STAGES for input_name in ("synthetic", "sample")}
+    assert [entry for entry in results["parity"] if not entry["ok"]] == []
+    assert all(speedup == 1.0 for speedup in compare_runs(results, results).values())
+
+
+def test_parity_check_catches_changed_pixels():
+    image = load_inputs(GOLDEN_SIZE)["sample"]
+    output = STAGES["decrease_contrast"](image)
+    output[0, 0, 0] = output[0, 0, 0] ^ 0x80
+
+    entry = compare_to_golden("decrease_contrast", "sample", output)
+
+    assert not entry["ok"] and entry["max_diff"] >= 64
+    assert not compare_to_golden("decrease_contrast", "sample", np.zeros((2, 2, 4), np.uint8))["ok"]
@@ -0,0 +1,49 @@
+import numpy as np
+
+from src.models.Profile import Profile
+from src.models.ProfileImage import ProfileImage
+from src.service import banner_service
+from src.service.banner_service import render_banner
+from src.service.stage_graph import StageGraph
+from src.tests.conftest import PATTERN, PICTURE
+
+SIZE = (480, 270)
+
+
+def recomputed(trace):
+    return [entry["stage"] for entry in trace if entry["recomputed"]]
+
+
+def test_editing_text_only_recomputes_the_text_stage(fake_segmentation, banner_cwd, monkeypatch):
+    monkeypatch.setattr(banner_service, "banner_stages", StageGraph(max_bytes=64 * 1024 * 1024))
+    image = ProfileImage.from_path(PICTURE)
+
+    first_trace, second_trace, third_trace = [], [], []
+    first = render_banner(Profile(name="Jane Doe", header="Software Engineer", picture=PICTURE, pattern_bg=PATTERN),
+                          image=image, size=SIZE, trace=first_trace)
+    second = render_banner(Profile(name="John Doe", header="Software Engineer", picture=PICTURE, pattern_bg=PATTERN),
+                           image=image, size=SIZE, trace=second_trace)
+    again = render_banner(Profile(name="Jane Doe", header="Software Engineer", picture=PICTURE, pattern_bg=PATTERN),
+                          image=image, size=SIZE, trace=third_trace)
+
+    assert recomputed(first_trace) == ["palette", "cutout", "background", "pattern", "headline", "composite", "text"]
+    assert recomputed(second_trace) == ["text"]
+    assert recomputed(third_trace) == []
+    assert fake_segmentation.calls == 1
+    assert not np.array_equal(first, second)
+    assert again is first and not again.flags.writeable
+    assert banner_service.banner_stages.stats()["stages"]["text"] == {"computed": 2, "reused": 1}
+
+
+def test_outputs_over_the_budget_are_evicted_oldest_first():
+    graph = StageGraph(max_bytes=250)
+    graph.run("stage", (1,), lambda: np.zeros(100, dtype=np.uint8))
+    graph.run("stage", (2,), lambda: np.zeros(100, dtype=np.uint8))
+    graph.run("stage", (3,), lambda: np.zeros(100, dtype=np.uint8))
+
+    trace = []
+    graph.run("stage", (1,), lambda: np.zeros(100, dtype=np.uint8), trace)
+    graph.run("stage", (3,), lambda: np.zeros(100, dtype=np.uint8), trace)
+
+    assert [entry["recomputed"] for entry in trace] == [True, False]
+    assert graph.stats()["bytes"] <= 250
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+from src.benchmarks.startup_benchmark import find_regressions
+
+HEAVY_MODULES = ("rembg", "onnxruntime", "numba", "matplotlib")
+
+
+def imported_heavy_modules(module):
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ, BANNER_RENDER_CACHE_DIR="", BANNER_CUTOUT_CACHE_DIR="")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+    return result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+
+
+def test_server_import_defers_heavy_modules():
+    assert imported_heavy_modules("src.server") == ""
+
+
+def test_cli_import_defers_heavy_modules():
+    assert imported_heavy_modules("src.cli.make_banner_cli") == ""
+
+
+def test_regressions_against_budget_and_baseline():
+    budgets = {"import_server": 1.0}
+    baseline = {"import_server": 0.5, "first_banner": 2.0}
+
+    assert find_regressions({"import_server": 0.55, "first_banner": 2.1}, budgets, baseline) == []
+    assert len(find_regressions({"import_server": 1.2, "first_banner": 2.1}, budgets, baseline)) == 2
+    assert len(find_regressions({"import_server": 0.5, "first_banner": 3.0}, budgets, baseline)) == 1
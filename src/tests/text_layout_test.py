@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from src.utils import text_utils
+from src.utils.text_utils import draw_spaced_text, fit_font_size, get_font, get_glyph_bbox, measure_spaced_text
+
+FONT = "assets/Anton-Regular.ttf"
+
+
+def linear_fit(text, max_width, max_font_size, min_font_size, letter_spacing):
+    """The original step-down-by-5 search, loading a fresh font at every step."""
+    font_size = max_font_size
+    last_tried = font_size
+    while font_size > min_font_size:
+        font = ImageFont.truetype(FONT, font_size)
+        last_tried = font_size
+        width = sum((font.getbbox(c)[2] - font.getbbox(c)[0]) + letter_spacing for c in text) - letter_spacing
+        if width < max_width:
+            break
+        font_size -= 5
+    return last_tried
+
+
+def test_binary_search_matches_linear_scan():
+    cases = [
+        ("#OPEN TO WORK", 1728, 500, 60, 30),
+        ("Unity Developer | Software Engineer | Technical Game Designer", 1728, 50, 10, 0),
+        ("Backend Developer | Skilled in Next.js, Django, Express.js, Java, AWS | Master's in CS " * 3, 1728, 50, 10, 0),
+        ("W" * 200, 400, 90, 60, 10),
+        ("x", 1728, 500, 60, 30),
+    ]
+    for text, max_width, max_size, min_size, spacing in cases:
+        expected = linear_fit(text, max_width, max_size, min_size, spacing)
+        assert fit_font_size(text, max_width, max_size, min_size, spacing, font_path=FONT) == expected
+
+
+def test_fonts_and_glyph_widths_are_cached():
+    font = get_font(FONT, 70)
+
+    assert get_font(FONT, 70) is font
+    assert measure_spaced_text(font, "AB", 10) == (
+        font.getbbox("A")[2] - font.getbbox("A")[0] + 10 + font.getbbox("B")[2] - font.getbbox("B")[0]
+    )
+
+
+def test_font_and_glyph_caches_are_bounded(monkeypatch):
+    monkeypatch.setattr(text_utils, "MAX_FONTS", 3)
+    monkeypatch.setattr(text_utils, "MAX_GLYPH_BOXES", 5)
+    monkeypatch.setattr(text_utils, "_fonts", threading.local())
+    monkeypatch.setattr(text_utils, "_glyph_boxes", OrderedDict())
+    first = get_font(FONT, 11)
+    for size in range(12, 20):
+        get_glyph_bbox(get_font(FONT, size), "A")
+
+    assert len(text_utils._fonts.cache) == 3
+    assert len(text_utils._glyph_boxes) == 5
+    assert get_font(FONT, 11) is not first
+
+
+def test_layer_text_matches_drawing_on_the_full_frame():
+    font = get_font(FONT, 70)
+    frame = np.random.RandomState(0).randint(0, 256, (300, 800, 4)).astype(np.uint8)
+    frame[:, :, 3] = 255
+    ink = (200, 40, 90, 255)
+
+    expected = Image.fromarray(frame.copy())
+    draw = ImageDraw.Draw(expected)
+    x = 30
+    for char in "JANE DOE | Dev":
+        draw.text((x, 250), char, font=font, fill=ink[:3])
+        x += font.getbbox(char)[2] - font.getbbox(char)[0] + 10
+
+    actual = draw_spaced_text(frame.copy(), font, "JANE DOE | Dev", 30, 250, 10, ink)
+
+    assert np.array_equal(np.asarray(expected), actual)
@@ -0,0 +1,69 @@
+import asyncio
+import hashlib
+import io
+import os
+import time
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from src.service.upload_store import UploadStore, UploadTooLargeError, read_upload
+
+PICTURE = open("assets/sample-image/yaro-1.png", "rb").read()
+
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    store = UploadStore(root=str(tmp_path), ttl=0)
+
+    first = store.put(PICTURE)
+    second = store.put(bytes(PICTURE))
+    other = store.put(PICTURE + b"\x00")
+
+    assert first == second != other
+    # sharded by the first bytes of the hash, named by content and not by the client
+    relative = os.path.relpath(first, tmp_path).split(os.sep)
+    assert len(relative) == 3 and relative[2].startswith(relative[0] + relative[1]) and relative[2].endswith(".png")
+    assert open(first, "rb").read() == PICTURE
+    assert store.stats() == {"stored": 2, "deduplicated": 1, "expired": 0}
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith(".tmp")]
+
+
+def test_uploads_expire_unless_uploaded_again(tmp_path):
+    store = UploadStore(root=str(tmp_path), ttl=60)
+    old = store.put(PICTURE)
+    kept = store.put(PICTURE + b"\x00")
+    an_hour_ago = time.time() - 3600
+    os.utime(old, (an_hour_ago, an_hour_ago))
+    os.utime(kept, (an_hour_ago, an_hour_ago))
+
+    store.put(PICTURE + b"\x00")
+
+    assert store.cleanup() == 1
+    assert not os.path.exists(old) and os.path.exists(kept)
+
+
+def test_cleanup_only_touches_the_store_layout(tmp_path):
+    store = UploadStore(root=str(tmp_path), ttl=60)
+    stored = store.put(PICTURE)
+    leftover = os.path.join(os.path.dirname(stored), ".upload-abc.tmp")
+    legacy = tmp_path / "jane.png"  # saved by client filename before the store existed
+    unrelated = tmp_path / "ab" / "cd" / "notes.txt"
+    unrelated.parent.mkdir(parents=True)
+    for path in (leftover, legacy, unrelated):
+        open(path, "wb").write(b"old")
+    an_hour_ago = time.time() - 3600
+    for path in (stored, leftover, legacy, unrelated):
+        os.utime(path, (an_hour_ago, an_hour_ago))
+
+    assert store.cleanup() == 2
+    assert not os.path.exists(stored) and not os.path.exists(leftover)
+    assert legacy.exists() and unrelated.exists()
+
+
+def test_read_upload_hashes_and_caps_the_stream():
+    data, digest = asyncio.run(read_upload(UploadFile(io.BytesIO(PICTURE)), chunk_size=4096))
+    assert data == PICTURE
+    assert digest == hashlib.sha256(PICTURE).hexdigest()
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(read_upload(UploadFile(io.BytesIO(PICTURE)), max_bytes=len(PICTURE) - 1))
@@ -1,26 +1,152 @@
+import logging
 import cv2
-from rembg import remove
+import numpy as np
+from PIL import Image
 
-def remove_background_fast(image, target_size=(500, 500)):
-    print("> Removing background...")
+from src.utils.fused_compositing import prefer_omp_threading
 
-    # Read the image
+logger = logging.getLogger(__name__)
+
+# rembg sessions that share U2-Net's predict, and its input normalization
+U2NET_SESSIONS = ("U2netSession", "U2netpSession", "SiluetaSession", "U2netCustomSession", "U2netHumanSegSession")
+U2NET_MEAN = (0.485, 0.456, 0.406)
+U2NET_STD = (0.229, 0.224, 0.225)
+U2NET_INPUT_SIZE = (320, 320)
+
+# largest color spread (Lab distance, 90th percentile) of the picture's edges that
+# predict_mask_classic still treats as a plain, color-keyable background
+PLAIN_BACKGROUND_SPREAD = 20.0
+
+
+def prepare_segmentation_input(image, target_size=(500, 500)):
+    """Converts a BGR(A) image to the RGBA, fixed-size input the segmentation model expects."""
     if image is None:
         raise ValueError("Error: Image not found.")
 
     image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-    original_size = image.shape[:2]
     image = cv2.resize(image, target_size)
 
     if image.shape[2] == 3:
         image = cv2.cvtColor(image, cv2.COLOR_RGB2RGBA)
 
-    output = remove(image)
+    return image
 
-    # Resize back to original size
-    output = cv2.resize(output, (original_size[1], original_size[0]))
 
-    output = cv2.cvtColor(output, cv2.COLOR_RGBA2BGRA)
+def predict_mask(image, target_size=(500, 500), session=None):
+    """Runs segmentation only and returns the single-channel foreground mask at target_size."""
+    prefer_omp_threading()  # rembg imports numba
+    from rembg import remove  # deferred: importing rembg costs about a second
+
+    logger.debug("> Predicting foreground mask...")
+    small_image = prepare_segmentation_input(image, target_size)
+    return np.asarray(remove(small_image, session=session, only_mask=True))
+
+
+def predict_masks(images, target_size=(500, 500), session=None):
+    """
+    Foreground masks of several images, from one inference when the session allows it.
+
+    rembg's U2-Net family sessions (u2net, u2netp, silueta, custom U2-Net exports)
+    run the whole batch through onnxruntime at once, with the same preprocessing
+    and min-max scaling their predict does per image. Other sessions, and models
+    exported with a fixed batch size of 1, predict one image at a time.
+    """
+    if len(images) > 1 and type(session).__name__ in U2NET_SESSIONS:
+        batch_dim = session.inner_session.get_inputs()[0].shape[0]
+        # a named or None batch dimension is dynamic
+        if not isinstance(batch_dim, int):
+            return _predict_u2net_batch(images, target_size, session)
+    return [predict_mask(image, target_size, session=session) for image in images]
+
+
+def _predict_u2net_batch(images, target_size, session):
+    logger.debug("> Predicting %d foreground masks in one batch...", len(images))
+    small_images = [Image.fromarray(prepare_segmentation_input(image, target_size)) for image in images]
+    feeds = [session.normalize(small, U2NET_MEAN, U2NET_STD, U2NET_INPUT_SIZE) for small in small_images]
+    input_name = next(iter(feeds[0]))
+    predictions = session.inner_session.run(None, {input_name: np.concatenate([feed[input_name] for feed in feeds])})
+
+    masks = []
+    for prediction, small in zip(predictions[0][:, 0, :, :], small_images):
+        # per image, as rembg scales each prediction on its own
+        prediction = (prediction - prediction.min()) / (prediction.max() - prediction.min())
+        mask = Image.fromarray((prediction.clip(0, 1) * 255).astype("uint8"), mode="L")
+        masks.append(np.asarray(mask.resize(small.size, Image.Resampling.LANCZOS)))
+    return masks
+
+
+def predict_mask_classic(image, target_size=(500, 500), work_size=160, iterations=3):
+    """
+    Non-neural foreground mask at target_size: no model to load, tens of milliseconds.
+
+    Pictures that already have transparency use their alpha channel. On a plain
+    background, pixels far (in Lab) from the median color of the top, left and
+    right edges seed the foreground; on a busy one, the center of the frame does
+    (profile pictures are centered and cut off at the bottom). GrabCut then
+    refines the seed on a work_size copy.
+    """
+    if image is None:
+        raise ValueError("Error: Image not found.")
+
+    logger.debug("> Predicting foreground mask without a model...")
+    if image.ndim == 3 and image.shape[2] == 4 and image[:, :, 3].min() < 255:
+        return cv2.resize(image[:, :, 3], target_size, interpolation=cv2.INTER_AREA)
+
+    bgr = image[:, :, :3] if image.ndim == 3 else cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    small = cv2.resize(np.ascontiguousarray(bgr), (work_size, work_size), interpolation=cv2.INTER_AREA)
+    lab = cv2.cvtColor(small, cv2.COLOR_BGR2LAB).astype(np.float32)
+
+    # the bottom edge is left out: shoulders usually run through it
+    border = np.concatenate([lab[0], lab[:, 0], lab[:, -1]])
+    background_color = np.median(border, axis=0)
+    spread = float(np.percentile(np.linalg.norm(border - background_color, axis=1), 90))
+
+    if spread <= PLAIN_BACKGROUND_SPREAD:
+        distance = np.linalg.norm(lab - background_color, axis=2)
+        mask = np.where(distance > max(12.0, 2 * spread), cv2.GC_PR_FGD, cv2.GC_PR_BGD).astype(np.uint8)
+    else:
+        margin = work_size // 10
+        mask = np.full((work_size, work_size), cv2.GC_PR_BGD, dtype=np.uint8)
+        mask[margin:, margin:-margin] = cv2.GC_PR_FGD
+    mask[0, :] = cv2.GC_BGD
+    mask[:, [0, -1]] = cv2.GC_BGD
+    if not (mask == cv2.GC_PR_FGD).any():
+        return np.zeros((target_size[1], target_size[0]), dtype=np.uint8)
+
+    background_model = np.zeros((1, 65), np.float64)
+    foreground_model = np.zeros((1, 65), np.float64)
+    cv2.grabCut(small, mask, None, background_model, foreground_model, iterations, cv2.GC_INIT_WITH_MASK)
+
+    foreground = np.where((mask == cv2.GC_FGD) | (mask == cv2.GC_PR_FGD), 255, 0).astype(np.uint8)
+    # a soft edge, like the model masks have
+    return cv2.GaussianBlur(cv2.resize(foreground, target_size, interpolation=cv2.INTER_LINEAR), (5, 5), 0)
 
-    return output
+
+def subject_from_mask(image, mask, target_size=(500, 500)):
+    """
+    The BGRA cutout at the segmentation size (target_size), before any resize back.
+    Its aspect ratio is squashed to target_size; callers that place it scale it
+    once to the placement size with the original aspect ratio.
+    """
+    small_image = prepare_segmentation_input(image, target_size)
+
+    # same compositing rembg does for a naive cutout
+    empty = Image.new("RGBA", target_size, 0)
+    output = np.asarray(Image.composite(Image.fromarray(small_image), empty, Image.fromarray(mask)))
+
+    return cv2.cvtColor(output, cv2.COLOR_RGBA2BGRA)
+
+
+def cutout_from_mask(image, mask, target_size=(500, 500)):
+    """
+    Rebuilds the BGRA cutout of an image from a mask produced by predict_mask.
+
+    Parameters:
+    - image (np.ndarray): Original BGR(A) image.
+    - mask (np.ndarray): Single-channel mask at target_size.
+
+    Returns:
+    - np.ndarray: BGRA cutout at the original image size.
+    """
+    # Resize back to original size
+    return cv2.resize(subject_from_mask(image, mask, target_size), (image.shape[1], image.shape[0]))
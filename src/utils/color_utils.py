@@ -1,10 +1,13 @@
+import logging
 import cv2
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 
 def extract_colors(image_path):
     """Extracts two background colors and one contrasting text color from an image."""
-    print("> Extracting colors from image...")
+    logger.debug("> Extracting colors from image...")
 
     image = cv2.imread(image_path)
     image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
@@ -1,17 +1,127 @@
 import colorsys
+import logging
 
 import cv2
 import numpy as np
 
+from src.config import settings
+from src.utils.dominant_color import DOMINANT_COLOR_STRATEGIES
+
+logger = logging.getLogger(__name__)
+
+
+# Array API: every function takes an (N, 3) array of colors (anything
+# np.asarray accepts, a single color is treated as N=1) and handles all of
+# them with one cv2.cvtColor call / one NumPy expression. The single-color
+# functions further down are thin wrappers over these.
+
+
+def as_color_array(colors):
+    """Returns colors as an (N, 3) array."""
+    return np.asarray(colors).reshape(-1, 3)
+
+
+def bgr_to_hsv_array(bgr_colors):
+    """Converts (N, 3) BGR colors to OpenCV HSV (hue 0-179)."""
+    bgr_colors = np.uint8(as_color_array(bgr_colors))
+    return cv2.cvtColor(bgr_colors[:, None, :], cv2.COLOR_BGR2HSV)[:, 0, :]
+
+
+def hsv_to_bgr_array(hsv_colors):
+    """Converts (N, 3) OpenCV HSV colors to BGR. Float components are truncated like np.uint8()."""
+    hsv_colors = np.uint8(as_color_array(hsv_colors))
+    return cv2.cvtColor(hsv_colors[:, None, :], cv2.COLOR_HSV2BGR)[:, 0, :]
+
+
+def rotate_hues_array(bgr_colors, offsets):
+    """
+    Rotates the hue of every color by every offset (in OpenCV hue units, 180 = full turn).
+
+    Returns:
+    - np.ndarray: (N, len(offsets), 3) BGR colors.
+    """
+    hsv = bgr_to_hsv_array(bgr_colors)
+    offsets = np.asarray(offsets, dtype=np.int32)
+    rotated = np.repeat(hsv[:, None, :], len(offsets), axis=1)
+    rotated[:, :, 0] = (hsv[:, None, 0].astype(np.int32) + offsets[None, :]) % 180
+    return hsv_to_bgr_array(rotated.reshape(-1, 3)).reshape(len(hsv), len(offsets), 3)
+
+
+def analogous_colors_array(bgr_colors, n=3, offset=30):
+    """(N, n, 3) analogous colors, the first one being the input color."""
+    return rotate_hues_array(bgr_colors, [i * offset for i in range(n)])
+
+
+def triadic_colors_array(bgr_colors):
+    return rotate_hues_array(bgr_colors, [0, 60, 120])
+
+
+def tetradic_colors_array(bgr_colors):
+    return rotate_hues_array(bgr_colors, [0, 45, 90, 135])
+
+
+def split_complementary_colors_array(bgr_colors):
+    return rotate_hues_array(bgr_colors, [0, 150, 300])
+
+
+def square_colors_array(bgr_colors):
+    return rotate_hues_array(bgr_colors, [0, 90, 180, 270])
+
+
+def scale_saturation_value_array(bgr_colors, saturation_boost=1, value_boost=1):
+    """Multiplies saturation and value of (N, 3) BGR colors, clipped to 255."""
+    hsv = bgr_to_hsv_array(bgr_colors).astype(np.float64)
+    hsv[:, 1] = np.minimum(hsv[:, 1] * saturation_boost, 255)
+    hsv[:, 2] = np.minimum(hsv[:, 2] * value_boost, 255)
+    return hsv_to_bgr_array(hsv)
+
+
+def complementary_colors_array(bgr_colors, boost_s=1, boost_v=1.2):
+    """(N, 3) complementary colors (hue + 180 degrees), with saturation/value boosts."""
+    hsv = bgr_to_hsv_array(bgr_colors).astype(np.float64)
+    hsv[:, 0] = (hsv[:, 0] + 90) % 180
+    hsv[:, 1] = np.minimum(hsv[:, 1] * boost_s, 255)
+    hsv[:, 2] = np.minimum(hsv[:, 2] * boost_v, 255)
+    return hsv_to_bgr_array(hsv)
+
+
+def increase_saturation_array(bgr_colors, saturation_boost=1.5):
+    return scale_saturation_value_array(bgr_colors, saturation_boost=saturation_boost)
+
+
+def increase_luminance_array(bgr_colors, luminance_boost=1.2):
+    return scale_saturation_value_array(bgr_colors, value_boost=luminance_boost)
+
+
+def relative_luminance_array(colors):
+    """WCAG relative luminance of (N, 3) RGB colors, as an (N,) float array."""
+    channels = as_color_array(colors).astype(np.float64) / 255.0
+    linear = np.where(channels <= 0.03928, channels, ((channels + 0.055) / 1.055) ** 2.4)
+    return 0.2126 * linear[:, 0] + 0.7152 * linear[:, 1] + 0.0722 * linear[:, 2]
+
+
+def contrast_ratio_array(colors_a, colors_b):
+    """WCAG contrast ratios between colors_a and colors_b (broadcast like NumPy: (N,3) vs (N,3) or (1,3))."""
+    l1 = relative_luminance_array(colors_a)
+    l2 = relative_luminance_array(colors_b)
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
+
+
+def text_colors_array(left_bgs, right_bgs, light=(255, 247, 216), dark=(41, 41, 28)):
+    """Picks, per row, the light or dark text color with the better worst-case contrast on both backgrounds."""
+    min_light = np.minimum(contrast_ratio_array(light, left_bgs), contrast_ratio_array(light, right_bgs))
+    min_dark = np.minimum(contrast_ratio_array(dark, left_bgs), contrast_ratio_array(dark, right_bgs))
+    return np.where((min_light > min_dark)[:, None], np.array(light), np.array(dark))
+
 
 def bgr_to_hsv(bgr_color):
     """Convert BGR color to HSV."""
-    return cv2.cvtColor(np.uint8([[bgr_color]]), cv2.COLOR_BGR2HSV)[0][0]
+    return bgr_to_hsv_array(bgr_color)[0]
 
 
 def hsv_to_bgr(hsv_color):
     """Convert HSV color to BGR."""
-    return cv2.cvtColor(np.uint8([[hsv_color]]), cv2.COLOR_HSV2BGR)[0][0]
+    return hsv_to_bgr_array(hsv_color)[0]
 
 
 def get_analogous_colors(bgr_color, n=3, offset=30):
@@ -22,22 +132,11 @@ def get_analogous_colors(bgr_color, n=3, offset=30):
     :param offset: Hue offset in degrees.
     :return: List of BGR colors.
     """
-    hsv_color = bgr_to_hsv(bgr_color)
-    h, s, v = hsv_color
-    return [hsv_to_bgr(((h + i * offset) % 180, s, v)) for i in range(n)]
+    return list(analogous_colors_array(bgr_color, n, offset)[0])
 
 
 def get_complementary_color(bgr_color, boost_s=1, boost_v=1.2):
-
-    hsv_color = bgr_to_hsv(bgr_color)
-    h, s, v = hsv_color
-
-    comp_h = (h + 90) % 180
-
-    comp_s = min(s * boost_s, 255)
-    comp_v = min(v * boost_v, 255)
-
-    return hsv_to_bgr((comp_h, comp_s, comp_v))
+    return complementary_colors_array(bgr_color, boost_s, boost_v)[0]
 
 
 def get_triadic_colors(bgr_color):
@@ -46,9 +145,7 @@ def get_triadic_colors(bgr_color):
     :param bgr_color: Input BGR color.
     :return: List of 3 BGR colors.
     """
-    hsv_color = bgr_to_hsv(bgr_color)
-    h, s, v = hsv_color
-    return [hsv_to_bgr(((h + i * 60) % 180, s, v)) for i in range(3)]
+    return list(triadic_colors_array(bgr_color)[0])
 
 
 def get_tetradic_colors(bgr_color):
@@ -57,9 +154,7 @@ def get_tetradic_colors(bgr_color):
     :param bgr_color: Input BGR color.
     :return: List of 4 BGR colors.
     """
-    hsv_color = bgr_to_hsv(bgr_color)
-    h, s, v = hsv_color
-    return [hsv_to_bgr(((h + i * 45) % 180, s, v)) for i in range(4)]
+    return list(tetradic_colors_array(bgr_color)[0])
 
 
 def get_split_complementary_colors(bgr_color):
@@ -68,9 +163,7 @@ def get_split_complementary_colors(bgr_color):
     :param bgr_color: Input BGR color.
     :return: List of 3 BGR colors.
     """
-    hsv_color = bgr_to_hsv(bgr_color)
-    h, s, v = hsv_color
-    return [hsv_to_bgr(((h + i * 150) % 180, s, v)) for i in range(3)]
+    return list(split_complementary_colors_array(bgr_color)[0])
 
 
 def square_colors(bgr_color):
@@ -79,9 +172,7 @@ def square_colors(bgr_color):
     :param bgr_color: Input BGR color.
     :return: List of 4 BGR colors.
     """
-    hsv_color = bgr_to_hsv(bgr_color)
-    h, s, v = hsv_color
-    return [hsv_to_bgr(((h + i * 90) % 180, s, v)) for i in range(4)]
+    return list(square_colors_array(bgr_color)[0])
 
 
 def increase_saturation(bgr_color, saturation_boost=1.5):
@@ -95,16 +186,7 @@ def increase_saturation(bgr_color, saturation_boost=1.5):
     Returns:
     - tuple[int, int, int]: BGR color with increased saturation.
     """
-    # Convert BGR to HSV
-    hsv_color = cv2.cvtColor(np.uint8([[bgr_color]]), cv2.COLOR_BGR2HSV)[0][0]
-
-    # Increase saturation
-    h, s, v = hsv_color
-    s = min(s * saturation_boost, 255)  # Ensure saturation doesn't exceed 255
-
-    # Convert back to BGR
-    new_bgr_color = cv2.cvtColor(np.uint8([[[h, s, v]]]), cv2.COLOR_HSV2BGR)[0][0]
-    return tuple(new_bgr_color)
+    return tuple(increase_saturation_array(bgr_color, saturation_boost)[0])
 
 
 def increase_luminance(bgr_color, luminance_boost=1.2):
@@ -118,80 +200,49 @@ def increase_luminance(bgr_color, luminance_boost=1.2):
     Returns:
     - tuple[int, int, int]: BGR color with increased luminance.
     """
-    # Convert BGR to HSV
-    hsv_color = cv2.cvtColor(np.uint8([[bgr_color]]), cv2.COLOR_BGR2HSV)[0][0]
-
-    # Increase luminance (Value)
-    h, s, v = hsv_color
-    v = min(v * luminance_boost, 255)  # Ensure value doesn't exceed 255
+    return tuple(increase_luminance_array(bgr_color, luminance_boost)[0])
 
-    # Convert back to BGR
-    new_bgr_color = cv2.cvtColor(np.uint8([[[h, s, v]]]), cv2.COLOR_HSV2BGR)[0][0]
-    return tuple(new_bgr_color)
 
+def get_dominant_color(image, strategy=None):
+    """
+    Returns the dominant color of an image, in the image's channel order.
 
-def get_dominant_color(image):
-
-    print("> Detecting dominant color...")
-
-    if image.shape[-1] == 4:  # If RGBA, remove alpha channel
-        image = image[:, :, :3]  # Keep only RGB/BGR channels
-    # Resize image to speed up processing
-    small_image = cv2.resize(image, (50, 50))  # Keep in BGR format
-
-    # Reshape the image to be a list of pixels
-    pixels = small_image.reshape(-1, 3)
-
-    # Use k-means clustering to find the dominant color
-    num_clusters = 3
-    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
-    _, labels, centers = cv2.kmeans(
-        np.float32(pixels),  # Input must be float32
-        num_clusters,
-        None,
-        criteria,
-        10,
-        cv2.KMEANS_RANDOM_CENTERS
-    )
-
-    # Find the most common cluster (dominant color)
-    dominant_color = centers[np.argmax(np.bincount(labels.flatten()))]
+    Parameters:
+    - image (np.ndarray): RGB/BGR image (an alpha channel is ignored).
+    - strategy (str): One of DOMINANT_COLOR_STRATEGIES ("median_cut", "histogram", "kmeans");
+      defaults to settings.DOMINANT_COLOR_STRATEGY.
 
-    # Convert to integer BGR tuple (0-255)
-    dominant_color = tuple(np.uint8(dominant_color))
+    Returns:
+    - tuple[int, int, int]: The dominant color.
+    """
+    strategy = strategy or settings.DOMINANT_COLOR_STRATEGY
+    if strategy not in DOMINANT_COLOR_STRATEGIES:
+        raise ValueError(f"Unknown dominant color strategy '{strategy}'. "
+                         f"Use one of: {', '.join(DOMINANT_COLOR_STRATEGIES)}.")
 
-    print(f">> Dominant color detected: {dominant_color}")
+    logger.debug("> Detecting dominant color (%s)...", strategy)
+    dominant_color = DOMINANT_COLOR_STRATEGIES[strategy](image)
+    logger.info(">> Dominant color detected: %s", dominant_color)
 
     return dominant_color
 
 
-
 def get_text_color(left_bg, right_bg):
-    # Previous contrast calculation remains the same
-    light = (255, 247, 216)
-    dark = (41,41,28)
-
-    # Calculate contrast ratios
-    contrast_white_left = get_contrast_ratio(light, left_bg)
-    contrast_white_right = get_contrast_ratio(light, right_bg)
-    min_white = min(contrast_white_left, contrast_white_right)
-
-    contrast_black_left = get_contrast_ratio(dark, left_bg)
-    contrast_black_right = get_contrast_ratio(dark, right_bg)
-    min_black = min(contrast_black_left, contrast_black_right)
+    """Light or dark text color, whichever contrasts better with both backgrounds."""
+    return tuple(int(c) for c in text_colors_array(left_bg, right_bg)[0])
 
-    return light if min_white > min_black else dark
 
-
-def get_colors(image_path, dominant_color=None):
-    image = cv2.imread(image_path)
-    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+def get_colors(image, dominant_color=None, strategy=None):
+    """Accepts an image path or an already decoded RGB image."""
+    if isinstance(image, str):
+        image = cv2.imread(image)
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
     # Downsample
     small_img = cv2.resize(image, (100, 100), interpolation=cv2.INTER_AREA)
 
     if dominant_color is None:
-        dominant_color = get_dominant_color(small_img)
+        dominant_color = get_dominant_color(small_img, strategy)
     sat_increase = 2.5
     comp_color = get_complementary_color(dominant_color)
     _, left_bg, right_bg = get_analogous_colors(comp_color)
@@ -206,23 +257,11 @@ def get_colors(image_path, dominant_color=None):
 
 
 def get_relative_luminance(color):
-    r, g, b = color
-    r = r / 255.0
-    g = g / 255.0
-    b = b / 255.0
-
-    # Convert to linear RGB
-    r = r if r <= 0.03928 else ((r + 0.055) / 1.055) ** 2.4
-    g = g if g <= 0.03928 else ((g + 0.055) / 1.055) ** 2.4
-    b = b if b <= 0.03928 else ((b + 0.055) / 1.055) ** 2.4
-
-    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+    return float(relative_luminance_array(color)[0])
 
 
 def get_contrast_ratio(color1, color2):
-    l1 = get_relative_luminance(color1)
-    l2 = get_relative_luminance(color2)
-    return (max(l1, l2) + 0.05) / (min(l1, l2) + 0.05)
+    return float(contrast_ratio_array(color1, color2)[0])
 
 
 def rgb_to_bgr(color):
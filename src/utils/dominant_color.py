@@ -0,0 +1,97 @@
+import cv2
+import numpy as np
+
+# Same thumbnail the original k-means used; a few thousand pixels are plenty
+# for the dominant color of a profile picture.
+SAMPLE_SIZE = (50, 50)
+CLUSTERS = 3
+HISTOGRAM_BINS = 8
+KMEANS_SEED = 0
+KMEANS_CRITERIA = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 10, 1.0)
+
+
+def _sample_pixels(image):
+    """Drops alpha, downsamples and returns the pixels as an (N, 3) float32 array."""
+    if image.shape[-1] == 4:
+        image = image[:, :, :3]
+    return np.float32(cv2.resize(image, SAMPLE_SIZE).reshape(-1, 3))
+
+
+def _median_cut_labels(pixels, colors):
+    """
+    Median cut: repeatedly splits the box with the widest channel range at the
+    median of that channel. Returns one box label per pixel.
+    """
+    boxes = [np.arange(len(pixels))]
+    while len(boxes) < colors:
+        ranges = [np.ptp(pixels[box], axis=0).max() if len(box) > 1 else -1 for box in boxes]
+        widest = int(np.argmax(ranges))
+        if ranges[widest] <= 0:
+            break  # every box is a single color
+        box = boxes.pop(widest)
+        channel = int(np.argmax(np.ptp(pixels[box], axis=0)))
+        box = box[np.argsort(pixels[box, channel], kind="stable")]
+        middle = len(box) // 2
+        boxes[widest:widest] = [box[:middle], box[middle:]]
+
+    labels = np.empty((len(pixels), 1), dtype=np.int32)
+    for label, box in enumerate(boxes):
+        labels[box] = label
+    return labels, len(boxes)
+
+
+def dominant_color_median_cut(image, colors=CLUSTERS):
+    """
+    Median cut palette refined with k-means iterations started from it.
+
+    Same "largest of 3 clusters" answer as the original k-means, but with one
+    deterministic start instead of 10 random ones.
+    """
+    pixels = _sample_pixels(image)
+    labels, colors = _median_cut_labels(pixels, colors)
+    if colors < 2:
+        return tuple(np.uint8(pixels.mean(axis=0)))
+    _, labels, centers = cv2.kmeans(pixels, colors, labels, KMEANS_CRITERIA, 1, cv2.KMEANS_USE_INITIAL_LABELS)
+    return tuple(np.uint8(centers[np.argmax(np.bincount(labels.flatten()))]))
+
+
+def dominant_color_histogram(image, bins=HISTOGRAM_BINS):
+    """
+    Densest region of a 3D color histogram (the mode rather than the largest cluster).
+
+    Pixels are binned into bins^3 cells, each cell's count is summed with its 26
+    neighbours (so a color split across a bin edge still wins), and the mean of
+    the pixels around the densest cell is returned.
+    """
+    pixels = _sample_pixels(image)
+    shift = 8 - int(np.log2(bins))
+    cells = pixels.astype(np.int32) >> shift
+    index = (cells[:, 0] * bins + cells[:, 1]) * bins + cells[:, 2]
+    histogram = np.bincount(index, minlength=bins ** 3).reshape(bins, bins, bins)
+
+    padded = np.pad(histogram, 1)
+    density = np.zeros_like(histogram)
+    for dz in range(3):
+        for dy in range(3):
+            for dx in range(3):
+                density += padded[dz:dz + bins, dy:dy + bins, dx:dx + bins]
+
+    # argmax returns the first maximum, so ties always resolve the same way
+    peak = np.array(np.unravel_index(np.argmax(density), density.shape))
+    near_peak = np.all(np.abs(cells - peak) <= 1, axis=1)
+    return tuple(np.uint8(pixels[near_peak].mean(axis=0)))
+
+
+def dominant_color_kmeans(image, clusters=CLUSTERS, seed=KMEANS_SEED):
+    """The original k-means (random centers, 10 attempts) with a fixed seed, so it is repeatable."""
+    pixels = _sample_pixels(image)
+    cv2.setRNGSeed(seed)
+    _, labels, centers = cv2.kmeans(pixels, clusters, None, KMEANS_CRITERIA, 10, cv2.KMEANS_RANDOM_CENTERS)
+    return tuple(np.uint8(centers[np.argmax(np.bincount(labels.flatten()))]))
+
+
+DOMINANT_COLOR_STRATEGIES = {
+    "median_cut": dominant_color_median_cut,
+    "histogram": dominant_color_histogram,
+    "kmeans": dominant_color_kmeans,
+}
@@ -1,34 +1,109 @@
+import hashlib
+import logging
 import os
+import tempfile
 import cv2
 
-def get_unique_filename(base_path, filename):
-    """Returns a unique filename by adding numbers if the file already exists."""
-    base_name, ext = os.path.splitext(filename)
-    full_path = os.path.join(base_path, filename)
-    counter = 1
-    while os.path.exists(full_path):
-        full_path = os.path.join(base_path, f"{base_name}-{counter}{ext}")
-        counter += 1
+from src.config import settings
 
-    return full_path
+logger = logging.getLogger(__name__)
+
+# format -> (file extension, media type)
+IMAGE_FORMATS = {
+    "png": (".png", "image/png"),
+    "jpeg": (".jpg", "image/jpeg"),
+    "webp": (".webp", "image/webp"),
+}
+
+def write_atomic(path, data):
+    """Writes data through a temporary file in the same directory and a rename, so a partial file is never visible."""
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".output-", suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+def save_output(data, base_path, filename):
+    """
+    Saves encoded output (a poster, a palette plot) under base_path and returns its path.
+
+    The name comes from the content, <base_path>/<aa>/<name>-<sha256[:12]><ext>, so
+    no directory listing or probing is needed, concurrent saves can't pick the same
+    name for different files, and saving identical output again reuses the file.
+    The two-character shard keeps any one directory small.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    stem, ext = os.path.splitext(filename)
+    directory = os.path.join(base_path, digest[:2])
+    output_path = os.path.join(directory, f"{stem}-{digest[:12]}{ext}")
+    if not os.path.exists(output_path):
+        os.makedirs(directory, exist_ok=True)
+        write_atomic(output_path, data)
+    return output_path
 
 def save_poster(image, image_path):
-    """Saves the poster in the 'posters-old/' directory with a unique filename."""
-    print("> Saving poster...")
+    """Saves the poster as PNG under assets/output-banners (see save_output for the naming)."""
+    logger.info("> Saving poster...")
 
     os.makedirs("posters", exist_ok=True)  # Ensure the directory exists
-    output_name = f"{os.path.basename(image_path).split('.')[0]}-banner.png"
-    output_path = get_unique_filename("../../assets/output-banners", f"{os.path.basename(image_path).split('.')[0]}-banner.png")
+    output_path = save_output(encode_image(image, "png"), "../../assets/output-banners",
+                              f"{os.path.basename(image_path).split('.')[0]}-banner.png")
+    logger.info(">> Poster saved at: %s", output_path)
+
+    return output_path, os.path.basename(output_path)
+
+def resolve_image_format(image_format=None, quality=None):
+    """
+    Validates an output format and fills in its default quality.
+
+    For PNG, quality is the zlib compression level (0-9); for JPEG and WebP it is 1-100.
+
+    Returns:
+    - tuple: (format, quality)
+    """
+    image_format = (image_format or settings.OUTPUT_FORMAT).lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format '{image_format}'. Use one of: {', '.join(IMAGE_FORMATS)}.")
+
+    if quality is None:
+        quality = {"png": settings.PNG_COMPRESSION, "jpeg": settings.JPEG_QUALITY,
+                   "webp": settings.WEBP_QUALITY}[image_format]
+    low, high = (0, 9) if image_format == "png" else (1, 100)
+    if not low <= quality <= high:
+        raise ValueError(f"Quality for {image_format} must be between {low} and {high}, got {quality}.")
+    return image_format, quality
 
-    cv2.imwrite(output_path, image)  # Save the poster
-    print(f">> Poster saved at: {output_path}")
+def encode_image(image, image_format=None, quality=None):
+    """Encodes a BGR image in memory as PNG, JPEG or WebP and returns the bytes."""
+    image_format, quality = resolve_image_format(image_format, quality)
+    params = {
+        "png": [cv2.IMWRITE_PNG_COMPRESSION, quality],
+        "jpeg": [cv2.IMWRITE_JPEG_QUALITY, quality],
+        "webp": [cv2.IMWRITE_WEBP_QUALITY, quality],
+    }[image_format]
+    ok, buffer = cv2.imencode(IMAGE_FORMATS[image_format][0], image, params)
+    if not ok:
+        raise ValueError(f">> Error: could not encode the image as {image_format}.")
+    return buffer.tobytes()
 
-    return output_path, output_name
+def save_encoded_poster(data, image_path, image_format="png", output_dir="../../assets/output-banners"):
+    """Writes an already encoded poster next to the other banners (see save_output for the naming)."""
+    extension = IMAGE_FORMATS[image_format][0]
+    output_path = save_output(data, output_dir, f"{os.path.basename(image_path).split('.')[0]}-banner{extension}")
+    logger.info(">> Poster saved at: %s", output_path)
+    return output_path
 
 import cv2
 
 def load_image_rgb(image_path):
-    print(f"> Loading image from: {image_path}")
+    logger.info("> Loading image from: %s", image_path)
 
     # Load the image in BGR format
     image = cv2.imread(image_path)
@@ -0,0 +1,85 @@
+import logging
+import importlib.util
+import os
+
+import cv2
+import numpy as np
+
+from src.utils.image_filters import decrease_contrast, apply_tint_filter
+from src.utils.masking import apply_mask
+from src.utils.overlay_utils import overlay_image, generate_gradient_mask_from_image, interpolate_gradient
+
+logger = logging.getLogger(__name__)
+
+# numba is optional, the NumPy path below is always available. It is only
+# imported (with the kernel in fused_kernel.py) when the first banner needs it.
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+
+def prefer_omp_threading():
+    """
+    Call before anything imports numba (fused_kernel, and rembg through pymatting).
+    numba is imported lazily, so its thread pool is first started from a render
+    thread; TBB hangs at interpreter exit when started that way, OpenMP does not.
+    """
+    os.environ.setdefault("NUMBA_THREADING_LAYER_PRIORITY", "omp tbb workqueue")
+
+
+def composite_cutout_reference(bg, cutout, tint_color, contrast_amount=0.1, tint_strength=0.2, aspect_ratio=None):
+    """
+    Reference (NumPy) cutout pipeline: contrast -> tint -> vertical fade mask -> overlay.
+
+    Every step allocates a full-size copy; kept as the ground truth for the fused kernel.
+    """
+    low_contrast = decrease_contrast(cutout, contrast_amount)
+    tinted_cutout = apply_tint_filter(low_contrast, tint_color, strength=tint_strength)
+    gradient_mask = generate_gradient_mask_from_image(cutout, fade_strength=1, interploation="quadratic")
+    masked_cutout = apply_mask(tinted_cutout, gradient_mask)
+    return overlay_image(bg, masked_cutout, aspect_ratio)
+
+
+def composite_cutout_fused(bg, cutout, tint_color, contrast_amount=0.1, tint_strength=0.2, aspect_ratio=None):
+    """
+    Same result as composite_cutout_reference (within rounding) in one compiled pass.
+
+    The cutout is resized to its placement size first, so contrast, tint, the
+    fade mask and the alpha-over run once per output pixel, written in place into bg.
+    aspect_ratio (width / height) overrides the cutout's own, for cutouts kept at
+    the segmentation size.
+    """
+    if aspect_ratio is None:
+        fg_height, fg_width = cutout.shape[:2]
+        aspect_ratio = fg_width / fg_height
+    new_height = bg.shape[0]
+    new_width = int(new_height * aspect_ratio)
+    fg = cv2.resize(cutout, (new_width, new_height))
+
+    contrast_amount = max(0.0, min(contrast_amount, 1.0))
+    tint_strength = max(0.0, min(tint_strength, 1.0))
+    mean = np.array(cv2.mean(fg)[:3], dtype=np.float32)
+    tint = np.array(tint_color[:3], dtype=np.float64)
+    row_mask = interpolate_gradient(new_height, 255, 0, interpolation="quadratic")
+
+    x_offset = (bg.shape[1] - new_width) // 2
+    # a cutout wider than the canvas is cropped evenly on both sides
+    x_start = max(0, -x_offset)
+
+    from src.utils.fused_kernel import fused_cutout_kernel
+    fused_cutout_kernel(bg, fg, row_mask, mean, tint, contrast_amount, tint_strength, max(0, x_offset), x_start)
+    return bg
+
+
+def composite_cutout(bg, cutout, tint_color, contrast_amount=0.1, tint_strength=0.2, use_numba=True,
+                     aspect_ratio=None):
+    """Composites the tinted, faded cutout onto bg, using the compiled kernel when numba is installed."""
+    if use_numba and NUMBA_AVAILABLE:
+        logger.debug("> Compositing subject with fused kernel...")
+        return composite_cutout_fused(bg, cutout, tint_color, contrast_amount, tint_strength, aspect_ratio)
+    return composite_cutout_reference(bg, cutout, tint_color, contrast_amount, tint_strength, aspect_ratio)
+
+
+def warm_up_kernels():
+    """Compiles (or loads from cache) the fused kernel so the first banner doesn't pay for it."""
+    if NUMBA_AVAILABLE:
+        bg = np.zeros((8, 16, 4), dtype=np.uint8)
+        composite_cutout_fused(bg, np.zeros((8, 8, 4), dtype=np.uint8), (0, 0, 0))
@@ -0,0 +1,33 @@
+import numpy as np
+
+from src.utils.fused_compositing import prefer_omp_threading
+
+prefer_omp_threading()
+from numba import njit, prange
+
+# Compiled half of fused_compositing; imported lazily so numba only loads when a banner is composited.
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def fused_cutout_kernel(bg, fg, row_mask, mean, tint, contrast_amount, tint_strength, x_offset, x_start):
+    height = fg.shape[0]
+    width = min(fg.shape[1] - x_start, bg.shape[1] - x_offset)
+    keep = np.float32(1.0 - contrast_amount)
+    pull = np.float32(contrast_amount)
+    for y in prange(height):
+        fade = np.float32(row_mask[y]) / np.float32(255.0)
+        for x in range(width):
+            px = fg[y, x + x_start]
+            alpha = np.uint8(np.float32(px[3]) / np.float32(255.0) * fade * np.float32(255.0))
+            if alpha == 0:
+                continue
+            a = alpha / 255.0
+            for c in range(3):
+                # decrease_contrast (float32, clipped to uint8)
+                value = keep * np.float32(px[c]) + pull * mean[c]
+                value = np.float32(np.uint8(min(max(value, np.float32(0.0)), np.float32(255.0))))
+                # apply_tint_filter (clipped to uint8)
+                value = (1.0 - tint_strength) * value + tint_strength * tint[c]
+                value = np.float64(np.uint8(min(max(value, 0.0), 255.0)))
+                # alpha-over straight into the background
+                bg[y, x + x_offset, c] = np.uint8(value * a + bg[y, x + x_offset, c] * (1.0 - a))
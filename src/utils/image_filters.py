@@ -1,6 +1,9 @@
+import logging
 import cv2
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 def decrease_contrast(image, amount=0.2):
     """
     Decreases the contrast of an image by a given amount.
@@ -12,7 +15,7 @@ def decrease_contrast(image, amount=0.2):
     Returns:
     - np.ndarray: Image with reduced contrast.
     """
-    print(f"> Reducing contrast with strength {amount}...")
+    logger.debug("> Reducing contrast with strength %s...", amount)
 
     # Ensure amount is within valid range
     amount = max(0, min(amount, 1))
@@ -30,11 +33,11 @@ def decrease_contrast(image, amount=0.2):
     # Ensure values stay in range (0-255)
     image = np.clip(image, 0, 255).astype(np.uint8)
 
-    print(">> Contrast reduced successfully.")
+    logger.debug(">> Contrast reduced successfully.")
     return image
 
 def apply_tint_filter(image, tint_color, strength=0.5):
-    print(f"> Applying tint filter with color {tint_color} and strength {strength}...")
+    logger.debug("> Applying tint filter with color %s and strength %s...", tint_color, strength)
 
     # Ensure strength is within valid range
     strength = max(0, min(strength, 1))
@@ -62,7 +65,7 @@ def process_background_image(image, opacity=0.5):
     Returns:
     - np.ndarray: Processed background image with transparency.
     """
-    print(f"> Processing background image~...")
+    logger.debug("> Processing background image~...")
 
     # Convert to RGBA if it's not already
     if image.shape[2] == 3:  # If the image has no alpha channel, add one
@@ -81,13 +84,13 @@ def process_background_image(image, opacity=0.5):
     # Apply opacity by modifying the alpha channel
     image[:, :, 3] = (image[:, :, 3] * opacity).astype(np.uint8)
 
-    print(">> Background processing complete (White pixels removed, opacity applied).")
+    logger.debug(">> Background processing complete (White pixels removed, opacity applied).")
     return image
 
 
 def apply_gaussian_blur(image, blur_amount=5):
 
-    print(f"> Applying Gaussian Blur with intensity {blur_amount}...")
+    logger.debug("> Applying Gaussian Blur with intensity %s...", blur_amount)
 
     # Ensure blur_amount is an odd number (required by cv2.GaussianBlur)
     if blur_amount % 2 == 0:
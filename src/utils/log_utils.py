@@ -0,0 +1,45 @@
+import json
+import logging
+import sys
+
+from src.config import settings
+
+# every module logs through logging.getLogger(__name__), so they all hang off this one
+PACKAGE_LOGGER = "src"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured fields passed as extra={"fields": {...}} are merged in."""
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(default_level="WARNING"):
+    """
+    Sends the pipeline's log records to stdout, as plain messages (the old
+    "> ..." progress lines) or JSON lines (BANNER_LOG_FORMAT=json).
+
+    The level is BANNER_LOG_LEVEL when set, default_level otherwise. Below it,
+    a log call costs a level check and nothing else.
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logger = logging.getLogger(PACKAGE_LOGGER)
+    logger.handlers[:] = [handler]
+    logger.setLevel((settings.LOG_LEVEL or default_level).upper())
+    logger.propagate = False
+    return logger
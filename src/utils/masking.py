@@ -1,6 +1,9 @@
+import logging
 import cv2
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 def apply_mask(image, mask):
     """
     Applies a grayscale gradient mask as an alpha channel to an image.
@@ -12,7 +15,7 @@ def apply_mask(image, mask):
     Returns:
     - np.ndarray: Masked image with smooth transparency.
     """
-    print("> Applying mask to the image...")
+    logger.debug("> Applying mask to the image...")
 
     # Ensure the mask is grayscale
     if len(mask.shape) == 3:
@@ -30,5 +33,5 @@ def apply_mask(image, mask):
     # Apply the blended alpha channel back to the image
     image[:, :, 3] = new_alpha
 
-    print(">> Clipping mask applied successfully.")
+    logger.debug(">> Clipping mask applied successfully.")
     return image
\ No newline at end of file
@@ -1,12 +1,21 @@
+import logging
 import cv2
 import numpy as np
 from src.utils.blending_modes import blend_normal
-def overlay_image(bg, fg):
-    """Overlays the cutout image onto the background while maintaining aspect ratio."""
-    print("> Overlaying subject on background...")
 
-    fg_height, fg_width = fg.shape[:2]
-    aspect_ratio = fg_width / fg_height
+logger = logging.getLogger(__name__)
+
+
+def overlay_image(bg, fg, aspect_ratio=None):
+    """
+    Overlays the cutout image onto the background while maintaining aspect ratio
+    (the cutout's own, or aspect_ratio = width / height when given).
+    """
+    logger.debug("> Overlaying subject on background...")
+
+    if aspect_ratio is None:
+        fg_height, fg_width = fg.shape[:2]
+        aspect_ratio = fg_width / fg_height
     new_height = bg.shape[0]
     new_width = int(new_height * aspect_ratio)
 
@@ -14,6 +23,11 @@ def overlay_image(bg, fg):
 
     x_offset = (bg.shape[1] - new_width) // 2
     y_offset = 0
+    # a cutout wider than the canvas (portrait sizes) is cropped evenly on both sides
+    x_start = max(0, -x_offset)
+    x_offset = max(0, x_offset)
+    new_width = min(new_width - x_start, bg.shape[1] - x_offset)
+    fg_resized = fg_resized[:, x_start:x_start+new_width]
 
     alpha_fg = fg_resized[:, :, 3] / 255.0
     for c in range(3):
@@ -25,7 +39,7 @@ def overlay_image(bg, fg):
 
 def create_fade_to_transparent(color, width=1920, fade_strength=0.4, height=1080):
     """Creates a vertical gradient from a solid color at the bottom to fully transparent at the top."""
-    print("> Creating transparent fade overlay...")
+    logger.debug("> Creating transparent fade overlay...")
     fade_height = int(height * fade_strength)
     gradient = np.zeros((height, width, 4), dtype=np.uint8)
 
@@ -38,7 +52,7 @@ def create_fade_to_transparent(color, width=1920, fade_strength=0.4, height=1080
 
 def add_images(bg, fg, blend_function=None):
 
-    print(f"> Applying custom blend mode...")
+    logger.debug("> Applying custom blend mode...")
 
     fg = cv2.resize(fg, (bg.shape[1], bg.shape[0]))
 
@@ -53,7 +67,8 @@ def add_images(bg, fg, blend_function=None):
 
 def generate_gradient_mask_from_image(image, fade_strength=1.0, fade_direction=1, gradient_direction="vertical", interploation = "quadratic"):
     height, width = image.shape[:2]  # Get image dimensions
-    print(f"> Generating {gradient_direction} gradient mask for {width}x{height} image with strength {fade_strength}...")
+    logger.debug("> Generating %s gradient mask for %dx%d image with strength %s...", gradient_direction, width, height,
+                 fade_strength)
 
     # Ensure fade_strength is within valid range
     fade_strength = np.clip(fade_strength, 0.0, 1.0)
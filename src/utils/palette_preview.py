@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+
+SWATCH_SIZE = 120
+SWATCH_GAP = 12
+LABEL_HEIGHT = 32
+MARGIN = 20
+BACKGROUND = (255, 255, 255)
+LABEL_COLOR = (0, 0, 0)
+
+
+def render_palette_swatches(colors, labels, image=None, swatch_size=SWATCH_SIZE):
+    """
+    Draws a row of labelled color swatches, optionally followed by the source image.
+
+    Parameters:
+    - colors (list): RGB tuples.
+    - labels (list): One label per color, drawn under its swatch.
+    - image (np.ndarray): Optional RGB image shown to the right, scaled to the swatch height.
+    - swatch_size (int): Side of each square swatch in pixels.
+
+    Returns:
+    - np.ndarray: The preview as a BGR image.
+    """
+    row_width = len(colors) * swatch_size + (len(colors) - 1) * SWATCH_GAP
+    thumbnail = None
+    if image is not None:
+        h, w = image.shape[:2]
+        thumb_height = swatch_size + LABEL_HEIGHT
+        thumbnail = cv2.resize(image[:, :, :3], (max(1, round(w * thumb_height / h)), thumb_height),
+                               interpolation=cv2.INTER_AREA)
+
+    width = 2 * MARGIN + row_width + (SWATCH_GAP * 2 + thumbnail.shape[1] if thumbnail is not None else 0)
+    height = 2 * MARGIN + swatch_size + LABEL_HEIGHT
+    preview = np.full((height, width, 3), BACKGROUND, dtype=np.uint8)
+
+    font_scale = swatch_size / 240
+    for i, (color, label) in enumerate(zip(colors, labels)):
+        x = MARGIN + i * (swatch_size + SWATCH_GAP)
+        r, g, b = (int(c) for c in color)
+        preview[MARGIN:MARGIN + swatch_size, x:x + swatch_size] = (b, g, r)
+
+        (text_w, text_h), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 1)
+        text_x = x + max(0, (swatch_size - text_w) // 2)
+        text_y = MARGIN + swatch_size + (LABEL_HEIGHT + text_h) // 2
+        cv2.putText(preview, label, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, LABEL_COLOR, 1,
+                    cv2.LINE_AA)
+
+    if thumbnail is not None:
+        x = MARGIN + row_width + SWATCH_GAP * 2
+        preview[MARGIN:MARGIN + thumbnail.shape[0], x:x + thumbnail.shape[1]] = thumbnail[:, :, ::-1]
+
+    return preview
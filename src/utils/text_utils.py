@@ -1,39 +1,172 @@
-import cv2
+import logging
+import threading
+from collections import OrderedDict
+
 import numpy as np
 from PIL import ImageFont, ImageDraw, Image
 
-FONT_PATH = "../../assets/Anton-Regular.ttf"
-
+logger = logging.getLogger(__name__)
 
-def add_text(image, text, color, max_font_size=500, min_font_size=60, letter_spacing=30, y_offset=0):
-    """Adds centered, uppercase text with a custom font that covers the image width and allows letter spacing."""
-    print("> Adding spaced text to the image with custom font...")
+FONT_PATH = "../../assets/Anton-Regular.ttf"
 
+# FreeType faces are not safe to share between threads, so fonts are cached
+# per thread; glyph boxes are plain tuples and shared by everyone. Every canvas
+# size brings its own font sizes, so both caches drop the least recently used
+# entries beyond these bounds.
+MAX_FONTS = 64
+MAX_GLYPH_BOXES = 16384
+_fonts = threading.local()
+_glyph_boxes = OrderedDict()
+_glyph_boxes_lock = threading.Lock()
+
+
+def get_font(font_path, font_size):
+    """Returns a cached ImageFont.truetype(font_path, font_size)."""
+    cache = getattr(_fonts, "cache", None)
+    if cache is None:
+        cache = _fonts.cache = OrderedDict()
+    key = (font_path, font_size)
+    font = cache.get(key)
+    if font is None:
+        font = cache[key] = ImageFont.truetype(font_path, font_size)
+        if len(cache) > MAX_FONTS:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return font
+
+
+def get_glyph_bbox(font, char):
+    """Returns font.getbbox(char), cached per (font file, size, char)."""
+    font_path = getattr(font, "path", None)
+    if not isinstance(font_path, str):
+        return font.getbbox(char)
+    key = (font_path, font.size, char)
+    with _glyph_boxes_lock:
+        bbox = _glyph_boxes.get(key)
+        if bbox is not None:
+            _glyph_boxes.move_to_end(key)
+            return bbox
+    bbox = font.getbbox(char)
+    with _glyph_boxes_lock:
+        _glyph_boxes[key] = bbox
+        if len(_glyph_boxes) > MAX_GLYPH_BOXES:
+            _glyph_boxes.popitem(last=False)
+    return bbox
+
+
+def measure_spaced_text(font, text, letter_spacing):
+    """Width of the text drawn one glyph at a time with letter_spacing between glyphs."""
+    width = 0
+    for char in text:
+        bbox = get_glyph_bbox(font, char)
+        width += (bbox[2] - bbox[0]) + letter_spacing
+    return width - letter_spacing
+
+
+def fit_font_size(text, max_width, max_font_size, min_font_size, letter_spacing, font_path=FONT_PATH):
+    """
+    Binary search for the largest size on the max_font_size, max_font_size - 5, ... ladder
+    (above min_font_size) whose spaced text is narrower than max_width.
+
+    Falls back to the smallest size on the ladder when nothing fits.
+    """
+    sizes = list(range(max_font_size, min_font_size, -5)) or [max_font_size]
+    low, high = 0, len(sizes) - 1
+    best = high
+    while low <= high:
+        middle = (low + high) // 2
+        if measure_spaced_text(get_font(font_path, sizes[middle]), text, letter_spacing) < max_width:
+            best = middle
+            high = middle - 1
+        else:
+            low = middle + 1
+    return sizes[best]
+
+
+def layout_spaced_text(font, text, x, y, letter_spacing):
+    """Pen positions (char, x, y, bbox) used when drawing the text one glyph at a time."""
+    glyphs = []
+    for char in text:
+        bbox = get_glyph_bbox(font, char)
+        glyphs.append((char, x, y, bbox))
+        x += (bbox[2] - bbox[0]) + letter_spacing
+    return glyphs
+
+
+def render_text_layer(font, glyphs, frame_width, frame_height):
+    """
+    Rasterizes laid-out glyphs into a coverage (alpha) layer sized to their bounding box.
+
+    Returns:
+    - tuple | None: (layer, x0, y0) with the layer's top-left corner in frame
+      coordinates, or None when no glyph lands inside the frame.
+    """
+    if not glyphs:
+        return None
+    x0 = max(0, min(x + bbox[0] for _, x, _, bbox in glyphs))
+    y0 = max(0, min(y + bbox[1] for _, _, y, bbox in glyphs))
+    x1 = min(frame_width, max(x + bbox[2] for _, x, _, bbox in glyphs))
+    y1 = min(frame_height, max(y + bbox[3] for _, _, y, bbox in glyphs))
+    if x1 <= x0 or y1 <= y0:
+        return None
+
+    layer = Image.new("L", (x1 - x0, y1 - y0), 0)
+    draw = ImageDraw.Draw(layer)
+    for char, x, y, _ in glyphs:
+        draw.text((x - x0, y - y0), char, font=font, fill=255)
+    return np.asarray(layer), x0, y0
+
+
+def blend_text_layer(image, layer, x0, y0, ink):
+    """
+    Blends a solid ink color through the coverage layer onto image[y0:, x0:] in place.
+
+    Uses the same rounding as PIL's ImageDraw.text on an opaque image, so the
+    result matches drawing on the full frame.
+    """
+    height, width = layer.shape
+    region = image[y0:y0 + height, x0:x0 + width]
+    channels = region.shape[2] if region.ndim == 3 else 1
+    ink = np.array(ink[:channels], dtype=np.uint32)
+    coverage = layer.astype(np.uint32)
+    if region.ndim == 3:
+        coverage = coverage[:, :, np.newaxis]
+    blended = region * (255 - coverage) + ink * coverage + 128
+    region[...] = ((blended >> 8) + blended) >> 8
+    return image
+
+
+def draw_spaced_text(image, font, text, x, y, letter_spacing, ink):
+    """Draws spaced text onto the NumPy frame in place, touching only the text's bounding box."""
+    glyphs = layout_spaced_text(font, text, x, y, letter_spacing)
+    rendered = render_text_layer(font, glyphs, image.shape[1], image.shape[0])
+    if rendered is not None:
+        layer, x0, y0 = rendered
+        blend_text_layer(image, layer, x0, y0, ink)
+    return image
 
-    color_rgb = (color[2], color[1], color[0])  # Convert BGR → RGB
-    color = color_rgb
-    # Convert OpenCV image to PIL for better text rendering
-    image_pil = Image.fromarray(image)
 
-    font = None
+def add_text(image, text, color, max_font_size=500, min_font_size=60, letter_spacing=30, y_offset=0):
+    """
+    Adds centered text with a custom font that covers the image width and allows letter spacing.
 
-    draw = ImageDraw.Draw(image_pil)
-    width, height = image_pil.size
+    The text is drawn in place, only the text's bounding box is touched; the image is returned.
+    """
+    logger.debug("> Adding spaced text to the image with custom font...")
 
-    # Start with a large font size and decrease until it fits
-    font_size = max_font_size
+    # the color is written in reversed channel order, opaque on 4-channel frames
+    ink = (color[2], color[1], color[0], 255)
 
-    while font_size > min_font_size:
-        font = ImageFont.truetype(FONT_PATH, font_size)
+    height, width = image.shape[:2]
 
-        # Measure text size with letter spacing
-        text_width = sum(
-            (font.getbbox(char)[2] - font.getbbox(char)[0]) + letter_spacing for char in text) - letter_spacing
-        text_height = font.getbbox(text)[3] - font.getbbox(text)[1]
+    # Largest font size whose text covers less than 90% of the width
+    font_size = fit_font_size(text, width * 0.9, max_font_size, min_font_size, letter_spacing)
+    font = get_font(FONT_PATH, font_size)
 
-        if text_width < width * 0.9:
-            break
-        font_size -= 5  # Reduce font size in small steps
+    text_width = measure_spaced_text(font, text, letter_spacing)
+    text_bbox = font.getbbox(text)
+    text_height = text_bbox[3] - text_bbox[1]
 
     # Calculate start position (center horizontally and vertically)
     text_x = (width - text_width) // 2
@@ -42,41 +175,31 @@ def add_text(image, text, color, max_font_size=500, min_font_size=60, letter_spa
     text_y = text_y + y_offset
 
     # Draw each letter separately with spacing
-    x_cursor = text_x
-    for char in text:
-        draw.text((x_cursor, text_y), char, font=font, fill=color)
-        x_cursor += (font.getbbox(char)[2] - font.getbbox(char)[0]) + letter_spacing  # Move cursor for next letter
+    draw_spaced_text(image, font, text, text_x, text_y, letter_spacing, ink)
 
-    print(f">> Text added with font size {font_size}, centered with letter spacing {letter_spacing}.")
+    logger.debug(">> Text added with font size %d, centered with letter spacing %d.", font_size, letter_spacing)
 
-    # Convert back to OpenCV format
-    return np.array(image_pil)
+    return image
 
 
 def add_text_fit_width(image, text, color, letter_spacing=10, y_offset=0, max_font_size=90, min_font_size=10):
     return add_text(image, text, color, max_font_size=max_font_size, min_font_size=min_font_size, letter_spacing=letter_spacing, y_offset=y_offset)
 
 def add_text_center(image, text, font_size, color, letter_spacing=10, y_offset=0):
-
-
-    # BGR to a PIL image
-    image_pil = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    """Adds text of a fixed font size centered on a BGR(A) image, drawn in place; returns the image."""
 
     try:
-        font = ImageFont.truetype(FONT_PATH, font_size)
+        font = get_font(FONT_PATH, font_size)
     except IOError:
-        print(f"Error: Font file not found at {FONT_PATH}. Using default font.")
+        logger.warning("Error: Font file not found at %s. Using default font.", FONT_PATH)
         font = ImageFont.load_default()
 
-    # Create a drawing context
-    draw = ImageDraw.Draw(image_pil)
-
     total_width = 0
     max_height = 0
 
     for char in text:
         # Get the bounding box of the character
-        bbox = draw.textbbox((0, 0), char, font=font)
+        bbox = get_glyph_bbox(font, char)
         char_width = bbox[2] - bbox[0]  # Calculate width from bounding box
         char_height = bbox[3] - bbox[1]  # Calculate height from bounding box
 
@@ -89,28 +212,9 @@ def add_text_center(image, text, font_size, color, letter_spacing=10, y_offset=0
     total_width -= letter_spacing
 
     # Calculate the starting position for centered text
-    image_width, image_height = image_pil.size
+    image_height, image_width = image.shape[:2]
     text_x = (image_width - total_width) // 2  # Center horizontally
     text_y = (image_height - max_height) // 2 + y_offset  # Center vertically with offset
 
-    # Initialize the starting position
-    x_offset = text_x
-
-    # Loop through each character in the text
-    for char in text:
-        # Get the bounding box of the character
-        bbox = draw.textbbox((x_offset, text_y), char, font=font)
-        char_width = bbox[2] - bbox[0]  # Calculate width from bounding box
-
-        # Add the character to the image
-        draw.text((x_offset, text_y), char, font=font, fill=color[::-1])  # PIL uses RGB, so reverse BGR to RGB
-
-        # Update the x-coordinate for the next character
-        x_offset += char_width + letter_spacing
-
-    # Convert the PIL image back to OpenCV format (BGR)
-    image_with_text = cv2.cvtColor(np.array(image_pil), cv2.COLOR_RGB2BGR)
-
-    return image_with_text
-
-
+    # The frame is BGR, so the BGR color is written as is
+    return draw_spaced_text(image, font, text, text_x, text_y, letter_spacing, tuple(color) + (255,))